@@ -1,40 +1,126 @@
-# Import necessary libraries for GUI, file handling, threading, and low-level disk access
+# Import necessary libraries for file handling, threading, and low-level disk access (the GUI lives in aarambh_gui.py)
 import os  # For file and directory operations
 import sys  # For system-level operations like exiting
 import ctypes  # For checking admin privileges
 import logging  # For debugging and logging
+from logging.handlers import QueueHandler, QueueListener  # For logging off the scan threads
+import atexit  # For flushing queued log records on exit
 import datetime  # For timestamp handling
 import time  # For timing operations
 import traceback  # For detailed error logging
+import re  # For the compiled signature matcher
 from charset_normalizer import detect  # For detecting text encoding
-from concurrent.futures import ThreadPoolExecutor  # For multi-threaded scanning
 import threading  # For thread synchronization
+import multiprocessing  # For the process-pool deep scan
+import queue  # For draining worker results
+import mmap  # For positional reads on platforms without os.preadv
+import sqlite3  # For the persistent scan catalog
+import hashlib  # For content hashes of found files
+import json  # For scan checkpoints
+from collections import OrderedDict, namedtuple  # For the read-back LRU cache and MFT records
+import argparse  # For the command-line scan
+from concurrent.futures import ThreadPoolExecutor  # For parallel restores
+
+import struct  # For unpacking binary data
+import zipfile  # For ZIP file validation
+import zlib  # For PNG chunk CRCs
+from io import BytesIO  # For in-memory file handling
+import numpy as np  # For compact in-memory bitmaps
+
+# Windows-specific libraries are only needed to list and open live drives; disk images work without them
+win32api = win32file = pywintypes = None
+if sys.platform == "win32":
+    try:
+        import win32api  # For getting drive list
+        import win32file  # For low-level disk access
+        import pywintypes  # For positional (OVERLAPPED) reads
+    except ImportError as e:
+        print(f"pywin32 is not available, live drives cannot be scanned: {e}")
+
+# Logging filter that caps how often any one log statement can fire, counting what it drops
+class RateLimitFilter(logging.Filter):
+    INTERVAL = 1.0  # Seconds per rate window
+    BURST = 5  # Records let through per call site and window
+
+    def __init__(self):
+        """Start with no call sites seen."""
+        super().__init__()
+        self.sites = {}  # (path, line) -> [window start, records in window, records suppressed]
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        """Drop records past the burst; the next record let through reports how many were dropped."""
+        now = time.monotonic()
+        with self.lock:
+            site = self.sites.get((record.pathname, record.lineno))
+            if site is None:
+                site = self.sites[(record.pathname, record.lineno)] = [now, 0, 0]
+            if now - site[0] >= self.INTERVAL:
+                site[0], site[1] = now, 0
+            if site[1] >= self.BURST:
+                site[2] += 1
+                return False
+            site[1] += 1
+            suppressed, site[2] = site[2], 0
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        return True
+
+# Utility class for queued logging: a listener thread owns the log file, so scanning never waits on disk
+class LogUtils:
+    LOG_FILE = "file_recovery_debug.log"
+    LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR']
+    queue = None  # Multiprocessing queue feeding the listener; worker processes log into it too
+    listener = None  # QueueListener writing queued records to LOG_FILE
+
+    @staticmethod
+    def start(level=None):
+        """Route this process's logging through a queue to a file-writing listener thread."""
+        LogUtils.queue = multiprocessing.get_context('spawn').Queue()
+        handler = logging.FileHandler(LogUtils.LOG_FILE)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))  # Timestamp, level, message
+        LogUtils.listener = QueueListener(LogUtils.queue, handler)
+        LogUtils.listener.start()
+        atexit.register(LogUtils.stop)
+        LogUtils.attach(LogUtils.queue, level or os.environ.get("AARAMBH_LOG_LEVEL", "INFO"))
+
+    @staticmethod
+    def attach(log_queue, level):
+        """Send this process's records to a log queue at the given level (worker processes use the parent's)."""
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        handler = QueueHandler(log_queue)
+        handler.addFilter(RateLimitFilter())
+        root.addHandler(handler)
+        LogUtils.set_level(level)
+
+    @staticmethod
+    def set_level(level):
+        """Change the log level at runtime (a name such as 'DEBUG' or a logging constant)."""
+        logging.getLogger().setLevel(level if isinstance(level, int) else getattr(logging, str(level).upper(), logging.INFO))
+
+    @staticmethod
+    def level():
+        """Return the current log level as a number."""
+        return logging.getLogger().level
+
+    @staticmethod
+    def debug_enabled():
+        """Whether debug records are wanted; guards per-record messages so their text is never built otherwise."""
+        return logging.getLogger().isEnabledFor(logging.DEBUG)
+
+    @staticmethod
+    def stop():
+        """Write out queued records and stop the listener."""
+        if LogUtils.listener:
+            LogUtils.listener.stop()
+            LogUtils.listener = None
 
-# Try importing GUI and Windows-specific libraries; exit if they fail
-try:
-    from PyQt6.QtWidgets import (
-        QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
-        QComboBox, QLineEdit, QPushButton, QRadioButton, QProgressBar,
-        QTreeWidget, QTreeWidgetItem, QFileDialog, QMessageBox, QFrame, QScrollArea, QLabel
-    )  # GUI components
-    from PyQt6.QtGui import QIcon, QPixmap  # For icons and image preview
-    from PyQt6.QtCore import Qt, QCoreApplication, QThread, pyqtSignal  # Core Qt functionality
-    import win32api  # For getting drive list
-    import win32file  # For low-level disk access
-    import struct  # For unpacking binary data
-    import zipfile  # For ZIP file validation
-    from io import BytesIO  # For in-memory file handling
-except ImportError as e:
-    print(f"Failed to import required modules: {e}")
-    sys.exit(1)
-
-# Configure logging to file for debugging
-logging.basicConfig(
-    level=logging.DEBUG,  # Log all debug messages
-    format='%(asctime)s - %(levelname)s - %(message)s',  # Timestamp, level, message
-    handlers=[logging.FileHandler("file_recovery_debug.log")]  # Save to file
-)
-logging.info("Logging initialized")
+if multiprocessing.current_process().name == 'MainProcess':  # Worker processes attach to the parent's queue
+    LogUtils.start()
+    logging.info("Logging initialized")
 
 # Utility class for system-level operations
 class SystemUtils:
@@ -62,6 +148,8 @@ class SystemUtils:
     @staticmethod
     def get_drives():
         """Retrieve a list of available drives on the system."""
+        if win32api is None:
+            return []  # Live drives are only listed on Windows with pywin32
         try:
             drives = win32api.GetLogicalDriveStrings()
             drive_list = drives.split('\0')[:-1]  # Split and remove trailing empty string
@@ -71,6 +159,452 @@ class SystemUtils:
             logging.error(f"Get drives failed: {e}")
             return []
 
+# Positional reader over a raw volume or disk image, safe to share across threads
+class BlockDevice:
+    DIRECT_ALIGNMENT = 4096  # Smallest offset, length and address alignment used for direct reads
+    BOUNCE_SIZE = 4 * 1024 * 1024  # Aligned bytes per direct read into a caller's unaligned buffer
+
+    def __init__(self, source):
+        """Initialize the device for a drive root or image path."""
+        self.source = source
+        self.size = 0  # Device size in bytes
+        self.direct = False  # Reads bypass the OS cache and must be aligned
+        self.alignment = 1  # Alignment required by reads on this device
+        self.local = threading.local()  # Aligned bounce buffer of each reading thread
+
+    @staticmethod
+    def open(source, direct=False):
+        """Open a drive root (e.g. 'C:\\') as a raw volume, anything else as an image file.
+
+        With direct set, reads bypass the OS cache where the platform allows it.
+        """
+        if os.path.isdir(source):
+            return WindowsVolumeDevice(source, direct)
+        return ImageFileDevice(source, direct)
+
+    @staticmethod
+    def allocate(size):
+        """Return a page-aligned writable buffer of size bytes for direct reads."""
+        return mmap.mmap(-1, size)
+
+    def enable_direct(self):
+        """Mark the device as read uncached, aligning reads to whole clusters (and so whole sectors).
+
+        Reads are first aligned to DIRECT_ALIGNMENT, which covers any logical sector size; the boot sector
+        giving the cluster size is read that way, then larger clusters widen the alignment.
+        """
+        self.direct = True
+        self.alignment = self.DIRECT_ALIGNMENT
+        cluster_size = self.get_cluster_size()  # Boot sector read under the sector alignment above
+        if cluster_size > self.alignment:
+            self.alignment = cluster_size
+
+    def is_aligned(self, offset, buffer):
+        """Whether a direct read of buffer at offset needs no bounce buffer."""
+        if offset % self.alignment or len(buffer) % self.alignment:
+            return False
+        return not len(buffer) or ctypes.addressof(ctypes.c_char.from_buffer(buffer)) % self.alignment == 0
+
+    def read_aligned(self, offset, buffer):
+        """Read into an unaligned buffer through this thread's reused aligned bounce buffer."""
+        bounce = getattr(self.local, 'bounce', None)
+        if bounce is None:
+            bounce = self.local.bounce = self.allocate(self.BOUNCE_SIZE)
+        target = memoryview(buffer).cast('B')
+        done = 0
+        while done < len(target):
+            start = offset + done
+            skip = start % self.alignment
+            length = min(len(bounce), -(-(skip + len(target) - done) // self.alignment) * self.alignment)
+            with memoryview(bounce) as view:
+                count = self.readinto_at(start - skip, view[:length])
+                copied = max(min(count - skip, len(target) - done), 0)
+                target[done:done + copied] = view[skip:skip + copied]
+            done += copied
+            if count < length:  # End of the device
+                break
+        return done
+
+    def readinto_at(self, offset, buffer):
+        """Fill buffer with bytes starting at offset; return the number of bytes read."""
+        raise NotImplementedError
+
+    def read_at(self, offset, length):
+        """Read up to length bytes starting at offset."""
+        buffer = bytearray(max(length, 0))
+        count = self.readinto_at(offset, buffer)
+        return bytes(memoryview(buffer)[:count])
+
+    def get_cluster_size(self):
+        """Read the cluster size from the NTFS/FAT32 boot sector."""
+        boot_sector = self.read_at(0, 512)
+        if boot_sector[3:8] == b'NTFS ' or boot_sector[82:90] == b'FAT32   ':
+            bytes_per_sector = struct.unpack('<H', boot_sector[11:13])[0]
+            if bytes_per_sector and boot_sector[13]:
+                return bytes_per_sector * boot_sector[13]
+        return 4096  # Default to 4KB if unknown
+
+    def close(self):
+        """Release the underlying handle."""
+
+# Raw Windows volume read with OVERLAPPED offsets, so no shared file pointer is moved
+class WindowsVolumeDevice(BlockDevice):
+    ERROR_HANDLE_EOF = 38
+
+    def __init__(self, drive, direct=False):
+        """Open the volume behind a drive root for raw access, bypassing the OS cache if direct is set."""
+        super().__init__(drive)
+        if win32file is None:
+            raise RuntimeError("pywin32 is required to scan live drives")
+        self.handle = win32file.CreateFile(
+            f"\\\\.\\{drive[:2]}",  # Physical drive path (e.g., \\.\C:)
+            win32file.GENERIC_READ,
+            win32file.FILE_SHARE_READ | win32file.FILE_SHARE_WRITE,
+            None,
+            win32file.OPEN_EXISTING,
+            win32file.FILE_FLAG_NO_BUFFERING if direct else 0,
+            None
+        )
+        self.size = win32file.GetDiskFreeSpaceEx(drive)[1]  # Total drive size
+        if direct:
+            self.enable_direct()
+
+    def readinto_at(self, offset, buffer):
+        """Read into buffer at an absolute offset in a single positional ReadFile call."""
+        if self.direct and not self.is_aligned(offset, buffer):
+            return self.read_aligned(offset, buffer)
+        overlapped = pywintypes.OVERLAPPED()
+        overlapped.Offset = offset & 0xFFFFFFFF
+        overlapped.OffsetHigh = offset >> 32
+        try:
+            win32file.ReadFile(self.handle, buffer, overlapped)
+            return win32file.GetOverlappedResult(self.handle, overlapped, True)
+        except pywintypes.error as e:
+            if e.winerror == self.ERROR_HANDLE_EOF:
+                return 0
+            raise
+
+    def get_cluster_size(self):
+        """Get the cluster size reported by the volume."""
+        try:
+            sectors_per_cluster, bytes_per_sector, _, _ = win32file.GetDiskFreeSpace(self.source)
+            return sectors_per_cluster * bytes_per_sector
+        except Exception:
+            return super().get_cluster_size()
+
+    def close(self):
+        """Close the volume handle."""
+        if self.handle:
+            win32file.CloseHandle(self.handle)
+            self.handle = None
+
+# Raw disk image (.img/.dd) or block device read with os.pread, or mmap where pread is missing
+class ImageFileDevice(BlockDevice):
+    def __init__(self, path, direct=False):
+        """Open an image file or block device read-only, with O_DIRECT if direct is set and supported."""
+        super().__init__(path)
+        flags = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+        self.fd = None
+        if direct and hasattr(os, 'O_DIRECT') and hasattr(os, 'preadv'):
+            try:
+                self.fd = os.open(path, flags | os.O_DIRECT)
+                self.direct = True
+            except OSError as e:  # e.g. tmpfs does not support O_DIRECT
+                logging.warning(f"Direct I/O unavailable for {path}, reading through the OS cache: {e}")
+        elif direct:
+            logging.warning(f"Direct I/O is not supported for image files on this platform: {path}")
+        if self.fd is None:
+            self.fd = os.open(path, flags)
+        self.size = os.lseek(self.fd, 0, os.SEEK_END)  # st_size is 0 for block devices
+        self.map = None
+        if not hasattr(os, 'preadv') and self.size:
+            self.map = mmap.mmap(self.fd, 0, access=mmap.ACCESS_READ)
+        if self.direct:
+            self.enable_direct()
+
+    def read_at(self, offset, length):
+        """Read up to length bytes starting at offset without an intermediate buffer."""
+        if self.map is not None:
+            return self.map[offset:offset + length]
+        if self.direct:
+            return super().read_at(offset, length)  # Through an aligned buffer
+        return os.pread(self.fd, length, offset)
+
+    def readinto_at(self, offset, buffer):
+        """Read into buffer at an absolute offset."""
+        if self.direct and not self.is_aligned(offset, buffer):
+            return self.read_aligned(offset, buffer)
+        if self.map is not None:
+            chunk = self.map[offset:offset + len(buffer)]
+            memoryview(buffer)[:len(chunk)] = chunk
+            return len(chunk)
+        return os.preadv(self.fd, [buffer], offset)
+
+    def close(self):
+        """Close the image file."""
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+# Block device wrapper charging the size and latency of every read to the scan's metrics
+class MeteredDevice(BlockDevice):
+    def __init__(self, device, metrics):
+        """Wrap an open device, recording its reads in a ScanMetrics."""
+        super().__init__(device.source)
+        self.device = device
+        self.metrics = metrics
+        self.size = device.size
+
+    def readinto_at(self, offset, buffer):
+        """Read into buffer through the wrapped device, timing the read."""
+        start = time.perf_counter()
+        count = self.device.readinto_at(offset, buffer)
+        self.metrics.record_read(count, time.perf_counter() - start)
+        return count
+
+    def read_at(self, offset, length):
+        """Read through the wrapped device, timing the read."""
+        start = time.perf_counter()
+        data = self.device.read_at(offset, length)
+        self.metrics.record_read(len(data), time.perf_counter() - start)
+        return data
+
+    def get_cluster_size(self):
+        """Get the cluster size of the wrapped device."""
+        return self.device.get_cluster_size()
+
+    def close(self):
+        """Close the wrapped device."""
+        self.device.close()
+
+# Budget for the bytes held by carving buffers and carved candidates, shared by a scan's threads and worker processes
+class MemoryGovernor:
+    UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+    MIN_BUFFER = 4 * 1024 * 1024  # Smallest carving buffer a budget shrinks buffers to
+    WAIT_STEP = 0.1  # Seconds between budget checks while a producer is held back
+
+    def __init__(self, budget=None, context=multiprocessing):
+        """Start with nothing in use; budget is in bytes, None for no limit."""
+        self.budget = budget
+        self.in_use = context.Value('q', 0)  # Bytes held now, across processes; its lock also guards peak
+        self.peak = context.Value('q', 0, lock=False)  # Most bytes held at once
+
+    @staticmethod
+    def parse_size(text):
+        """Parse a size such as 2G, 512M, 1.5GB or a plain byte count into bytes."""
+        match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)B?\s*', str(text).upper())
+        if not match:
+            raise ValueError(f"Invalid size: {text}")
+        return int(float(match.group(1)) * MemoryGovernor.UNITS[match.group(2)])
+
+    def add(self, size):
+        """Count size bytes as held, whatever the budget; for memory a consumer cannot do without."""
+        with self.in_use.get_lock():
+            self.in_use.value += size
+            self.peak.value = max(self.peak.value, self.in_use.value)
+
+    def try_acquire(self, size):
+        """Count size bytes as held if they fit the budget; return whether they did."""
+        with self.in_use.get_lock():
+            if size and self.budget is not None and self.in_use.value + size > self.budget:
+                return False
+            self.in_use.value += size
+            self.peak.value = max(self.peak.value, self.in_use.value)
+            return True
+
+    def acquire(self, size, should_stop=None):
+        """Count size bytes as held, waiting while they would take the scan over its budget; return the seconds waited.
+
+        Stops waiting, and counts them anyway, once should_stop() is true.
+        """
+        if self.try_acquire(size):
+            return 0.0
+        started = time.perf_counter()
+        while not self.try_acquire(size):
+            if should_stop is not None and should_stop():
+                self.add(size)
+                break
+            time.sleep(self.WAIT_STEP)
+        return time.perf_counter() - started
+
+    def release(self, size):
+        """Return size bytes to the budget."""
+        if size:
+            with self.in_use.get_lock():
+                self.in_use.value -= size
+
+    def over_budget(self):
+        """Whether more bytes are held than the budget allows."""
+        return self.budget is not None and self.in_use.value > self.budget
+
+    def usage(self):
+        """Return the budget, bytes in use and peak bytes, ready for JSON."""
+        with self.in_use.get_lock():
+            return {'budget': self.budget, 'in_use': self.in_use.value, 'peak': self.peak.value}
+
+    @staticmethod
+    def need(workers, buffer_size, read_ahead, candidate_size, overlap=0):
+        """Return the most bytes workers can hold at once: their buffers, each with an overlap window, and a candidate each."""
+        return workers * ((read_ahead + 1) * (buffer_size + overlap) + candidate_size)
+
+    def fit(self, workers, buffer_size, read_ahead, candidate_size, min_workers=1, overlap=0):
+        """Return (workers, buffer_size, read_ahead) shrunk until every worker's buffers and candidate fit the budget.
+
+        Read-ahead goes first, then buffer size, then workers; the smallest setting is returned if even it does not fit.
+        """
+        def need():
+            return self.need(workers, buffer_size, read_ahead, candidate_size, overlap)
+
+        while self.budget is not None and need() > self.budget:
+            if read_ahead > 1:
+                read_ahead -= 1
+            elif buffer_size > self.MIN_BUFFER:
+                buffer_size = max(buffer_size // 2, self.MIN_BUFFER)
+            elif read_ahead:
+                read_ahead = 0
+            elif workers > min_workers:
+                workers -= 1
+            else:
+                break
+        return workers, buffer_size, read_ahead
+
+# Reads planned chunks on a background thread into a small pool of reused buffers, ahead of the carver
+class ReadAhead:
+    def __init__(self, device, plan, buffer_size, depth=2, metrics=None, memory=None):
+        """Start reading the chunks of plan, at most depth buffers ahead of the consumer.
+
+        `plan` yields tuples starting with (offset, length); length must not exceed buffer_size.
+        A depth of 0 reads each chunk when it is asked for, on the calling thread.
+        Buffers are allocated as needed: one always, the others only while `memory` has room.
+        """
+        self.device = device
+        self.plan = plan
+        self.depth = depth
+        self.buffer_size = buffer_size
+        self.metrics = metrics  # ScanMetrics charged with the time spent waiting for a buffer
+        self.stage = metrics.stage_counters() if metrics is not None else None  # Stage the prefetch reads belong to
+        self.memory = memory or MemoryGovernor()  # Budget buffers are allocated against
+        self.free = queue.Queue()  # Buffers ready to be filled
+        self.filled = queue.Queue()  # (plan item, buffer or None) in plan order; None ends the plan
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()  # Guards allocated, changed by both threads
+        self.allocated = 1  # Buffers in existence: one being carved plus up to depth being filled
+        self.memory.add(buffer_size)
+        self.free.put(bytearray(buffer_size))
+        self.thread = None
+        if depth > 0:
+            self.thread = threading.Thread(target=self.fill, name="ReadAhead", daemon=True)
+            self.thread.start()
+
+    def read(self, item, buffer):
+        """Read one planned chunk into buffer, resized to the bytes read; return None if the read failed."""
+        offset, length = item[0], item[1]
+        try:
+            if len(buffer) < length:
+                buffer.extend(bytes(length - len(buffer)))
+            with memoryview(buffer) as view:
+                count = self.device.readinto_at(offset, view[:length])
+            del buffer[count:]
+            return buffer
+        except Exception as e:
+            logging.error(f"Read-ahead failed at {offset}: {e}")
+            return None  # The consumer reads the chunk itself and handles the error
+
+    def take_buffer(self):
+        """Return a buffer to fill: a new one while depth and the budget allow, else one handed back; None once closed.
+
+        Time held back by the budget is charged to memory_wait.
+        """
+        started = None  # When the budget first held back a new buffer
+        while not self.stopped.is_set():
+            buffer = None
+            with self.lock:
+                if self.free.empty() and self.allocated <= self.depth:
+                    if self.memory.try_acquire(self.buffer_size):
+                        self.allocated += 1
+                        buffer = bytearray(self.buffer_size)
+                    elif started is None:
+                        started = time.perf_counter()
+            if buffer is None:
+                try:
+                    buffer = self.free.get(timeout=MemoryGovernor.WAIT_STEP)
+                except queue.Empty:
+                    continue
+            if started is not None and self.metrics is not None:
+                self.metrics.add('memory_wait', time.perf_counter() - started)
+            return buffer
+        return None
+
+    def give_back(self, buffer):
+        """Return a carved buffer to the pool, or free it while the scan is over its memory budget."""
+        with self.lock:
+            if self.allocated > 1 and self.memory.over_budget():
+                self.allocated -= 1
+                self.memory.release(self.buffer_size)
+                return
+        self.free.put(buffer)
+
+    def fill(self):
+        """Prefetch thread: fill free buffers in plan order until the plan ends or the reader is closed."""
+        if self.metrics is not None:
+            self.metrics.bind(self.stage)
+        try:
+            for item in self.plan:
+                buffer = self.take_buffer()
+                if buffer is None:
+                    break
+                data = self.read(item, buffer)
+                if data is None:
+                    self.free.put(buffer)
+                self.filled.put((item, data))
+        except Exception as e:
+            logging.error(f"Read-ahead planning failed: {traceback.format_exc()}")
+        finally:
+            self.filled.put(None)
+
+    def __iter__(self):
+        """Yield (plan item, data) pairs; data is reused once the next pair is asked for, and None if its read failed."""
+        if self.thread is None:
+            buffer = self.free.get()
+            for item in self.plan:
+                started = time.perf_counter()
+                data = self.read(item, buffer)
+                if self.metrics is not None:
+                    self.metrics.add('read_wait', time.perf_counter() - started)
+                yield item, data
+            return
+        previous = None
+        while True:
+            if previous is not None:
+                self.give_back(previous)
+                previous = None
+            started = time.perf_counter()
+            entry = self.filled.get()
+            if self.metrics is not None:
+                self.metrics.add('read_wait', time.perf_counter() - started)
+            if entry is None:
+                return
+            previous = entry[1]
+            yield entry
+
+    def close(self):
+        """Stop prefetching, wait for the thread to finish and return the buffers to the budget."""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        with self.lock:
+            self.memory.release(self.allocated * self.buffer_size)
+            self.allocated = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
 # Class defining file signatures for recovery
 class FileSignatures:
     # Dictionary of file types with their start/end signatures and size limits
@@ -87,75 +621,1791 @@ class FileSignatures:
         'wav': {'start': [bytes.fromhex('52494646')], 'end': None, 'max_size': 20 * 1024 * 1024, 'avg_size': 5 * 1024 * 1024},
         'avi': {'start': [bytes.fromhex('52494646')], 'end': None, 'max_size': 50 * 1024 * 1024, 'avg_size': 10 * 1024 * 1024},
     }
+    # Types sharing a start signature are told apart by their content
+    OFFICE_MARKER = b'[Content_Types].xml'  # Entry present in every Office Open XML package
+    ZIP_SUBTYPES = ((b'word/', 'docx'), (b'xl/', 'xlsx'))  # Office entry name prefix -> type; other archives are zip
+    RIFF_SUBTYPES = {b'WAVE': 'wav', b'AVI ': 'avi'}  # RIFF form type -> type
+
+    @staticmethod
+    def zip_subtype(names):
+        """Return docx, xlsx or zip for a ZIP archive from its entry names."""
+        if FileSignatures.OFFICE_MARKER in names:
+            for prefix, file_type in FileSignatures.ZIP_SUBTYPES:
+                if any(name.startswith(prefix) for name in names):
+                    return file_type
+        return 'zip'
+
+# Stateless content checks, repairs and extent helpers shared by the scanner and the read-back path
+class FileUtils:
+    TEXT_SAMPLE = 16 * 1024  # Bytes (half from the head, half from the tail) that decide whether data is text
+    TEXT_BYTES = bytes(range(0x20, 0x7F)) + b'\t\n\r'  # Printable ASCII and whitespace
+    CONTROL_BYTES = bytes(range(0x80)).translate(None, TEXT_BYTES)  # ASCII bytes that are not printable
+    TEXT_VERDICTS_MAX = 4  # Recent bytes objects whose text verdict is kept (they are held until evicted)
+    text_verdicts = {}  # id(data) -> (data, verdict)
+
+    @staticmethod
+    def add_extent(extents, offset, length):
+        """Append an (offset, length) extent, merging it into the last one when contiguous."""
+        if length <= 0:
+            return
+        if extents and extents[-1][0] + extents[-1][1] == offset:
+            extents[-1] = (extents[-1][0], extents[-1][1] + length)
+        else:
+            extents.append((offset, length))
+
+    @staticmethod
+    def reconstruct_file(file_type, data):
+        """Reconstruct a file if it’s incomplete or corrupted."""
+        state = "Good" if FileUtils.validate_file(file_type, data) else "Corrupted"
+        try:
+            if file_type == 'jpg' and not data.endswith(FileSignatures.SIGNATURES['jpg']['end']):
+                data += FileSignatures.SIGNATURES['jpg']['end']
+                state = "Reconstructed"
+            elif file_type == 'png' and not data.endswith(FileSignatures.SIGNATURES['png']['end']):
+                data += FileSignatures.SIGNATURES['png']['end']
+                state = "Reconstructed"
+            elif file_type == 'pdf' and b'%%EOF' not in data[-1024:]:
+                data += b'\n%%EOF'
+                state = "Reconstructed"
+            elif file_type in ['docx', 'zip', 'xlsx'] and not zipfile.is_zipfile(BytesIO(data)):
+                end = data.rfind(b'PK\x05\x06')
+                if end != -1:
+                    data = data[:end + 22]
+                    state = "Reconstructed"
+            elif file_type == 'txt' and FileUtils.is_readable_text(data):
+                if data.isascii():  # Dropping the non-printable bytes cleans ASCII without decoding it
+                    data = data.translate(None, FileUtils.CONTROL_BYTES)
+                    state = "Reconstructed" if len(data) > 0 else "Corrupted"
+                else:
+                    encoding = detect(data[:1024])['encoding'] or 'utf-8'
+                    decoded = data.decode(encoding, errors='ignore')
+                    cleaned = ''.join(c for c in decoded if c.isprintable() or c in '\n\r\t')
+                    data = cleaned.encode(encoding, errors='ignore')
+                    state = "Reconstructed" if len(cleaned) > 0 else "Corrupted"
+            return data, state
+        except Exception as e:
+            logging.error(f"Reconstruction failed for {file_type}: {traceback.format_exc()}")
+            return data, "Corrupted"
+
+    @staticmethod
+    def reconstruct_fragments(file_type, fragments):
+        """Reconstruct a file from multiple fragments."""
+        try:
+            combined_data = bytearray()
+            for fragment_data, _ in fragments:
+                combined_data.extend(fragment_data)
+            if not combined_data or (file_type == 'txt' and not FileUtils.is_readable_text(combined_data)):
+                return bytearray(), "Corrupted"
+            repaired_data, state = FileUtils.reconstruct_file(file_type, combined_data)
+            return repaired_data, f"Fragmented ({state})"
+        except Exception as e:
+            logging.error(f"Fragment reconstruction failed for {file_type}: {traceback.format_exc()}")
+            return combined_data, "Corrupted"
+
+    @staticmethod
+    def validate_file(file_type, data):
+        """Validate if the file data matches its type."""
+        try:
+            if file_type == 'jpg':
+                return data.startswith(b'\xFF\xD8') and data.endswith(b'\xFF\xD9')
+            elif file_type == 'png':
+                return data.startswith(b'\x89\x50\x4E\x47') and data.endswith(b'\x49\x45\x4E\x44\xAE\x42\x60\x82')
+            elif file_type == 'pdf':
+                return data.startswith(b'%PDF') and b'%%EOF' in data[-1024:]
+            elif file_type in ['docx', 'zip', 'xlsx']:
+                return zipfile.is_zipfile(BytesIO(data))
+            elif file_type == 'gif':
+                return (data.startswith(b'GIF89a') or data.startswith(b'GIF87a')) and data.endswith(b'\x00\x3B')
+            elif file_type == 'txt':
+                return FileUtils.is_readable_text(data)
+            return len(data) > 0
+        except Exception:
+            return False
+
+    @staticmethod
+    def guess_file_type(header, extension=None):
+        """Guess file type based on header bytes.
+
+        Among types sharing the signature, a RIFF form type decides first, then the file's extension.
+        """
+        matches = [file_type for file_type, sig in FileSignatures.SIGNATURES.items()
+                   if any(header.startswith(start_sig) for start_sig in sig['start'])]
+        if len(matches) > 1:
+            subtype = FileSignatures.RIFF_SUBTYPES.get(bytes(header[8:12]))
+            if subtype in matches:
+                return subtype
+            if extension in matches:
+                return extension
+        return matches[0] if matches else None
+
+    @staticmethod
+    def is_readable_text(data):
+        """Check if data is readable text, remembering the verdict for the same bytes object."""
+        cacheable = isinstance(data, bytes)  # Only immutable data can keep its verdict
+        if cacheable:
+            cached = FileUtils.text_verdicts.get(id(data))
+            if cached is not None and cached[0] is data:
+                return cached[1]
+        verdict = FileUtils.classify_text(data)
+        if cacheable:
+            if len(FileUtils.text_verdicts) >= FileUtils.TEXT_VERDICTS_MAX:
+                FileUtils.text_verdicts.clear()
+            FileUtils.text_verdicts[id(data)] = (data, verdict)
+        return verdict
+
+    @staticmethod
+    def classify_text(data):
+        """Decide from a bounded sample whether data is at least 70% printable text.
+
+        Printable ASCII, and ASCII or UTF-8 without NULs, are decided from byte classes alone;
+        charset detection only runs on samples that are neither (e.g. UTF-16 or legacy code pages).
+        """
+        try:
+            if not data:
+                return False
+            half = FileUtils.TEXT_SAMPLE // 2
+            sample = bytes(data) if len(data) <= FileUtils.TEXT_SAMPLE else bytes(data[:half]) + bytes(data[-half:])
+            other = sample.translate(None, FileUtils.TEXT_BYTES)  # Control and non-ASCII bytes
+            if not other:
+                return bool(sample.strip())
+            if b'\x00' not in other:  # NULs point to UTF-16 or binary data; leave those to detection
+                if other.isascii():
+                    return bool(sample.strip()) and len(other) <= 0.3 * len(sample)
+                text = sample.decode('utf-8', errors='ignore')
+                if len(sample) - len(text.encode('utf-8')) <= 6:  # Valid UTF-8 up to characters cut at the seams
+                    return FileUtils.printable_ratio(text) >= 0.7
+            encoding = detect(sample[:1024])['encoding'] or 'utf-8'
+            return FileUtils.printable_ratio(sample.decode(encoding, errors='ignore')) >= 0.7  # At least 70% printable
+        except Exception:
+            return False
+
+    @staticmethod
+    def printable_ratio(text):
+        """Return the share of printable characters in text, or 0 if it is blank."""
+        if not text.strip():
+            return 0.0
+        return sum(c.isprintable() or c in '\n\r\t' for c in text) / len(text)
+
+    @staticmethod
+    def is_unreadable_gibberish(data):
+        """Check if data is unreadable noise."""
+        if not data:
+            return True
+        counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+        return np.count_nonzero(counts) < ClusterClassifier.MIN_DISTINCT  # Too few unique bytes = gibberish
+
+    @staticmethod
+    def content_hash(data):
+        """Return a short BLAKE2 hex digest of recovered file bytes."""
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+# Reads found-file bytes back from their source extents, caching recent previews
+class FileRecordReader:
+    def __init__(self, cache_bytes=64 * 1024 * 1024, cache_items=32):
+        """Initialize an empty reader with a bounded LRU cache."""
+        self.devices = {}  # Source drive/image -> open BlockDevice
+        self.cache = OrderedDict()  # Record key -> bytes, least recently used first
+        self.cache_bytes = cache_bytes  # Max total bytes held in the cache
+        self.cache_items = cache_items  # Max records held in the cache
+        self.cached_bytes = 0
+        self.lock = threading.Lock()
+
+    def read(self, file_info, cache=True):
+        """Return the bytes of a found file, reading its extents from the source on demand."""
+        key = (file_info['source'], tuple(file_info['extents']), file_info['type'], file_info['repair'])
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+        device = self.device(file_info['source'])
+        data = b''.join(device.read_at(offset, length) for offset, length in file_info['extents'])
+        if file_info['repair']:
+            data = bytes(FileUtils.reconstruct_file(file_info['type'], data)[0])
+        if cache and len(data) <= self.cache_bytes:
+            with self.lock:
+                if key not in self.cache:
+                    self.cache[key] = data
+                    self.cached_bytes += len(data)
+                while len(self.cache) > self.cache_items or self.cached_bytes > self.cache_bytes:
+                    _, evicted = self.cache.popitem(last=False)
+                    self.cached_bytes -= len(evicted)
+        return data
+
+    def device(self, source):
+        """Return the open device for a source, opening it on first use."""
+        with self.lock:
+            device = self.devices.get(source)
+            if device is None:
+                device = self.devices[source] = BlockDevice.open(source)
+            return device
+
+    def iter_chunks(self, file_info, chunk_size):
+        """Yield the bytes of a found file in chunks of at most chunk_size, bypassing the cache.
+
+        Files flagged for repair are reconstructed whole first, since repairs look at the complete file.
+        """
+        if file_info['repair']:
+            data = self.read(file_info, cache=False)
+            for start in range(0, len(data), chunk_size):
+                yield data[start:start + chunk_size]
+            return
+        device = self.device(file_info['source'])
+        buffer = bytearray(chunk_size)
+        for offset, length in file_info['extents']:
+            end = offset + length
+            while offset < end:
+                view = memoryview(buffer)[:min(chunk_size, end - offset)]
+                count = device.readinto_at(offset, view)
+                if count <= 0:
+                    return  # Source is shorter than the recorded extents
+                yield view[:count]
+                offset += count
+
+    def close(self):
+        """Drop cached data and close every open source device."""
+        with self.lock:
+            self.cache.clear()
+            self.cached_bytes = 0
+            for device in self.devices.values():
+                device.close()
+            self.devices.clear()
+
+# Restores found files into a folder from a pool of threads, streaming each one from its source extents
+class RestoreEngine:
+    CHUNK_SIZE = 4 * 1024 * 1024  # Bytes read and written per step
+    PROGRESS_INTERVAL = 0.2  # Seconds between progress callbacks
+
+    def __init__(self, destination, workers=4, on_progress=None, on_file_restored=None, stop_event=None):
+        """Set up a restore into destination with a pool of workers threads."""
+        self.destination = destination  # Folder receiving restored files
+        self.workers = max(1, workers)
+        self.on_progress = on_progress or (lambda done, total, bytes_written, elapsed: None)
+        self.on_file_restored = on_file_restored or (lambda file_info, path, error: None)  # path None on failure
+        self.stop_event = stop_event or threading.Event()
+        self.reader = FileRecordReader()
+        self.lock = threading.Lock()
+        self.total = 0  # Files to restore
+        self.done = 0  # Files finished, restored or failed
+        self.restored = 0
+        self.bytes_written = 0
+        self.start_time = None
+        self.last_progress = 0.0
+
+    def stop(self):
+        """Cancel the restore; files being written are removed."""
+        self.stop_event.set()
+
+    def run(self, file_infos):
+        """Restore every file; return the number restored."""
+        file_infos = list(file_infos)
+        self.total = len(file_infos)
+        self.start_time = time.monotonic()
+        os.makedirs(self.destination, exist_ok=True)
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                try:
+                    for _ in executor.map(self.restore_file, file_infos):
+                        pass
+                except BaseException:
+                    self.stop()  # Interrupted: running copies stop at their next chunk
+                    raise
+        finally:
+            self.reader.close()
+            self.report_progress(force=True)
+        logging.info(f"Restored {self.restored} of {self.total} files ({self.bytes_written:,} bytes) to {self.destination}"
+                     f"{' (cancelled)' if self.stop_event.is_set() else ''}")
+        return self.restored
+
+    def claim_path(self, name):
+        """Create an empty destination file, numbering the name instead of overwriting an existing file."""
+        name = os.path.basename(name.replace('\\', '/')) or "recovered"  # Never write outside the destination
+        stem, ext = os.path.splitext(name)
+        number = 0
+        while True:
+            path = os.path.join(self.destination, f"{stem} ({number}){ext}" if number else name)
+            try:
+                return path, os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0))
+            except FileExistsError:
+                number += 1
+
+    def restore_file(self, file_info):
+        """Copy one file from its source extents to the destination in bounded chunks."""
+        if self.stop_event.is_set():
+            return
+        path = None
+        try:
+            path, fd = self.claim_path(file_info['name'])
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in self.reader.iter_chunks(file_info, self.CHUNK_SIZE):
+                    if self.stop_event.is_set():
+                        break
+                    f.write(chunk)
+                    with self.lock:
+                        self.bytes_written += len(chunk)
+            if self.stop_event.is_set():
+                os.remove(path)  # No half-written files are left behind
+                return
+            with self.lock:
+                self.restored += 1
+            self.on_file_restored(file_info, path, None)
+        except Exception as e:
+            logging.error(f"Restore failed for {file_info['name']}: {traceback.format_exc()}")
+            if path and os.path.exists(path):
+                os.remove(path)
+            self.on_file_restored(file_info, None, str(e))
+        finally:
+            with self.lock:
+                self.done += 1
+            self.report_progress()
+
+    def report_progress(self, force=False):
+        """Pass files done, bytes written and elapsed time to the callback, a few times per second."""
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_progress < self.PROGRESS_INTERVAL:
+                return
+            self.last_progress = now
+            done, bytes_written = self.done, self.bytes_written
+        self.on_progress(done, self.total, bytes_written, now - (self.start_time or now))
+
+# Compiled matcher that finds every start signature in a single pass over a buffer
+class SignatureMatcher:
+    FILL_BYTES = (0x00, 0xFF)  # Bytes that fill zeroed/erased regions
+
+    def __init__(self, signatures):
+        """Build the anchor pattern and first-byte dispatch table from a signature map."""
+        owners = {}  # Start signature -> file types sharing it (e.g. PK for docx/zip/xlsx)
+        for file_type, sig in signatures.items():
+            for start_sig in sig['start']:
+                owners.setdefault(start_sig, []).append(file_type)
+
+        # Anchor each signature at its first non-fill byte so the regex prefix scan
+        # does not stall on long runs of 0x00/0xFF (e.g. mp4 anchors on b'\x18ftyp').
+        # Signatures left with a single-byte anchor (b'\xFF\xFE') would hit on every
+        # such byte of random data, so they are located with a plain find() instead.
+        self.dispatch = {}  # Anchor first byte -> [(shift, start signature, file types)]
+        self.short_signatures = []  # [(start signature, file types)] searched with find()
+        anchors = set()
+        for start_sig, file_types in owners.items():
+            shift = next((i for i, b in enumerate(start_sig) if b not in self.FILL_BYTES), 0)
+            if len(start_sig) - shift < 2:
+                self.short_signatures.append((start_sig, tuple(file_types)))
+                continue
+            anchors.add(start_sig[shift:])
+            self.dispatch.setdefault(start_sig[shift], []).append((shift, start_sig, tuple(file_types)))
+        self.pattern = re.compile(b'|'.join(re.escape(a) for a in sorted(anchors, key=len, reverse=True)))
+        self.max_length = max(len(start_sig) for start_sig in owners)  # Longest start signature
+
+    def find_all(self, data, start=0, end=None):
+        """Return every (position, start signature, file types) hit in data, in offset order."""
+        end = len(data) if end is None else end
+        hits = []
+        pos = start
+        while (match := self.pattern.search(data, pos, end)) is not None:
+            anchor_pos = match.start()
+            for shift, start_sig, file_types in self.dispatch[data[anchor_pos]]:
+                sig_pos = anchor_pos - shift
+                if sig_pos >= start and sig_pos + len(start_sig) <= end and data.startswith(start_sig, sig_pos):
+                    hits.append((sig_pos, start_sig, file_types))
+            pos = anchor_pos + 1  # Step one byte so overlapping signatures are not skipped
+        for start_sig, file_types in self.short_signatures:
+            pos = start
+            while (pos := data.find(start_sig, pos, end)) != -1:
+                hits.append((pos, start_sig, file_types))
+                pos += 1
+        hits.sort(key=lambda hit: hit[0])
+        return hits
+
+# Walks a candidate's internal structure to validate it and find its exact end in one pass
+class StructureWalker:
+    WALKERS = {'jpg': 'walk_jpeg', 'png': 'walk_png', 'pdf': 'walk_pdf', 'docx': 'walk_zip', 'zip': 'walk_zip',
+               'xlsx': 'walk_zip', 'mp4': 'walk_bmff', 'wav': 'walk_riff', 'avi': 'walk_riff'}  # File type -> walker
+    UNBOUNDED = ('mp4', 'wav', 'avi')  # No footer: a broken structure leaves no end to carve to
+    SCAN_SIZE = 64 * 1024  # Bytes read per step when scanning for a marker
+    CRC_BLOCK = 1024 * 1024  # Bytes of a PNG chunk checksummed per read
+    PNG_HEADER = b'\x89PNG\r\n\x1a\n'
+    ZIP_RECORDS = (b'\x03\x04', b'\x01\x02', b'\x07\x08', b'\x05\x06', b'\x06\x06', b'\x06\x07')  # After b'PK'
+    BMFF_BOXES = {b'ftyp', b'styp', b'pdin', b'moov', b'moof', b'mfra', b'mdat', b'meta', b'free', b'skip',
+                  b'wide', b'uuid', b'udta', b'sidx', b'ssix', b'prft', b'emsg', b'pnot'}  # Top-level ISO-BMFF boxes
+    FOURCC = re.compile(b'[ -~]{4}')  # RIFF chunk ids are four printable ASCII characters
+    PDF_STARTXREF = re.compile(rb'startxref\s+(\d+)\s*$')  # Trailer pointer just before %%EOF
+    PDF_SECTION = re.compile(rb'\s*(?:xref|\d+\s+\d+\s+obj)')  # Start of an xref table, xref stream or update
+
+    @staticmethod
+    def identify(file_types, read, limit):
+        """Walk a hit once and return (file type, exact length), telling apart the types sharing its signature.
+
+        `read(pos, size)` returns the bytes at pos from the start of the file. Walkers read
+        headers, plus the bytes they must scan or checksum, and never past limit. The length
+        is None if the structure is broken; the type is None if the content is none of
+        file_types (e.g. a RIFF WEBP image). A broken ZIP keeps the type its readable entries give.
+        """
+        file_type = file_types[0]
+        name = StructureWalker.WALKERS.get(file_type)
+        if name is None:
+            return file_type, None
+        names = []  # ZIP entry names read by the walk
+        try:
+            if name == 'walk_zip':
+                length = StructureWalker.walk_zip(read, limit, names)
+            else:
+                length = getattr(StructureWalker, name)(read, limit)
+        except (struct.error, ValueError):  # Truncated header
+            length = None
+        if name == 'walk_zip':
+            file_type = FileSignatures.zip_subtype(names)
+        elif name == 'walk_riff':
+            file_type = FileSignatures.RIFF_SUBTYPES.get(bytes(read(8, 4)))
+        return (file_type, length) if file_type in file_types else (None, None)
+
+    @staticmethod
+    def scan(read, pattern, pos, limit):
+        """Return the position of the next pattern at or after pos, reading SCAN_SIZE bytes at a time."""
+        while pos < limit:
+            size = min(StructureWalker.SCAN_SIZE, limit - pos)
+            chunk = read(pos, size)
+            found = chunk.find(pattern)
+            if found != -1:
+                return pos + found
+            if len(chunk) < size or len(chunk) < len(pattern):
+                return None
+            pos += len(chunk) - len(pattern) + 1  # Keep a pattern straddling the step boundary
+        return None
+
+    @staticmethod
+    def walk_jpeg(read, limit):
+        """Walk JPEG marker segments, skipping entropy-coded scans, up to EOI."""
+        if read(0, 2) != b'\xff\xd8':
+            return None
+        pos = 2
+        while pos + 2 <= limit:
+            marker = read(pos, 4)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            code = marker[1]
+            if code == 0xD9:  # EOI
+                return pos + 2
+            if code == 0xFF:  # Fill byte before a marker
+                pos += 1
+                continue
+            if code == 0x01 or 0xD0 <= code <= 0xD7:  # TEM and RSTn carry no length
+                pos += 2
+                continue
+            if code in (0x00, 0xD8) or len(marker) < 4:
+                return None
+            length = int.from_bytes(marker[2:4], 'big')
+            if length < 2:
+                return None
+            pos += 2 + length  # Segments such as an EXIF thumbnail are skipped whole
+            if code == 0xDA:  # SOS: entropy-coded data runs to the next marker
+                pos = StructureWalker.skip_entropy_data(read, pos, limit)
+                if pos is None:
+                    return None
+        return None
+
+    @staticmethod
+    def skip_entropy_data(read, pos, limit):
+        """Return the position of the marker ending entropy-coded data; FF00 and RSTn do not end it."""
+        while pos < limit:
+            chunk = read(pos, min(StructureWalker.SCAN_SIZE, limit - pos))
+            if len(chunk) < 2:
+                return None
+            found = chunk.find(b'\xff')
+            while found != -1 and found + 1 < len(chunk):
+                code = chunk[found + 1]
+                if code not in (0x00, 0xFF) and not 0xD0 <= code <= 0xD7:
+                    return pos + found
+                found = chunk.find(b'\xff', found + 1)
+            pos += len(chunk) - 1 if chunk[-1] == 0xFF else len(chunk)  # Re-read a trailing FF with its code
+        return None
+
+    @staticmethod
+    def walk_png(read, limit):
+        """Walk PNG chunks, checking each CRC, up to IEND."""
+        if read(0, 8) != StructureWalker.PNG_HEADER:
+            return None
+        pos = 8
+        while pos + 12 <= limit:
+            length, chunk_type = struct.unpack('>I4s', read(pos, 8))
+            end = pos + 12 + length
+            if not chunk_type.isalpha() or end > limit:
+                return None
+            crc = zlib.crc32(chunk_type)
+            for start in range(pos + 8, pos + 8 + length, StructureWalker.CRC_BLOCK):
+                crc = zlib.crc32(read(start, min(StructureWalker.CRC_BLOCK, pos + 8 + length - start)), crc)
+            if struct.unpack('>I', read(end - 4, 4))[0] != crc:
+                return None
+            pos = end
+            if chunk_type == b'IEND':
+                return pos
+        return None
+
+    @staticmethod
+    def walk_zip(read, limit, names=None):
+        """Walk ZIP local headers and the central directory; the file ends after the EOCD comment.
+
+        Entry names from the local headers are appended to names as they are read.
+        """
+        pos = 0
+        entries = 0
+        directory = None  # Position of the first central directory header
+        while pos + 4 <= limit:
+            signature = read(pos, 4)
+            if signature == b'PK\x03\x04':  # Local file header
+                flags, size, name_length, extra_length = struct.unpack('<6xH10xI4xHH', read(pos, 30))
+                data = pos + 30 + name_length + extra_length
+                if names is not None:
+                    names.append(bytes(read(pos + 30, name_length)))
+                if flags & 0x08:  # Sizes follow the data in a descriptor: resume at the next record
+                    pos = StructureWalker.next_zip_record(read, data, limit)
+                    if pos is None:
+                        return None
+                else:
+                    if size == 0xFFFFFFFF:
+                        size = StructureWalker.zip64_size(read(pos + 30 + name_length, extra_length))
+                    pos = data + size
+                entries += 1
+            elif signature == b'PK\x07\x08':  # Data descriptor, 16 bytes or 24 with ZIP64 sizes
+                pos += 16 if read(pos + 16, 2) == b'PK' else 24
+            elif signature == b'PK\x01\x02':  # Central directory header
+                directory = pos if directory is None else directory
+                name_length, extra_length, comment_length = struct.unpack('<HHH', read(pos + 28, 6))
+                pos += 46 + name_length + extra_length + comment_length
+            elif signature == b'PK\x06\x06':  # ZIP64 end of central directory record
+                pos += 12 + struct.unpack('<Q', read(pos + 4, 8))[0]
+            elif signature == b'PK\x06\x07':  # ZIP64 end of central directory locator
+                pos += 20
+            elif signature == b'PK\x05\x06':  # End of central directory
+                start, comment_length = struct.unpack('<IH', read(pos + 16, 6))
+                end = pos + 22 + comment_length
+                # The directory offset is relative to the archive start, so a walk begun at a later entry fails here
+                if not entries or end > limit or start not in (directory, 0xFFFFFFFF):
+                    return None
+                return end
+            else:
+                return None
+        return None
+
+    @staticmethod
+    def next_zip_record(read, pos, limit):
+        """Return the position of the next ZIP record signature at or after pos."""
+        while True:
+            pos = StructureWalker.scan(read, b'PK', pos, limit)
+            if pos is None or read(pos + 2, 2) in StructureWalker.ZIP_RECORDS:
+                return pos
+            pos += 1
+
+    @staticmethod
+    def zip64_size(extra):
+        """Return the compressed size from a local header's ZIP64 extra field."""
+        pos = 0
+        while pos + 4 <= len(extra):
+            header_id, size = struct.unpack_from('<HH', extra, pos)
+            if header_id == 0x0001:
+                return struct.unpack_from('<8xQ', extra, pos + 4)[0]  # Uncompressed size comes first
+            pos += 4 + size
+        raise ValueError("ZIP64 sizes missing")
+
+    @staticmethod
+    def walk_riff(read, limit):
+        """Check the RIFF header and walk its chunks; the file is the RIFF size plus the 8-byte header."""
+        header = read(0, 12)
+        if len(header) < 12 or header[:4] != b'RIFF' or not StructureWalker.FOURCC.match(header[8:12]):
+            return None
+        end = 8 + struct.unpack('<I', header[4:8])[0]
+        if end < 12 or end > limit:
+            return None
+        pos = 12
+        while pos + 8 <= end:
+            chunk_id, size = struct.unpack('<4sI', read(pos, 8))
+            if not StructureWalker.FOURCC.match(chunk_id):
+                return None
+            pos += 8 + size + (size & 1)  # Chunks are padded to an even length
+        return end if pos <= end + 1 else None  # Allow a missing pad byte on the last chunk
+
+    @staticmethod
+    def walk_bmff(read, limit):
+        """Walk top-level ISO-BMFF boxes from ftyp; the file ends before the first header that is not a box."""
+        pos = 0
+        media = False
+        while pos + 8 <= limit:
+            header = read(pos, 16)
+            size, box = struct.unpack('>I4s', header[:8])
+            if box not in StructureWalker.BMFF_BOXES or (pos == 0 and box != b'ftyp'):
+                break
+            if size == 1:  # 64-bit size follows the type
+                size = struct.unpack('>Q', header[8:16])[0]
+            if size < 8 or pos + size > limit:  # A size of 0 (box runs to the end) leaves the end unknown
+                return None
+            media = media or box in (b'moov', b'moof', b'mdat')
+            pos += size
+        return pos if media else None
+
+    @staticmethod
+    def walk_pdf(read, limit):
+        """Find the last %%EOF whose startxref points at an xref section, following incremental updates."""
+        if read(0, 5) != b'%PDF-':
+            return None
+        pos = 0
+        end = None
+        while True:
+            eof = StructureWalker.scan(read, b'%%EOF', pos, limit)
+            if eof is None:
+                return end
+            pos = eof + 5
+            trailer_start = max(eof - 1024, 0)
+            trailer = StructureWalker.PDF_STARTXREF.search(read(trailer_start, eof - trailer_start))
+            if trailer is None or int(trailer.group(1)) >= eof or \
+                    not StructureWalker.PDF_SECTION.match(read(int(trailer.group(1)), 64)):
+                continue  # %%EOF inside a stream, or a trailer pointing nowhere
+            newline = read(pos, 2)
+            end = min(pos + (2 if newline == b'\r\n' else 1 if newline[:1] in (b'\r', b'\n') else 0), limit)
+            if not StructureWalker.PDF_SECTION.match(read(end, 64)):  # No incremental update follows
+                return end
+
+# Classifies every cluster of a buffer from its byte histogram and entropy, computed in one NumPy pass
+class ClusterClassifier:
+    ZERO, FILL, LOW_ENTROPY, TEXT, BINARY, HIGH_ENTROPY = range(6)  # Cluster classes, dead ones first
+    NAMES = ('zero-fill', 'constant-fill', 'low-entropy', 'text-like', 'binary', 'high-entropy')
+    MIN_DISTINCT = 10  # Fewer distinct byte values than this is fill or noise, not file content
+    TEXT_RATIO = 0.95  # Share of printable ASCII and whitespace bytes in a text-like cluster
+    HIGH_ENTROPY_BITS = 7.5  # Bits per byte above which a cluster holds compressed or encrypted data
+    BLOCK_SIZE = 1024 * 1024  # Bytes histogrammed per step, bounding the temporary index array
+    TEXT_BYTES = np.zeros(256, dtype=bool)  # Printable ASCII plus tab, line feed and carriage return
+    TEXT_BYTES[0x20:0x7F] = True
+    TEXT_BYTES[[0x09, 0x0A, 0x0D]] = True
+
+    def __init__(self, cluster_size=4096):
+        """Precompute the per-count entropy terms for one cluster size."""
+        self.cluster_size = cluster_size
+        counts = np.arange(cluster_size + 1, dtype=np.float64)
+        counts[0] = 1  # 0 * log2(0) is taken as 0
+        self.count_log = counts * np.log2(counts)  # count * log2(count), looked up per histogram bin
+        self.count_log[0] = 0
+        block_clusters = max(self.BLOCK_SIZE // cluster_size, 1)
+        self.bin_base = (np.arange(block_clusters, dtype=np.intp) * 256)[:, None]  # Row offsets into one bincount
+
+    def histograms(self, data):
+        """Return a (clusters, 256) array of byte counts; a trailing partial cluster gets its own row."""
+        array = np.frombuffer(data, dtype=np.uint8)
+        full = len(array) // self.cluster_size
+        counts = np.empty((full + (len(array) % self.cluster_size > 0), 256), dtype=np.int64)
+        block = len(self.bin_base)
+        index = np.empty((block, self.cluster_size), dtype=np.intp)
+        for first in range(0, full, block):
+            rows = array[first * self.cluster_size:min(first + block, full) * self.cluster_size].reshape(-1, self.cluster_size)
+            np.add(rows, self.bin_base[:len(rows)], out=index[:len(rows)], casting='unsafe')
+            counts[first:first + len(rows)] = np.bincount(index[:len(rows)].ravel(),
+                                                          minlength=len(rows) * 256).reshape(-1, 256)
+        if len(counts) > full:
+            counts[full] = np.bincount(array[full * self.cluster_size:], minlength=256)
+        return counts
+
+    def classify(self, data):
+        """Return the class of every cluster of data as a uint8 array."""
+        counts = self.histograms(data)
+        if not len(counts):
+            return np.empty(0, dtype=np.uint8)
+        sizes = np.full(len(counts), self.cluster_size, dtype=np.int64)
+        sizes[-1] = len(data) - (len(counts) - 1) * self.cluster_size
+        distinct = np.count_nonzero(counts, axis=1)
+        entropy = np.log2(sizes) - self.count_log[counts].sum(axis=1) / sizes  # Shannon entropy, bits per byte
+        text = counts[:, self.TEXT_BYTES].sum(axis=1) >= self.TEXT_RATIO * sizes
+        classes = np.full(len(counts), self.BINARY, dtype=np.uint8)
+        classes[entropy >= self.HIGH_ENTROPY_BITS] = self.HIGH_ENTROPY
+        classes[text] = self.TEXT
+        classes[distinct < self.MIN_DISTINCT] = self.LOW_ENTROPY
+        classes[distinct == 1] = self.FILL
+        classes[counts[:, 0] == sizes] = self.ZERO
+        return classes
+
+    @staticmethod
+    def is_dead(classes):
+        """Return a mask of clusters with nothing worth carving (zero-fill, constant-fill, low-entropy)."""
+        return classes < ClusterClassifier.TEXT
+
+    def live_ranges(self, classes, length):
+        """Yield the (start, end) byte ranges of runs of live clusters in a buffer of length bytes."""
+        live = np.concatenate(([0], (classes >= self.TEXT).view(np.int8), [0]))
+        edges = np.flatnonzero(np.diff(live))
+        for first, last in zip(edges[0::2].tolist(), edges[1::2].tolist()):
+            yield first * self.cluster_size, min(last * self.cluster_size, length)
+
+    def any_dead(self, classes, start, end):
+        """Whether any cluster overlapping bytes [start, end) of the classified buffer is dead."""
+        return bool((classes[start // self.cluster_size:-(-end // self.cluster_size)] < self.TEXT).any())
+
+# In-memory NTFS $Bitmap answering cluster allocation queries without disk reads
+class ClusterBitmap:
+    MIN_WINDOW = 64 * 1024  # Clusters unpacked by the first extent lookup step
+    MAX_WINDOW = 64 * 1024 * 1024  # Upper bound on clusters unpacked at once
+
+    def __init__(self, bitmap_data, total_clusters=None):
+        """Wrap packed $Bitmap bytes (bit n set = cluster n allocated)."""
+        self.packed = bytes(bitmap_data)
+        self.bits = np.frombuffer(self.packed, dtype=np.uint8)  # Shares memory with packed
+        capacity = len(self.packed) * 8
+        self.total_clusters = capacity if total_clusters is None else min(total_clusters, capacity)
+
+    def is_allocated(self, cluster):
+        """Return True if the cluster is marked in use."""
+        if cluster < 0 or cluster >= self.total_clusters:
+            return False
+        return (self.packed[cluster >> 3] >> (cluster & 7)) & 1 == 1
+
+    def extents(self, first_cluster=0, last_cluster=None):
+        """Yield (start cluster, cluster count, allocated) runs covering [first, last)."""
+        last_cluster = self.total_clusters if last_cluster is None else min(last_cluster, self.total_clusters)
+        cluster = max(first_cluster, 0)
+        run_start = cluster
+        run_state = None
+        window = self.MIN_WINDOW
+        while cluster < last_cluster:
+            window_end = min(cluster + window, last_cluster)
+            first_byte = cluster >> 3
+            bits = np.unpackbits(self.bits[first_byte:(window_end + 7) >> 3], bitorder='little')
+            bits = bits[cluster - first_byte * 8:window_end - first_byte * 8]
+            if run_state is None:
+                run_state = bool(bits[0])
+            elif bool(bits[0]) != run_state:  # State changed exactly at the window boundary
+                yield run_start, cluster - run_start, run_state
+                run_start, run_state = cluster, not run_state
+            for edge in (np.flatnonzero(bits[1:] != bits[:-1]) + 1).tolist():
+                yield run_start, cluster + edge - run_start, run_state
+                run_start, run_state = cluster + edge, not run_state
+            cluster = window_end
+            window = min(window * 2, self.MAX_WINDOW)  # Long runs are unpacked in growing steps
+        if run_state is not None:
+            yield run_start, last_cluster - run_start, run_state
+
+    def run_end(self, cluster, last_cluster=None):
+        """Return the first cluster after `cluster` whose allocation state differs."""
+        for start, count, _ in self.extents(cluster, last_cluster):
+            return start + count
+        return cluster
+
+# In-memory FAT32 allocation table and data-region geometry, loaded once per scan
+class FatTable:
+    ENTRY_MASK = 0x0FFFFFFF  # The top 4 bits of a FAT32 entry are reserved
+    END_OF_CHAIN = 0x0FFFFFF8  # Entries at or above this end a cluster chain
+    LOAD_CHUNK = 16 * 1024 * 1024  # FAT bytes read per step while loading
+    DELETED = 0xE5  # First name byte of a deleted directory entry
+    ATTR_VOLUME_ID = 0x08
+    ATTR_DIRECTORY = 0x10
+    ATTR_LONG_NAME = 0x0F  # VFAT long-name slot
+    DIRECTORY_ENTRY = np.dtype([
+        ('name', 'u1', (8,)), ('ext', 'u1', (3,)), ('attr', 'u1'), ('reserved', 'u1'), ('create_tenths', 'u1'),
+        ('create_time', '<u2'), ('create_date', '<u2'), ('access_date', '<u2'), ('cluster_hi', '<u2'),
+        ('time', '<u2'), ('date', '<u2'), ('cluster_lo', '<u2'), ('size', '<u4'),
+    ])  # 32-byte short directory entry
+
+    def __init__(self, entries, data_offset, cluster_size, root_cluster=2):
+        """Wrap FAT entries (already masked) with the data region geometry."""
+        self.entries = entries
+        self.links = memoryview(entries)  # Shares memory with entries; indexing returns plain ints
+        self.data_offset = data_offset  # Byte offset of cluster 2
+        self.cluster_size = cluster_size
+        self.root_cluster = root_cluster
+        self.total_clusters = len(entries)
+
+    @staticmethod
+    def load(device, boot_sector, sector_size=512):
+        """Read the first FAT copy into a uint32 array, or return None if the boot sector is not FAT32."""
+        if boot_sector[82:90] != b'FAT32   ':
+            return None
+        sectors_per_cluster = max(boot_sector[13], 1)
+        reserved_sectors = struct.unpack_from('<H', boot_sector, 14)[0]
+        fat_copies = boot_sector[16]
+        total_sectors = struct.unpack_from('<I', boot_sector, 32)[0]
+        sectors_per_fat = struct.unpack_from('<I', boot_sector, 36)[0]
+        root_cluster = struct.unpack_from('<I', boot_sector, 44)[0]
+        fat_offset = reserved_sectors * sector_size
+        data_sector = reserved_sectors + fat_copies * sectors_per_fat
+        data_clusters = max(total_sectors - data_sector, 0) // sectors_per_cluster
+        total_clusters = min(sectors_per_fat * sector_size // 4, data_clusters + 2)
+        entries = np.empty(total_clusters, dtype=np.uint32)
+        loaded = 0
+        while loaded < total_clusters:
+            count = min(FatTable.LOAD_CHUNK // 4, total_clusters - loaded)
+            chunk = device.read_at(fat_offset + loaded * 4, count * 4)
+            count = len(chunk) // 4
+            if not count:
+                break
+            entries[loaded:loaded + count] = np.frombuffer(chunk, dtype='<u4', count=count)
+            loaded += count
+        entries = entries[:loaded] & FatTable.ENTRY_MASK
+        return FatTable(entries, data_sector * sector_size, sectors_per_cluster * sector_size, root_cluster)
+
+    def is_valid(self, cluster):
+        """Return True if the cluster number lies in the data region."""
+        return 2 <= cluster < self.total_clusters
+
+    def cluster_offset(self, cluster):
+        """Return the byte offset of a data cluster."""
+        return self.data_offset + (cluster - 2) * self.cluster_size
+
+    def chain(self, start_cluster, max_clusters=None):
+        """Follow a live cluster chain in memory; stops at end of chain, free entries or loops."""
+        max_clusters = self.total_clusters if max_clusters is None else max_clusters
+        clusters = []
+        cluster = start_cluster
+        while self.is_valid(cluster) and len(clusters) < max_clusters:
+            clusters.append(cluster)
+            cluster = self.links[cluster]
+            if cluster == 0 or cluster >= self.END_OF_CHAIN:
+                break
+        return clusters
+
+    def runs(self, first_cluster, last_cluster):
+        """Yield (start cluster, cluster count, allocated) runs over [first, last) of the data region."""
+        first_cluster = max(first_cluster, 2)
+        last_cluster = min(last_cluster, self.total_clusters)
+        if first_cluster >= last_cluster:
+            return
+        allocated = self.entries[first_cluster:last_cluster] != 0
+        edges = [0] + (np.flatnonzero(allocated[1:] != allocated[:-1]) + 1).tolist() + [len(allocated)]
+        for start, end in zip(edges, edges[1:]):
+            yield first_cluster + start, end - start, bool(allocated[start])
+
+    @staticmethod
+    def runs_of(clusters):
+        """Group cluster numbers into (start cluster, cluster count) runs of consecutive clusters."""
+        runs = []
+        for cluster in clusters:
+            if runs and runs[-1][0] + runs[-1][1] == cluster:
+                runs[-1][1] += 1
+            else:
+                runs.append([cluster, 1])
+        return runs
+
+    def parse_directory(self, data):
+        """Parse directory clusters in bulk; returns (entries, deleted file rows, subdirectory rows)."""
+        entries = np.frombuffer(data, dtype=self.DIRECTORY_ENTRY, count=len(data) // self.DIRECTORY_ENTRY.itemsize)
+        end = np.flatnonzero(entries['name'][:, 0] == 0)  # A zero first byte ends the directory
+        if end.size:
+            entries = entries[:end[0]]
+        first = entries['name'][:, 0]
+        attr = entries['attr']
+        cluster = (entries['cluster_hi'].astype(np.int64) << 16) | entries['cluster_lo']
+        valid = (attr != self.ATTR_LONG_NAME) & (cluster >= 2) & (cluster < self.total_clusters)
+        files = (valid & (first == self.DELETED) & (attr & (self.ATTR_VOLUME_ID | self.ATTR_DIRECTORY) == 0)
+                 & (entries['size'] > 0))
+        directories = (valid & (attr & (self.ATTR_VOLUME_ID | self.ATTR_DIRECTORY) == self.ATTR_DIRECTORY)
+                       & (first != ord('.')))  # Skip the . and .. links
+        return entries, np.flatnonzero(files), np.flatnonzero(directories)
+
+# Decoded MFT record: only the fields the scanner needs, without the raw 1KB record
+MftRecord = namedtuple('MftRecord', [
+    'offset',          # Absolute offset of the record on the drive
+    'in_use',          # False for deleted files
+    'is_directory',    # Directory records carry no $DATA
+    'name',            # Long (Win32/POSIX) $FILE_NAME, falling back to the DOS 8.3 name
+    'modified',        # $STANDARD_INFORMATION modification time (FILETIME, 0 if missing)
+    'has_data',        # Whether an unnamed $DATA attribute was found
+    'resident',        # $DATA content is stored inside the record
+    'data',            # Resident content, or the encoded run list of non-resident $DATA
+    'data_size',       # Real size of the $DATA stream
+    'data_offset',     # Absolute offset of resident content on the drive
+])
+
+# Bulk NTFS MFT decoder: validates and fixes up whole slabs of records with NumPy
+class MftDecoder:
+    FILE_MAGIC = int.from_bytes(b'FILE', 'little')
+    SECTOR_SIZE = 512  # Update sequence stride
+    MAX_ATTRIBUTES = 32  # Attribute walk steps per record
+    SLAB_RECORDS = 4096  # Records read and decoded per slab
+    ATTR_STANDARD_INFORMATION = 0x10
+    ATTR_FILE_NAME = 0x30
+    ATTR_DATA = 0x80
+    ATTR_END = 0xFFFFFFFF
+    NAMESPACE_DOS = 2
+
+    def __init__(self, record_size=1024):
+        """Create a decoder for the volume's MFT record size."""
+        self.record_size = record_size
+
+    @staticmethod
+    def record_size_from_boot_sector(boot_sector, cluster_size):
+        """Read the MFT record size from the NTFS boot sector (clusters, or 2^-n bytes if negative)."""
+        value = int.from_bytes(boot_sector[64:65], 'little', signed=True)
+        if value > 0:
+            return value * cluster_size
+        return 1 << -value if value < 0 else 1024
+
+    def decode_slab(self, slab, base_offset):
+        """Decode every valid FILE record in a slab; returns (records, corrupt FILE record count)."""
+        size = self.record_size
+        count = len(slab) // size
+        if not count:
+            return [], 0
+        records = np.frombuffer(slab, dtype=np.uint8, count=count * size).reshape(count, size).copy()
+        rows = np.flatnonzero(self._u32(records, np.arange(count), 0) == self.FILE_MAGIC)
+        file_records = len(rows)
+
+        rows = self.apply_fixups(records, rows)
+
+        # Record header: flags, first attribute and used length
+        flags = self._u16(records, rows, 22)
+        first_attribute = self._u16(records, rows, 20)
+        used = np.minimum(self._u32(records, rows, 24), size).astype(np.int64)
+        first_attribute = first_attribute.astype(np.int64)
+        valid = (first_attribute >= 24) & (first_attribute + 8 <= used)
+        rows, flags, first_attribute, used = rows[valid], flags[valid], first_attribute[valid], used[valid]
+
+        std_info, file_name, data = self._walk_attributes(records, rows, first_attribute, used)
+        decoded = self._build_records(records, rows, flags, std_info, file_name, data, base_offset)
+        return decoded, file_records - len(decoded)
+
+    @staticmethod
+    def apply_fixups(records, rows):
+        """Check and undo the update sequence of multi-sector records in place; returns the rows that pass."""
+        size = records.shape[1]
+        sectors = max(size // MftDecoder.SECTOR_SIZE, 1)
+        # Every sector must end with the USN, which is then swapped back out of the update sequence array
+        usa_offset = MftDecoder._u16(records, rows, 4)
+        usa_count = MftDecoder._u16(records, rows, 6)
+        valid = (usa_count == sectors + 1) & (usa_offset % 2 == 0) & (usa_offset + 2 * usa_count <= size)
+        rows, usa_offset = rows[valid], usa_offset[valid]
+        usn = MftDecoder._u16(records, rows, usa_offset)
+        valid = np.ones(len(rows), dtype=bool)
+        for sector in range(sectors):
+            tail = (sector + 1) * MftDecoder.SECTOR_SIZE - 2
+            valid &= MftDecoder._u16(records, rows, tail) == usn
+        rows, usa_offset = rows[valid], usa_offset[valid]
+        for sector in range(sectors):
+            tail = (sector + 1) * MftDecoder.SECTOR_SIZE - 2
+            entry = usa_offset + 2 * (sector + 1)
+            records[rows, tail] = records[rows, entry]
+            records[rows, tail + 1] = records[rows, entry + 1]
+        return rows
+
+    def decode_record(self, record, offset):
+        """Decode a single MFT record, or return None if it is not a valid FILE record."""
+        decoded, _ = self.decode_slab(record[:self.record_size], offset)
+        return decoded[0] if decoded else None
+
+    def _walk_attributes(self, records, rows, position, used):
+        """Walk the attribute lists of all rows in lock-step by type and length."""
+        position = position.astype(np.int64)
+        std_info = np.full(len(rows), -1, dtype=np.int64)
+        file_name = np.full(len(rows), -1, dtype=np.int64)
+        file_name_dos = np.zeros(len(rows), dtype=bool)
+        data = np.full(len(rows), -1, dtype=np.int64)
+        active = np.arange(len(rows))
+        for _ in range(self.MAX_ATTRIBUTES):
+            if not active.size:
+                break
+            pos = position[active]
+            row = rows[active]
+            attr_type = self._u32(records, row, pos)
+            length = self._u32(records, row, pos + 4).astype(np.int64)
+            ok = (attr_type != self.ATTR_END) & (length >= 24) & (pos + length <= used[active])
+            active, pos, row, attr_type = active[ok], pos[ok], row[ok], attr_type[ok]
+
+            hit = (attr_type == self.ATTR_STANDARD_INFORMATION) & (std_info[active] < 0)
+            std_info[active[hit]] = pos[hit]
+
+            hit = attr_type == self.ATTR_FILE_NAME
+            content = pos + self._u16(records, row, pos + 20)
+            namespace = records[row, np.minimum(content + 65, records.shape[1] - 1)]
+            hit &= (file_name[active] < 0) | (file_name_dos[active] & (namespace != self.NAMESPACE_DOS))
+            file_name[active[hit]] = pos[hit]
+            file_name_dos[active[hit]] = namespace[hit] == self.NAMESPACE_DOS
+
+            hit = (attr_type == self.ATTR_DATA) & (records[row, pos + 9] == 0) & (data[active] < 0)  # Unnamed stream
+            data[active[hit]] = pos[hit]
+
+            position[active] = pos + length[ok]
+            active = active[position[active] + 8 <= used[active]]
+        return std_info, file_name, data
+
+    def _build_records(self, records, rows, flags, std_info, file_name, data, base_offset):
+        """Decode the located attributes of every row into MftRecords."""
+        size = records.shape[1]
+        row_start = rows.astype(np.int64) * size  # Row offsets into the flattened slab
+
+        si_content = np.maximum(std_info, 0) + self._u16(records, rows, np.maximum(std_info, 0) + 20)
+        modified = np.where((std_info >= 0) & (si_content + 16 <= size),
+                            self._u64(records, rows, si_content + 8), 0)
+
+        fn_content = np.maximum(file_name, 0) + self._u16(records, rows, np.maximum(file_name, 0) + 20)
+        name_length = records[rows, np.minimum(fn_content + 64, size - 1)].astype(np.int64) * 2
+        name_start = fn_content + 66
+        name_length = np.where((file_name >= 0) & (name_start + name_length <= size), name_length, 0)
+
+        attr = np.maximum(data, 0)
+        attr_length = self._u32(records, rows, attr + 4).astype(np.int64)
+        resident = records[rows, attr + 8] == 0
+        resident_size = self._u32(records, rows, attr + 16).astype(np.int64)
+        resident_content = self._u16(records, rows, attr + 20).astype(np.int64)
+        resident_size = np.minimum(resident_size, np.maximum(attr_length - resident_content, 0))
+        run_offset = self._u16(records, rows, attr + 32).astype(np.int64)
+        real_size = self._u64(records, rows, attr + 48).astype(np.int64)
+        data_start = np.where(resident, attr + resident_content, attr + run_offset)
+        data_end = np.where(resident, data_start + resident_size, attr + attr_length)
+        data_end = np.where(resident | (attr_length >= 56), data_end, data_start)  # Truncated header: no runs
+        data_size = np.where(resident, resident_size, real_size)
+
+        slab = records.tobytes()
+        decoded = []
+        for (start, flag, has_data, is_resident, name_at, name_len, data_at, data_stop, data_len,
+             mtime) in zip(row_start.tolist(), flags.tolist(), (data >= 0).tolist(), resident.tolist(),
+                           name_start.tolist(), name_length.tolist(), data_start.tolist(), data_end.tolist(),
+                           data_size.tolist(), modified.tolist()):
+            offset = base_offset + start
+            name = slab[start + name_at:start + name_at + name_len].decode('utf-16le', errors='ignore')
+            if has_data:
+                payload = slab[start + data_at:start + data_stop]
+                data_offset = offset + data_at if is_resident else 0
+            else:
+                is_resident, payload, data_len, data_offset = False, b'', 0, 0
+            decoded.append(MftRecord(offset, bool(flag & 0x01), bool(flag & 0x02), name, mtime,
+                                     has_data, is_resident, payload, data_len, data_offset))
+        return decoded
+
+    @staticmethod
+    def _u16(records, rows, pos):
+        """Gather little-endian uint16 values at per-row byte positions."""
+        pos = np.minimum(pos, records.shape[1] - 2)
+        return records[rows, pos].astype(np.uint32) | (records[rows, pos + 1].astype(np.uint32) << 8)
+
+    @staticmethod
+    def _u32(records, rows, pos):
+        """Gather little-endian uint32 values at per-row byte positions."""
+        pos = np.minimum(pos, records.shape[1] - 4)
+        return (MftDecoder._u16(records, rows, pos).astype(np.uint64)
+                | (MftDecoder._u16(records, rows, pos + 2).astype(np.uint64) << np.uint64(16)))
+
+    @staticmethod
+    def _u64(records, rows, pos):
+        """Gather little-endian uint64 values at per-row byte positions."""
+        pos = np.minimum(pos, records.shape[1] - 8)
+        return MftDecoder._u32(records, rows, pos) | (MftDecoder._u32(records, rows, pos + 4) << np.uint64(32))
+
+# Data written by one $LogFile redo operation, with the on-disk extents holding its bytes
+LogFragment = namedtuple('LogFragment', [
+    'lsn',             # Log sequence number of the record
+    'operation',       # NTFS redo operation code
+    'mft_record',      # MFT record the operation targets
+    'data',            # Redo bytes (resident file content)
+    'extents',         # (offset, length) extents of data in the $LogFile, around sector fixups
+])
+
+# Page-level NTFS $LogFile reader: validates RCRD pages in bulk and walks their log records
+class LogFileParser:
+    PAGE_MAGIC = int.from_bytes(b'RCRD', 'little')
+    RESTART_MAGIC = b'RSTR'
+    RECORD_HEADER = 0x30  # LFS record header preceding the client data
+    CLIENT_HEADER = 0x20  # NTFS redo/undo header, before the LCN list
+    CLIENT_RECORD = 1  # LFS record type carrying an NTFS redo/undo operation
+    MAX_RECORDS = 512  # Record walk steps per page
+    INITIALIZE_FILE_RECORD = 0x02  # Redo: full MFT record image
+    CREATE_ATTRIBUTE = 0x05  # Redo: one attribute, header included
+    UPDATE_RESIDENT_VALUE = 0x07  # Redo: bytes written into a resident attribute
+    ADD_INDEX_ENTRY_ROOT = 0x0C  # Redo: directory index entry ($FILE_NAME key)
+    ADD_INDEX_ENTRY_ALLOCATION = 0x0E
+    OPERATIONS = (INITIALIZE_FILE_RECORD, CREATE_ATTRIBUTE, UPDATE_RESIDENT_VALUE,
+                  ADD_INDEX_ENTRY_ROOT, ADD_INDEX_ENTRY_ALLOCATION)
+
+    def __init__(self, page_size=4096, cluster_size=4096, record_size=1024):
+        """Create a parser for the log page size and the volume geometry."""
+        self.page_size = page_size
+        self.cluster_size = cluster_size
+        self.record_size = record_size
+
+    @staticmethod
+    def page_size_from_restart(restart_page):
+        """Read the log page size from a restart (RSTR) page, defaulting to 4KB."""
+        if restart_page[:4] == LogFileParser.RESTART_MAGIC:
+            page_size = struct.unpack_from('<I', restart_page, 0x14)[0]
+            if page_size >= 512 and page_size & (page_size - 1) == 0:
+                return page_size
+        return 4096
+
+    def parse(self, data, base_offset):
+        """Parse the RCRD pages of a slab; returns (fragments, {mft record: name}, corrupt page count)."""
+        size = self.page_size
+        count = len(data) // size
+        if not count:
+            return [], {}, 0
+        pages = np.frombuffer(data, dtype=np.uint8, count=count * size).reshape(count, size).copy()
+        rows = np.flatnonzero(MftDecoder._u32(pages, np.arange(count), 0) == self.PAGE_MAGIC)
+        record_pages = len(rows)
+        rows = MftDecoder.apply_fixups(pages, rows)
+        corrupt = record_pages - len(rows)
+
+        # Walk the records of every page in lock-step; records continuing on the next page end the walk
+        usa_offset = MftDecoder._u16(pages, rows, 4).astype(np.int64)
+        usa_count = MftDecoder._u16(pages, rows, 6).astype(np.int64)
+        position = (usa_offset + 2 * usa_count + 7) & ~7
+        limit = np.minimum(MftDecoder._u16(pages, rows, 0x18).astype(np.int64), size)
+        active = np.arange(len(rows))
+        found_rows, found_positions = [], []
+        for _ in range(self.MAX_RECORDS):
+            active = active[position[active] + self.RECORD_HEADER + self.CLIENT_HEADER <= limit[active]]
+            if not active.size:
+                break
+            pos = position[active]
+            row = rows[active]
+            client_length = MftDecoder._u32(pages, row, pos + 24).astype(np.int64)
+            record_type = MftDecoder._u32(pages, row, pos + 32)
+            end = pos + self.RECORD_HEADER + client_length
+            ok = (record_type >= 1) & (record_type <= 2) & (client_length >= self.CLIENT_HEADER) & (end <= limit[active])
+            redo = MftDecoder._u16(pages, row, pos + self.RECORD_HEADER)
+            hit = ok & (record_type == self.CLIENT_RECORD) & np.isin(redo, self.OPERATIONS)
+            found_rows.append(row[hit])
+            found_positions.append(pos[hit])
+            active = active[ok]
+            position[active] = (end[ok] + 7) & ~7
+
+        slab = pages.tobytes()
+        fragments, names = [], {}
+        if found_rows:
+            for row, pos in zip(np.concatenate(found_rows).tolist(), np.concatenate(found_positions).tolist()):
+                self._decode_record(slab, row * size, pos, base_offset, fragments, names)
+        return fragments, names, corrupt
+
+    def _decode_record(self, slab, page_start, pos, base_offset, fragments, names):
+        """Turn one client log record into file content fragments and file names."""
+        record = page_start + pos
+        lsn = struct.unpack_from('<Q', slab, record)[0]
+        client = record + self.RECORD_HEADER
+        (operation, _, redo_offset, redo_length, _, _, _, _, _, attribute_offset, cluster_block_offset, _,
+         target_vcn) = struct.unpack_from('<12HQ', slab, client)
+        start = client + redo_offset
+        redo = slab[start:start + redo_length]
+        mft_record = (target_vcn * self.cluster_size + cluster_block_offset * 512) // self.record_size
+
+        def add_fragment(content, content_start):
+            """Keep a content fragment with extents mapped back onto the raw $LogFile pages."""
+            if content:
+                fragments.append(LogFragment(lsn, operation, mft_record, content,
+                                             self.page_extents(slab, page_start, content_start, len(content),
+                                                               base_offset)))
+
+        if operation == self.UPDATE_RESIDENT_VALUE:
+            add_fragment(redo, start - page_start)
+        elif operation == self.CREATE_ATTRIBUTE:
+            for attr_type, content, content_start in self._resident_attributes(redo, single=True):
+                self._take_attribute(attr_type, content, start - page_start + content_start, mft_record,
+                                     names, add_fragment)
+        elif operation == self.INITIALIZE_FILE_RECORD:
+            for attr_type, content, content_start in self._resident_attributes(redo):
+                self._take_attribute(attr_type, content, start - page_start + content_start, mft_record,
+                                     names, add_fragment)
+        elif len(redo) >= 16 + 66:  # Index entry: file reference, lengths, then the $FILE_NAME key
+            reference = int.from_bytes(redo[0:6], 'little')
+            self._take_file_name(redo[16:], reference, names)
+
+    def _take_attribute(self, attr_type, content, content_start, mft_record, names, add_fragment):
+        """Record a $FILE_NAME or keep resident $DATA content from a logged attribute."""
+        if attr_type == MftDecoder.ATTR_FILE_NAME:
+            self._take_file_name(content, mft_record, names)
+        elif attr_type == MftDecoder.ATTR_DATA:
+            add_fragment(content, content_start)
+
+    @staticmethod
+    def _take_file_name(file_name, mft_record, names):
+        """Map an MFT record to the name in a $FILE_NAME body, preferring long names over DOS names."""
+        if len(file_name) < 66:
+            return
+        name_length, namespace = file_name[64], file_name[65]
+        name = file_name[66:66 + name_length * 2].decode('utf-16le', errors='ignore')
+        if name and (mft_record not in names or namespace != MftDecoder.NAMESPACE_DOS):
+            names[mft_record] = name
+
+    @staticmethod
+    def _resident_attributes(image, single=False):
+        """Yield (type, content, content offset) for resident attributes in a logged record or attribute."""
+        pos = 0
+        if not single:
+            if len(image) < 24 or image[:4] != b'FILE':
+                return
+            pos = struct.unpack_from('<H', image, 20)[0]
+        while pos + 24 <= len(image):
+            attr_type, length = struct.unpack_from('<II', image, pos)
+            if attr_type == MftDecoder.ATTR_END or length < 24:
+                return
+            if image[pos + 8] == 0:  # Resident
+                content_length, content_offset = struct.unpack_from('<IH', image, pos + 16)
+                content_start = pos + content_offset
+                yield attr_type, image[content_start:min(content_start + content_length, len(image))], content_start
+            if single:
+                return
+            pos += length
+
+    def page_extents(self, slab, page_start, start, length, base_offset):
+        """Map bytes of a fixed-up page to disk extents; sector tails come from the update sequence array."""
+        usa_offset = struct.unpack_from('<H', slab, page_start + 4)[0]
+        extents = []
+        end = start + length
+        while start < end:
+            tail = (start // MftDecoder.SECTOR_SIZE + 1) * MftDecoder.SECTOR_SIZE - 2
+            if start < tail:
+                stop = min(end, tail)
+                FileUtils.add_extent(extents, base_offset + page_start + start, stop - start)
+                start = stop
+            else:
+                entry = usa_offset + 2 * (tail // MftDecoder.SECTOR_SIZE + 1) + (start - tail)
+                stop = min(end, tail + 2)
+                FileUtils.add_extent(extents, base_offset + page_start + entry, stop - start)
+                start = stop
+        return extents
+
+# On-disk SQLite catalog of one scan's found files, written in batches while the scan runs
+class ScanCatalog:
+    CATALOG_DIR = os.path.join(os.path.expanduser("~"), ".aarambh", "catalogs")  # Default catalog location
+    BATCH_SIZE = 500  # Records buffered before an insert transaction
+    BATCH_INTERVAL = 1.0  # Seconds before a partial batch is flushed anyway
+    COLUMNS = ('name', 'type', 'offset', 'size', 'source', 'extents', 'repair',
+               'status', 'state', 'last_modified', 'path', 'hash')
+
+    def __init__(self, path):
+        """Open (or create) the catalog database at path."""
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # Readers can browse while the scan writes
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS scan (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY, name TEXT, type TEXT, offset INTEGER, size INTEGER,
+                source TEXT, extents BLOB, repair INTEGER, status TEXT, state TEXT,
+                last_modified TEXT, path TEXT, hash TEXT
+            );
+            CREATE INDEX IF NOT EXISTS files_type ON files (type, id);
+            CREATE INDEX IF NOT EXISTS files_offset ON files (offset);
+            CREATE INDEX IF NOT EXISTS files_hash ON files (hash);
+        """)
+        self.pending = []  # Rows waiting for the next batched insert
+        self.last_flush = time.monotonic()
+
+    @staticmethod
+    def new_path(drive, scan_type):
+        """Return a fresh catalog path in CATALOG_DIR for a scan of drive."""
+        os.makedirs(ScanCatalog.CATALOG_DIR, exist_ok=True)
+        source = re.sub(r'[^A-Za-z0-9]+', '_', os.path.basename(drive.rstrip('\\/')) or drive).strip('_') or "drive"
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        return os.path.join(ScanCatalog.CATALOG_DIR, f"{stamp}-{source}-{scan_type.lower()}.db")
+
+    @staticmethod
+    def pack_extents(extents):
+        """Pack (offset, length) extents into a compact little-endian BLOB."""
+        return struct.pack(f'<{len(extents) * 2}q', *(value for extent in extents for value in extent))
+
+    @staticmethod
+    def unpack_extents(blob):
+        """Unpack a BLOB written by pack_extents back into (offset, length) tuples."""
+        values = struct.unpack(f'<{len(blob) // 8}q', blob)
+        return list(zip(values[0::2], values[1::2]))
+
+    def begin(self, drive, scan_type):
+        """Record the scan parameters."""
+        self.set_info(source=drive, scan_type=scan_type, status="running",
+                      started=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+    def set_info(self, **values):
+        """Store scan-level key/value metadata."""
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO scan (key, value) VALUES (?, ?)",
+                                  [(key, str(value)) for key, value in values.items()])
+
+    def info(self):
+        """Return the scan-level metadata as a dict."""
+        return dict(self.conn.execute("SELECT key, value FROM scan"))
+
+    def add_file(self, file_info):
+        """Queue a found-file record, flushing when the batch is full or old enough."""
+        self.pending.append((
+            file_info['name'], file_info['type'], file_info['offset'], file_info['size'], file_info['source'],
+            self.pack_extents(file_info['extents']), int(file_info['repair']), file_info['status'],
+            file_info['state'], file_info['last_modified'], file_info['path'], file_info.get('hash')
+        ))
+        if len(self.pending) >= self.BATCH_SIZE or time.monotonic() - self.last_flush >= self.BATCH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Write queued records in one transaction."""
+        if self.pending:
+            with self.conn:
+                self.conn.executemany(f"INSERT INTO files ({', '.join(self.COLUMNS)}) "
+                                      f"VALUES ({', '.join('?' * len(self.COLUMNS))})", self.pending)
+            self.pending = []
+        self.last_flush = time.monotonic()
+
+    def finish(self, status):
+        """Flush outstanding records and mark the scan finished."""
+        self.flush()
+        self.set_info(status=status, file_count=self.count(),
+                      finished=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+    def file_keys(self):
+        """Return the (offset, name) keys of every cataloged file."""
+        self.flush()
+        return set(self.conn.execute("SELECT offset, name FROM files"))
+
+    def dedup_keys(self):
+        """Return the extent keys and content hashes of every cataloged file, each mapped to its (offset, name) key,
+        to seed a DedupIndex."""
+        self.flush()
+        extent_keys, hashes = {}, {}
+        for offset, name, blob, digest in self.conn.execute("SELECT offset, name, extents, hash FROM files"):
+            key = DedupIndex.extent_key(self.unpack_extents(blob))
+            if key:
+                extent_keys[key] = (offset, name)
+            if digest:
+                hashes[digest] = (offset, name)
+        return extent_keys, hashes
+
+    def remove_files(self, keys):
+        """Delete the records with the given (offset, name) keys."""
+        self.flush()
+        with self.conn:
+            self.conn.executemany("DELETE FROM files WHERE offset = ? AND name = ?", keys)
+
+    def count(self, file_type=None):
+        """Return the number of cataloged files, optionally of one type."""
+        if file_type:
+            return self.conn.execute("SELECT COUNT(*) FROM files WHERE type = ?", (file_type,)).fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def iter_files(self, file_type=None, page_size=5000):
+        """Yield file records page by page in discovery order, optionally of one type."""
+        last_id = 0
+        where = "id > ? AND type = ?" if file_type else "id > ?"
+        while True:
+            params = (last_id, file_type) if file_type else (last_id,)
+            rows = self.conn.execute(f"SELECT id, {', '.join(self.COLUMNS)} FROM files WHERE {where} "
+                                     f"ORDER BY id LIMIT {int(page_size)}", params).fetchall()
+            for row in rows:
+                file_info = dict(zip(self.COLUMNS, row[1:]))
+                file_info['extents'] = self.unpack_extents(file_info['extents'])
+                file_info['repair'] = bool(file_info['repair'])
+                yield file_info
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1][0]
+
+    def close(self):
+        """Flush and close the database."""
+        if self.conn:
+            self.flush()
+            self.conn.close()
+            self.conn = None
+
+# Per-stage scan counters: bytes read, read latency, hits, junk and time spent validating and reconstructing
+class ScanMetrics:
+    COUNTERS = ('bytes_read', 'reads', 'read_time', 'max_read_time', 'read_wait', 'memory_wait', 'candidates', 'validated',
+                'duplicates', 'junk', 'dead_clusters', 'validate_time', 'reconstruct_time', 'elapsed')
 
-# Thread class for scanning drives
-class ScanThread(QThread):
-    file_found = pyqtSignal(dict)  # Signal emitted when a file is found
-    progress_updated = pyqtSignal(int)  # Signal for progress updates (percentage)
+    def __init__(self):
+        """Start with an empty 'prepare' stage charged with geometry and allocation map reads."""
+        self.stages = {}  # Stage name -> counter dict
+        self.current = None  # Counters of the stage reads and hits are charged to
+        self.workers = {}  # Worker process index -> latest snapshot it sent
+        self.memory = None  # MemoryGovernor whose usage is reported
+        self.lock = threading.Lock()  # Counters are updated by the read-ahead thread as well as the scanning one
+        self.local = threading.local()  # Stage counters a helper thread is bound to, instead of current
+        self.started = time.monotonic()
+        self.begin('prepare')
+
+    def begin(self, stage):
+        """Charge the following reads and hits to stage."""
+        with self.lock:
+            self.current = self.stages.setdefault(stage, dict.fromkeys(self.COUNTERS, 0))
+
+    def stage_counters(self):
+        """Return the counters the calling thread charges: those it is bound to, else the current stage's."""
+        return getattr(self.local, 'counters', None) or self.current
+
+    def bind(self, counters):
+        """Charge the calling thread's reads and counters to counters (from stage_counters), whatever stage begins later."""
+        self.local.counters = counters
+
+    def add(self, counter, value=1):
+        """Add to a counter of the calling thread's stage."""
+        with self.lock:
+            self.stage_counters()[counter] += value
+
+    def record_read(self, length, seconds):
+        """Count one device read of length bytes that took seconds."""
+        with self.lock:
+            current = self.stage_counters()
+            current['reads'] += 1
+            current['bytes_read'] += length
+            current['read_time'] += seconds
+            if seconds > current['max_read_time']:
+                current['max_read_time'] = seconds
+
+    def snapshot(self):
+        """Return this process's counters, picklable for the trip from a worker process."""
+        with self.lock:
+            return {stage: dict(counters) for stage, counters in self.stages.items()}
+
+    def set_worker(self, index, snapshot):
+        """Keep the latest snapshot sent by worker process index."""
+        with self.lock:
+            self.workers[index] = snapshot
+
+    def merged(self):
+        """Return the counters of this process and every worker, summed per stage."""
+        stages = self.snapshot()
+        with self.lock:
+            workers = list(self.workers.values())
+        for snapshot in workers:
+            for stage, counters in snapshot.items():
+                total = stages.setdefault(stage, dict.fromkeys(self.COUNTERS, 0))
+                for counter, value in counters.items():
+                    total[counter] = max(total[counter], value) if counter == 'max_read_time' else total[counter] + value
+        return stages
+
+    def report(self):
+        """Return the merged counters with throughput, mean read latency and hit rate, ready for JSON."""
+        stages = self.merged()
+        for counters in stages.values():
+            counters['throughput_mb_s'] = counters['bytes_read'] / counters['elapsed'] / 1048576 if counters['elapsed'] else 0.0
+            counters['mean_read_ms'] = counters['read_time'] / counters['reads'] * 1000 if counters['reads'] else 0.0
+            counters['hit_rate'] = counters['validated'] / counters['candidates'] if counters['candidates'] else 0.0
+        report = {'elapsed': time.monotonic() - self.started, 'stages': stages}
+        if self.memory is not None:
+            report['memory'] = self.memory.usage()
+        return report
 
-    def __init__(self, drive, scan_type):
-        """Initialize the scan thread with drive and scan type."""
-        super().__init__()
-        self.drive = drive  # Target drive (e.g., 'C:\\')
+    @staticmethod
+    def summary(report):
+        """Format a report as one line per stage for display."""
+        lines = [f"Elapsed {report['elapsed']:.1f} s"]
+        memory = report.get('memory')
+        if memory:
+            budget = f"{memory['budget'] / 1048576:,.0f} MB" if memory['budget'] else "no limit"
+            lines.append(f"Memory: {memory['in_use'] / 1048576:,.1f} MB in use, peak {memory['peak'] / 1048576:,.1f} MB, "
+                         f"budget {budget}")
+        for stage, counters in report['stages'].items():
+            if not counters['reads'] and not counters['candidates']:
+                continue
+            lines.append(f"{stage}: {counters['bytes_read'] / 1048576:,.1f} MB in {counters['elapsed']:.1f} s "
+                         f"({counters['throughput_mb_s']:.1f} MB/s), {counters['reads']:,} reads "
+                         f"avg {counters['mean_read_ms']:.2f} ms max {counters['max_read_time'] * 1000:.1f} ms, "
+                         f"waited {counters['read_wait']:.2f} s (memory {counters.get('memory_wait', 0):.2f} s), "
+                         f"hits {counters['validated']:,}/{counters['candidates']:,}, "
+                         f"duplicates {counters['duplicates']:,}, junk {counters['junk']:,}, "
+                         f"validate {counters['validate_time']:.2f} s, reconstruct {counters['reconstruct_time']:.2f} s")
+        return "\n".join(lines)
+
+# Streaming index of emitted files by disk extent and content hash, so a file found twice is emitted once
+class DedupIndex:
+    def __init__(self, extent_keys=None, hashes=None):
+        """Start empty, or from the extent keys and hashes of files already emitted, each mapped to its record key."""
+        self.extent_keys = dict(extent_keys or {})  # (first offset, total length) -> (offset, name) of the emitted file
+        self.hashes = dict(hashes or {})  # Content hash -> (offset, name) of the emitted file
+        self.superseded = {}  # (offset, name) of a replaced carve -> (offset, name) of the named file replacing it
+
+    @staticmethod
+    def extent_key(extents):
+        """Return the (first offset, total length) key of a file's extents."""
+        return (extents[0][0], sum(length for _, length in extents)) if extents else None
+
+    @staticmethod
+    def is_carved(record):
+        """Whether an (offset, name) key is a signature carve's generated name rather than one from file system metadata."""
+        offset, name = record
+        return name.startswith(f"file_{offset}.")
+
+    def seen_extent(self, offset, length):
+        """Whether a file spanning length bytes from offset was already emitted; cheap enough to ask before validating."""
+        return (offset, length) in self.extent_keys
+
+    def add(self, file_info):
+        """Index a file about to be emitted. Return None if it duplicates one emitted before, else the (offset, name)
+        keys of the carves it replaces: a file named from metadata wins over carves of the same extent or content."""
+        key = self.extent_key(file_info['extents'])
+        digest = file_info.get('hash')
+        record = (file_info['offset'], file_info['name'])
+        matches = {self.superseded.get(match, match) for match in (self.extent_keys.get(key), self.hashes.get(digest))
+                   if match}
+        if matches and (self.is_carved(record) or not all(self.is_carved(match) for match in matches)):
+            return None
+        for match in matches:
+            self.superseded[match] = record
+        if key:
+            self.extent_keys[key] = record
+        if digest:
+            self.hashes[digest] = record
+        return sorted(matches)
+
+# Scanning engine, free of Qt so deep-scan shards can also run in worker processes
+class ScanEngine:
+    MP_CONTEXT = multiprocessing.get_context('spawn')  # Fresh interpreters: safe next to Qt threads
+    PROGRESS_INTERVAL = 0.2  # Seconds between progress messages from a worker
+    MARK_INTERVAL = 1.0  # Seconds between stage progress marks
+    CHECKPOINT_INTERVAL = 30.0  # Seconds between checkpoints written to the catalog
+    LOGFILE_SLAB = 4 * 1024 * 1024  # $LogFile bytes read and parsed per step
+    STREAM_SLAB = 4 * 1024 * 1024  # Bytes of a file too large to hold read and hashed per step
+    CANDIDATE_SIZE = max(signature['max_size'] for signature in FileSignatures.SIGNATURES.values())  # Largest file held
+    FAT32_MAX_DIRECTORY = 65536 * 32  # FAT32 directories hold at most 65,536 entries
+
+    def __init__(self, drive, scan_type, workers=None, on_file_found=None, on_progress=None,
+                 stop_event=None, pause_event=None, catalog_path=None, resume=False, file_types=None):
+        """Initialize the scan engine with drive, scan type and result callbacks."""
+        self.drive = drive  # Target drive (e.g., 'C:\\') or disk image path
         self.scan_type = scan_type  # 'Quick' or 'Deep'
-        self.handle = None  # Handle for disk access
+        self.device = None  # BlockDevice for raw access
         self.sector_size = 512  # Standard sector size
-        self.cluster_size = self.get_cluster_size()  # Cluster size of the drive
+        self.cluster_size = 4096  # Cluster size of the drive, read once the device is open
         self.buffer_size = 64 * 1024 * 1024  # 64MB buffer for reading
+        self.read_ahead = 2  # Buffers read ahead of the carver on a background thread; 0 reads in line
+        self.direct_io = False  # Read around the OS cache with aligned reads
+        self.memory = MemoryGovernor(context=self.MP_CONTEXT)  # Budget for buffers and candidates, shared with workers
+        self.candidate_bytes = 0  # Bytes of the candidate being carved, counted against the budget
         self.progress_step = self.cluster_size  # Update progress every cluster
-        self.should_stop = False  # Flag to stop the scan
-        self.paused = False  # Flag to pause the scan
+        self.workers = max(1, workers or os.cpu_count() or 1)  # Deep scan worker processes
+        self.on_file_found = on_file_found or (lambda file_info: None)  # Called for each found file
+        self.on_progress = on_progress or (lambda progress: None)  # Called with a percentage
+        self.stop_event = stop_event or self.MP_CONTEXT.Event()  # Shared with worker processes
+        self.pause_event = pause_event or self.MP_CONTEXT.Event()  # Shared with worker processes
+        self.catalog_path = catalog_path  # SQLite catalog written while scanning, if set
+        self.catalog = None  # ScanCatalog, opened in the scanning thread
+        self.resume_from_checkpoint = resume  # Continue from the checkpoint stored in the catalog
+        self.resume_marks = {}  # Stage progress loaded from the checkpoint
+        self.checkpoint_marks = {}  # Stage key -> offset reached, or True once the stage is complete
+        self.on_checkpoint = self.record_checkpoint  # Worker processes forward marks to the parent instead
+        self.shard_index = None  # Deep scan shard being scanned; None for the whole-drive quick stage
+        self.emitted = None  # (offset, name) keys already in the catalog when resuming
+        self.dedup = DedupIndex()  # Extents and content hashes of files emitted so far
+        self.last_mark = 0.0
+        self.last_checkpoint = time.monotonic()
         self.fs_type = None  # File system type (NTFS/FAT32)
         self.mft_offset = None  # Offset of MFT (NTFS)
+        self.mft_decoder = MftDecoder()  # Record size is read from the boot sector once the device is open
+        self.cluster_bitmap = None  # Cached $Bitmap (NTFS), loaded once per scan
+        self.fat_table = None  # Cached FAT (FAT32), loaded once per scan
         self.start_time = None  # Start time for scan
         self.total_bytes_processed = 0  # Bytes scanned so far
+        self.last_progress = None  # Last percentage passed to on_progress
         self.junk_counter = 0  # Count of unreadable data chunks
         self.junk_threshold = 100  # Max junk before stopping
         self.quick_scan_files = {}  # Store Quick Scan results for Deep Scan
+        self.file_types = set(file_types) if file_types else None  # File types to report; None for all
+        self.classifier = ClusterClassifier(self.cluster_size)  # Rebuilt for the drive's cluster size
+        self.signature_matcher = SignatureMatcher({
+            file_type: sig for file_type, sig in FileSignatures.SIGNATURES.items()
+            if not self.file_types or file_type in self.file_types
+        })  # Compiled once per scan, for the requested types only
+        self.metrics = ScanMetrics()  # Per-stage telemetry, including that of worker processes
+        self.metrics.memory = self.memory
+
+    @property
+    def should_stop(self):
+        """Flag to stop the scan, visible to every worker process."""
+        return self.stop_event.is_set()
+
+    @should_stop.setter
+    def should_stop(self, value):
+        self.stop_event.set() if value else self.stop_event.clear()
+
+    @property
+    def paused(self):
+        """Flag to pause the scan, visible to every worker process."""
+        return self.pause_event.is_set()
+
+    @paused.setter
+    def paused(self, value):
+        self.pause_event.set() if value else self.pause_event.clear()
 
     def get_cluster_size(self):
         """Get the cluster size of the drive."""
         try:
-            sectors_per_cluster, bytes_per_sector, _, _ = win32file.GetDiskFreeSpace(self.drive)
-            return sectors_per_cluster * bytes_per_sector
+            return self.device.get_cluster_size()
         except Exception as e:
             logging.error(f"Failed to get cluster size: {e}")
             return 4096  # Default to 4KB if failed
 
     def run(self):
-        """Main thread execution method."""
+        """Main scan execution method."""
         if not self.open_drive():
             return
+        status = "failed"
         try:
-            drive_size = win32file.GetDiskFreeSpaceEx(self.drive)[0]  # Total drive size
+            drive_size = self.device.size  # Total drive size
             self.start_time = time.time()
-            self.fs_type = self.detect_file_system()
+            if self.catalog_path:
+                self.catalog = ScanCatalog(self.catalog_path)
+                if self.resume_from_checkpoint:
+                    self.load_checkpoint()
+                else:
+                    self.catalog.begin(self.drive, self.scan_type)
+            self.prepare_scan()
+            self.fit_memory()
             logging.info(f"Scanning {self.drive} ({drive_size:,} bytes) with {self.scan_type} scan, FS: {self.fs_type}")
 
             if self.scan_type == "Quick":
-                self.quick_scan(0, drive_size)
+                self.run_stage('quick', self.quick_scan, 0, drive_size)
             else:
                 self.deep_scan(0, drive_size)
 
-            self.close()
+            status = "stopped" if self.should_stop else "complete"
             logging.info("Scan completed")
         except Exception as e:
             logging.error(f"Scan failed: {traceback.format_exc()}")
+        finally:
             self.close()
+            if self.catalog:
+                self.save_checkpoint()
+                self.catalog.set_info(metrics=json.dumps(self.metrics.report()))
+                self.catalog.finish(status)
+                self.catalog.close()
+                self.catalog = None
+
+    def fit_memory(self):
+        """Shrink read-ahead, buffers and workers so every worker's buffers and largest candidate fit the memory budget.
+
+        A budget too small for even the smallest setting is raised to it, so waiting for memory cannot deadlock.
+        """
+        if self.memory.budget is None:
+            return
+        workers = self.workers if self.scan_type == "Deep" else 1
+        min_workers = workers if self.resume_from_checkpoint else 1  # Resumed shards must line up
+        overlap = self.chunk_length(0, float('inf')) - self.buffer_size
+        fitted = self.memory.fit(workers, self.buffer_size, self.read_ahead, self.CANDIDATE_SIZE, min_workers, overlap)
+        if fitted != (workers, self.buffer_size, self.read_ahead):
+            logging.info(f"Memory budget {self.memory.budget:,} bytes: {fitted[0]} workers, "
+                         f"{fitted[1] // 1048576} MB buffers, read-ahead {fitted[2]}")
+        need = MemoryGovernor.need(*fitted, self.CANDIDATE_SIZE, overlap)
+        if need > self.memory.budget:
+            logging.warning(f"Memory budget {self.memory.budget:,} bytes is below the {need:,} bytes the scan needs; "
+                            f"using {need:,}")
+            self.memory.budget = need
+        if self.scan_type == "Deep":
+            self.workers = fitted[0]
+        self.buffer_size, self.read_ahead = fitted[1], fitted[2]
+
+    def hold_candidate(self, size):
+        """Count size bytes of the file being read against the memory budget, in place of the previous one's.
+
+        Waits like a read-ahead buffer while the bytes would take the scan over its budget.
+        """
+        self.memory.release(self.candidate_bytes)
+        self.candidate_bytes = 0
+        waited = self.memory.acquire(size, lambda: self.should_stop)
+        self.candidate_bytes = size
+        if waited:
+            self.metrics.add('memory_wait', waited)
+
+    def hash_extents(self, extents):
+        """Read a file too large to hold slab by slab; return (first bytes, bytes read, content hash)."""
+        digest = hashlib.blake2b(digest_size=16)  # As FileUtils.content_hash, fed a slab at a time
+        head = b''
+        size = 0
+        self.hold_candidate(self.STREAM_SLAB)
+        for offset, length in extents:
+            for pos in range(0, length, self.STREAM_SLAB):
+                if self.should_stop:
+                    return head, size, digest.hexdigest()
+                data = self.device.read_at(offset + pos, min(self.STREAM_SLAB, length - pos))
+                digest.update(data)
+                head = head or data[:16]
+                size += len(data)
+        return head, size, digest.hexdigest()
+
+    def emit_file(self, file_info):
+        """Record a found file in the scan catalog and pass it to the callback."""
+        if self.file_types and file_info['type'] not in self.file_types:
+            return
+        replaces = self.dedup.add(file_info)
+        if replaces is None:
+            self.metrics.add('duplicates')
+            return
+        if self.emitted is not None:
+            key = (file_info['offset'], file_info['name'])
+            if key in self.emitted:
+                return  # Already found before the scan was resumed
+            self.emitted.add(key)
+            self.emitted.difference_update(replaces)
+        file_info.pop('replaces', None)  # A worker's own replacements are recomputed against this index
+        if replaces:
+            file_info['replaces'] = replaces  # Carves the front ends should swap for this named record
+            self.metrics.add('duplicates', len(replaces))
+        if self.catalog:
+            if replaces:
+                self.catalog.remove_files(replaces)
+            self.catalog.add_file(file_info)
+        self.on_file_found(file_info)
+
+    def load_checkpoint(self):
+        """Restore stage progress, junk count and already-found files from the catalog."""
+        checkpoint = json.loads(self.catalog.info().get('checkpoint') or '{}')
+        self.workers = checkpoint.get('workers', self.workers)  # Shards must line up with the checkpoint
+        self.junk_counter = checkpoint.get('junk_counter', 0)
+        self.resume_marks = checkpoint.get('marks', {})
+        self.checkpoint_marks = dict(self.resume_marks)
+        self.emitted = self.catalog.file_keys()
+        self.dedup = DedupIndex(*self.catalog.dedup_keys())  # Duplicates of files found before are still skipped
+        self.catalog.set_info(status="running", resumed=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        logging.info(f"Resuming scan of {self.drive}: {len(self.emitted)} files already found, "
+                     f"{len(self.resume_marks)} stage marks")
+
+    def save_checkpoint(self):
+        """Flush found files and write the current stage marks to the catalog."""
+        if not self.catalog:
+            return
+        self.catalog.flush()  # Every file found before the marks must be durable first
+        self.catalog.set_info(checkpoint=json.dumps({
+            'workers': self.workers, 'junk_counter': self.junk_counter, 'marks': self.checkpoint_marks
+        }))
+        self.last_checkpoint = time.monotonic()
+
+    def record_checkpoint(self, key, mark):
+        """Note a stage mark and write a checkpoint when the interval has passed."""
+        self.checkpoint_marks[key] = mark
+        if time.monotonic() - self.last_checkpoint >= self.CHECKPOINT_INTERVAL:
+            self.save_checkpoint()
+
+    def stage_key(self, stage):
+        """Return the checkpoint key of a stage in the current shard."""
+        return stage if self.shard_index is None else f"{self.shard_index}/{stage}"
+
+    def mark_progress(self, stage, offset, done=False):
+        """Report that everything in a stage before offset has been scanned."""
+        now = time.monotonic()
+        if not done and now - self.last_mark < self.MARK_INTERVAL:
+            return
+        self.last_mark = now
+        self.on_checkpoint(self.stage_key(stage), True if done else offset)
+
+    def run_stage(self, stage, scan, start_offset, *args):
+        """Run a scan stage from its checkpointed offset, skipping it if it already completed."""
+        mark = self.resume_marks.get(self.stage_key(stage))
+        if mark is True or self.junk_counter >= self.junk_threshold:
+            return
+        self.metrics.begin(stage)
+        junk, started = self.junk_counter, time.perf_counter()
+        try:
+            scan(max(start_offset, mark or 0), *args)
+        finally:
+            self.metrics.add('junk', self.junk_counter - junk)
+            self.metrics.add('elapsed', time.perf_counter() - started)
+        if not self.should_stop:
+            self.mark_progress(stage, None, done=True)
+
+    def prepare_scan(self):
+        """Read the drive geometry, file system and allocation map (NTFS $Bitmap or FAT32 FAT)."""
+        self.cluster_size = self.get_cluster_size()
+        self.progress_step = self.cluster_size
+        self.classifier = ClusterClassifier(self.cluster_size)
+        self.fs_type = self.detect_file_system()
+        if self.fs_type == 'NTFS':
+            self.mft_offset = self.find_mft_offset()
+            self.mft_decoder = MftDecoder(MftDecoder.record_size_from_boot_sector(
+                self.device.read_at(0, 512), self.cluster_size))
+            self.cluster_bitmap = self.load_cluster_bitmap()
+        elif self.fs_type == 'FAT32':
+            self.fat_table = self.load_fat_table()
 
     def open_drive(self):
         """Open the drive for raw access."""
         try:
-            self.handle = win32file.CreateFile(
-                f"\\\\.\\{self.drive[:2]}",  # Physical drive path (e.g., \\.\C:)
-                win32file.GENERIC_READ,
-                win32file.FILE_SHARE_READ | win32file.FILE_SHARE_WRITE,
-                None,
-                win32file.OPEN_EXISTING,
-                0,
-                None
-            )
-            logging.info(f"Drive opened: {self.drive}")
+            self.device = MeteredDevice(BlockDevice.open(self.drive, self.direct_io), self.metrics)
+            logging.info(f"Drive opened: {self.drive}" + (" (direct I/O)" if self.device.device.direct else ""))
             return True
         except Exception as e:
             logging.error(f"Failed to open drive {self.drive}: {traceback.format_exc()}")
@@ -164,8 +2414,7 @@ class ScanThread(QThread):
     def detect_file_system(self):
         """Detect the file system type (NTFS or FAT32)."""
         try:
-            win32file.SetFilePointer(self.handle, 0, 0)
-            _, boot_sector = win32file.ReadFile(self.handle, 512, None)
+            boot_sector = self.device.read_at(0, 512)
             if boot_sector[3:8] == b'NTFS ':
                 return 'NTFS'
             elif boot_sector[82:90] == b'FAT32   ':
@@ -179,8 +2428,10 @@ class ScanThread(QThread):
         """Emit progress update based on bytes processed."""
         self.total_bytes_processed = bytes_processed
         progress = min(int((self.total_bytes_processed / max(drive_size, 1)) * 100), 100)
-        logging.debug(f"Progress emitting: {progress}% - {self.total_bytes_processed:,} / {drive_size:,} bytes")
-        self.progress_updated.emit(progress)
+        if progress != self.last_progress:  # Only whole-percent steps reach the callback
+            self.last_progress = progress
+            logging.debug(f"Progress emitting: {progress}% - {self.total_bytes_processed:,} / {drive_size:,} bytes")
+            self.on_progress(progress)
 
     def quick_scan(self, start_offset, drive_size):
         """Perform a quick scan for recoverable files."""
@@ -189,21 +2440,35 @@ class ScanThread(QThread):
         offset = start_offset
         last_progress_update = offset
 
-        while offset < scan_size and not self.should_stop and self.junk_counter < self.junk_threshold:
-            while self.paused and not self.should_stop:
-                time.sleep(0.1)  # Pause loop
-            if self.should_stop:
-                break
-            if self.fs_type == 'NTFS' and self.check_cluster_allocation(offset // self.cluster_size):
-                offset += self.cluster_size * 32  # Skip 32 clusters if allocated
-            else:
-                self.carve_chunk_quick(offset, scan_size)
+        def plan():
+            """Yield the chunks to carve, skipping allocated NTFS extents."""
+            offset = start_offset
+            while offset < scan_size:
+                cluster = offset // self.cluster_size
+                if self.fs_type == 'NTFS' and self.check_cluster_allocation(cluster):
+                    offset = self.cluster_bitmap.run_end(cluster) * self.cluster_size  # Skip the whole allocated extent
+                else:
+                    yield offset, self.chunk_length(offset, scan_size)
+                    offset += self.buffer_size
+
+        with self.open_read_ahead(plan()) as chunks:
+            for (offset, _), data in chunks:
+                if self.should_stop or self.junk_counter >= self.junk_threshold:
+                    break
+                while self.paused and not self.should_stop:
+                    time.sleep(0.1)  # Pause loop
+                if self.should_stop:
+                    break
+                self.carve_chunk_quick(offset, scan_size, data)
                 offset += self.buffer_size
-            
-            if offset - last_progress_update >= self.progress_step:
-                self.update_progress(scan_size, offset)
-                last_progress_update = offset
-                logging.info(f"Quick scan progress at {offset:,} bytes")
+
+                if offset - last_progress_update >= self.progress_step:
+                    self.update_progress(scan_size, offset)
+                    last_progress_update = offset
+                    if LogUtils.debug_enabled():
+                        logging.debug(f"Quick scan progress at {offset:,} bytes")
+                if not self.should_stop:  # An interrupted chunk is scanned again on resume
+                    self.mark_progress('quick', offset)
 
         if self.junk_counter >= self.junk_threshold:
             logging.info(f"Quick scan stopped: Too much unreadable data ({self.junk_counter} junk files)")
@@ -215,236 +2480,349 @@ class ScanThread(QThread):
         # Step 1: Run Quick Scan internally
         logging.info("Deep Scan: Running internal Quick Scan first")
         self.quick_scan_files.clear()
-        self.quick_scan(start_offset, drive_size)
+        self.run_stage('quick', self.quick_scan, start_offset, drive_size)
         quick_files_count = len(self.quick_scan_files)
         logging.info(f"Deep Scan: Quick Scan found {quick_files_count} files")
 
-        # Step 2: Full Deep Scan with multi-threading
-        num_threads = min(os.cpu_count() or 4, 4)  # Use up to 4 threads
-        chunk_size = drive_size // num_threads
+        # Step 2: Full Deep Scan, one shard per worker process
+        num_workers = self.workers
+        chunk_size = drive_size // num_workers
+        shards = []
+        for i in range(num_workers):
+            start = start_offset + i * chunk_size
+            end = start + chunk_size if i < num_workers - 1 else drive_size
+            shards.append((start, end))
         self.total_bytes_processed = 0
-        lock = threading.Lock()  # Lock for thread-safe progress updates
 
-        def update_progress(chunk_offset, chunk_bytes):
-            """Thread-safe progress update."""
-            with lock:
+        if num_workers == 1:
+            def update_progress(chunk_offset, chunk_bytes):
+                """In-process progress update."""
                 self.total_bytes_processed += chunk_bytes
                 self.update_progress(drive_size, self.total_bytes_processed)
 
-        with ThreadPoolExecutor(max_workers=num_threads) as executor:
-            futures = []
-            for i in range(num_threads):
-                start = start_offset + i * chunk_size
-                end = start + chunk_size if i < num_threads - 1 else drive_size
-                if self.fs_type == 'NTFS':
-                    futures.append(executor.submit(self.deep_scan_ntfs, start, end, drive_size, update_progress))
-                elif self.fs_type == 'FAT32':
-                    futures.append(executor.submit(self.deep_scan_fat32, start, end, drive_size, update_progress))
-                else:
-                    futures.append(executor.submit(self.scan_chunk_deep, start, end, drive_size, update_progress))
-            
-            for future in futures:
-                try:
-                    future.result()  # Wait for thread completion
-                except Exception as e:
-                    logging.error(f"Deep scan thread failed: {str(e)}")
+            self.shard_index = 0
+            self.scan_shard(start_offset, drive_size, drive_size, update_progress)
+        else:
+            self.run_worker_processes(shards, drive_size)
 
         # Step 3: Emit Quick Scan files
-        for file_id, file_info in self.quick_scan_files.items():
-            self.file_found.emit(file_info)
-            logging.debug(f"Deep Scan: Added Quick Scan file {file_id}")
+        for file_info in self.quick_scan_files.values():
+            self.emit_file(file_info)
+        logging.debug(f"Deep Scan: Added {len(self.quick_scan_files)} Quick Scan files")
 
         if self.junk_counter >= self.junk_threshold:
             logging.info(f"Deep scan stopped: Too much unreadable data ({self.junk_counter} junk files)")
             self.should_stop = True
         self.update_progress(drive_size, drive_size)  # Final update
 
+    def scan_shard(self, start_offset, end_offset, drive_size, progress_callback):
+        """Run the file-system specific deep scan over one shard of the drive."""
+        if self.fs_type == 'NTFS':
+            self.deep_scan_ntfs(start_offset, end_offset, drive_size, progress_callback)
+        elif self.fs_type == 'FAT32':
+            self.deep_scan_fat32(start_offset, end_offset, drive_size, progress_callback)
+        else:
+            self.run_stage('carve', self.scan_chunk_deep, start_offset, end_offset, drive_size, progress_callback)
+
+    def run_worker_processes(self, shards, drive_size):
+        """Scan shards in worker processes, relaying the results they stream back."""
+        results = self.MP_CONTEXT.Queue()
+        workers = []
+        for index, (start, end) in enumerate(shards):
+            process = self.MP_CONTEXT.Process(
+                target=ScanEngine.run_shard,
+                args=(self.drive, index, start, end, drive_size, self.buffer_size, self.junk_counter,
+                      self.junk_threshold, self.resume_marks, results, self.stop_event, self.pause_event,
+                      LogUtils.queue, LogUtils.level(), self.file_types, self.dedup.extent_keys, self.read_ahead,
+                      self.direct_io, self.memory),
+                daemon=True
+            )
+            process.start()
+            workers.append(process)
+        logging.info(f"Deep Scan: started {len(workers)} worker processes")
+
+        base_junk = self.junk_counter
+        worker_junk = [0] * len(workers)
+        done = set()
+        while len(done) < len(workers):
+            try:
+                kind, index, *payload = results.get(timeout=0.1)
+            except queue.Empty:
+                for index, process in enumerate(workers):
+                    if index not in done and not process.is_alive() and process.exitcode != 0:
+                        logging.error(f"Deep scan worker {index} exited with code {process.exitcode}")
+                        done.add(index)
+                continue
+            if kind == 'file':
+                self.emit_file(payload[0])
+                continue
+            if kind == 'checkpoint':
+                self.record_checkpoint(*payload)
+                continue
+            chunk_bytes, worker_junk[index], snapshot = payload
+            self.metrics.set_worker(index, snapshot)
+            self.total_bytes_processed += chunk_bytes
+            self.update_progress(drive_size, self.total_bytes_processed)
+            self.junk_counter = base_junk + sum(worker_junk)
+            if self.junk_counter >= self.junk_threshold:
+                self.should_stop = True  # Global junk limit reached: stop every worker
+            if kind == 'done':
+                done.add(index)
+        for process in workers:
+            process.join()
+
+    @staticmethod
+    def run_shard(drive, index, start_offset, end_offset, drive_size, buffer_size, junk_counter, junk_threshold,
+                  resume_marks, results, stop_event, pause_event, log_queue=None, log_level=logging.INFO, file_types=None,
+                  extent_keys=None, read_ahead=2, direct_io=False, memory=None):
+        """Worker process entry point: scan one shard with its own device handle."""
+        if log_queue is not None:
+            LogUtils.attach(log_queue, log_level)
+        engine = ScanEngine(drive, "Deep", workers=1, stop_event=stop_event, pause_event=pause_event, file_types=file_types,
+                            on_file_found=lambda file_info: results.put(('file', index, file_info)))
+        engine.buffer_size = buffer_size
+        engine.read_ahead = read_ahead
+        engine.direct_io = direct_io
+        if memory is not None:
+            engine.memory = engine.metrics.memory = memory  # One budget across every worker
+        engine.junk_counter = junk_counter
+        engine.junk_threshold = junk_threshold
+        engine.shard_index = index
+        engine.resume_marks = resume_marks
+        engine.dedup = DedupIndex(extent_keys)  # Skips re-validating what the quick stage already emitted
+        engine.on_checkpoint = lambda key, mark: results.put(('checkpoint', index, key, mark))
+        pending = {'bytes': 0, 'time': time.monotonic()}
+
+        def progress_callback(chunk_offset, chunk_bytes):
+            """Batch progress so the queue carries a few messages per second."""
+            pending['bytes'] += chunk_bytes
+            if time.monotonic() - pending['time'] >= ScanEngine.PROGRESS_INTERVAL:
+                results.put(('progress', index, pending['bytes'], engine.junk_counter - junk_counter,
+                             engine.metrics.snapshot()))
+                pending['bytes'] = 0
+                pending['time'] = time.monotonic()
+
+        try:
+            if engine.open_drive():
+                engine.prepare_scan()
+                engine.scan_shard(start_offset, end_offset, drive_size, progress_callback)
+        except Exception as e:
+            logging.error(f"Deep scan worker {index} failed: {traceback.format_exc()}")
+        finally:
+            engine.close()
+            results.put(('done', index, pending['bytes'], engine.junk_counter - junk_counter,
+                         engine.metrics.snapshot()))
+
     def deep_scan_ntfs(self, start_offset, end_offset, drive_size, progress_callback):
         """Deep scan for NTFS drives."""
         self.mft_offset = self.find_mft_offset()
-        if self.mft_offset and self.junk_counter < self.junk_threshold:
-            self.parse_mft(self.mft_offset, min(end_offset, drive_size), progress_callback)
-        if self.junk_counter < self.junk_threshold:
-            self.parse_ntfs_logfile(end_offset, drive_size, progress_callback)
-        if self.junk_counter < self.junk_threshold:
-            self.scan_chunk_deep(start_offset, end_offset, drive_size, progress_callback)
-        if self.junk_counter < self.junk_threshold:
-            self.scan_unallocated_space(start_offset, end_offset, drive_size, progress_callback)
+        if self.mft_offset:
+            self.run_stage('mft', self.parse_mft, start_offset, min(end_offset, drive_size), progress_callback)
+        self.run_stage('logfile', self.parse_ntfs_logfile, start_offset, min(end_offset, drive_size), progress_callback)
+        self.run_stage('carve', self.scan_chunk_deep, start_offset, end_offset, drive_size, progress_callback)
+        self.run_stage('unallocated', self.scan_unallocated_space, start_offset, end_offset, drive_size,
+                       progress_callback)
 
     def deep_scan_fat32(self, start_offset, end_offset, drive_size, progress_callback):
         """Deep scan for FAT32 drives."""
-        if self.junk_counter < self.junk_threshold:
-            self.parse_fat32(start_offset, end_offset, progress_callback)
-        if self.junk_counter < self.junk_threshold:
-            self.scan_chunk_deep(start_offset, end_offset, drive_size, progress_callback)
-        if self.junk_counter < self.junk_threshold:
-            self.scan_unallocated_space(start_offset, end_offset, drive_size, progress_callback)
+        self.run_stage('fat32', self.parse_fat32, start_offset, end_offset, progress_callback)
+        self.run_stage('carve', self.scan_chunk_deep, start_offset, end_offset, drive_size, progress_callback)
+        self.run_stage('unallocated', self.scan_unallocated_space, start_offset, end_offset, drive_size,
+                       progress_callback)
 
     def find_mft_offset(self):
         """Locate the Master File Table (MFT) offset for NTFS."""
         try:
-            win32file.SetFilePointer(self.handle, 0, 0)
-            _, boot_sector = win32file.ReadFile(self.handle, 512, None)
+            boot_sector = self.device.read_at(0, 512)
             mft_cluster = struct.unpack('<Q', boot_sector[48:56])[0]
             return mft_cluster * self.cluster_size
         except Exception as e:
             logging.error(f"Failed to find MFT: {traceback.format_exc()}")
             return None
 
-    def parse_mft(self, mft_offset, drive_size, progress_callback=None):
-        """Parse the MFT for file metadata and data."""
-        MFT_RECORD_SIZE = 1024  # Size of each MFT record
-        BATCH_SIZE = 16  # Process 16 records at a time
-        offset = mft_offset
-        
-        while offset + MFT_RECORD_SIZE <= drive_size and not self.should_stop and self.junk_counter < self.junk_threshold:
-            while self.paused and not self.should_stop:
-                time.sleep(0.1)
-            if self.should_stop:
-                break
-            try:
-                win32file.SetFilePointer(self.handle, offset, 0)
-                _, mft_batch = win32file.ReadFile(self.handle, MFT_RECORD_SIZE * BATCH_SIZE, None)
-                
-                for i in range(0, min(len(mft_batch), MFT_RECORD_SIZE * BATCH_SIZE), MFT_RECORD_SIZE):
-                    mft_record = mft_batch[i:i + MFT_RECORD_SIZE]
-                    if len(mft_record) < 4 or mft_record[:4] != b'FILE' or not self.validate_mft_fixup(mft_record):
-                        self.junk_counter += 1
-                        continue
-                        
-                    file_info = self.extract_mft_file_info(mft_record, offset + i)
-                    if file_info:
-                        self.file_found.emit(file_info)
-                    else:
-                        self.junk_counter += 1
-                
-                offset += MFT_RECORD_SIZE * BATCH_SIZE
-                if progress_callback:
-                    progress_callback(offset, MFT_RECORD_SIZE * BATCH_SIZE)
-            except Exception as e:
-                logging.error(f"MFT parsing error at {offset}: {str(e)}")
-                offset += MFT_RECORD_SIZE * BATCH_SIZE
-                self.junk_counter += 1
-
-    def validate_mft_fixup(self, mft_record):
-        """Validate MFT record integrity using fixup array."""
-        try:
-            sequence_offset = struct.unpack('<H', mft_record[4:6])[0]
-            sequence_count = struct.unpack('<H', mft_record[6:8])[0]
-            sequence_number = struct.unpack('<H', mft_record[sequence_offset:sequence_offset + 2])[0]
-            for i in range(sequence_count):
-                check_offset = 512 * (i + 1) - 2
-                if check_offset + 2 > len(mft_record):
-                    return False
-                if struct.unpack('<H', mft_record[check_offset:check_offset + 2])[0] != sequence_number:
-                    return False
-            return True
-        except Exception:
-            return False
+    def read_mft_record(self, number):
+        """Read and decode one MFT record by number, or return None."""
+        record_size = self.mft_decoder.record_size
+        offset = self.mft_offset + number * record_size
+        return self.mft_decoder.decode_record(self.device.read_at(offset, record_size), offset)
+
+    def stream_extents(self, record):
+        """Return the (offset, length) disk extents of a non-resident $DATA stream."""
+        extents = []
+        if record and record.has_data and not record.resident:
+            remaining = record.data_size
+            for lcn, length in self.decode_data_runs(record.data):
+                size = min(length * self.cluster_size, remaining)
+                if size <= 0:
+                    break
+                extents.append((lcn * self.cluster_size, size))
+                remaining -= size
+        return extents
 
-    def parse_ntfs_logfile(self, end_offset, drive_size, progress_callback=None):
-        """Parse the NTFS $LogFile for additional file data."""
+    def mft_extents(self):
+        """Return the (offset, length) extents of the MFT from the $DATA run list of record 0."""
         try:
-            logfile_offset = self.find_logfile_offset()
-            if not logfile_offset:
-                return
-                
-            offset = logfile_offset
-            while offset < min(end_offset, drive_size) and not self.should_stop and self.junk_counter < self.junk_threshold:
-                win32file.SetFilePointer(self.handle, offset, 0)
-                _, log_data = win32file.ReadFile(self.handle, self.buffer_size, None)
-                
-                pos = 0
-                while pos < len(log_data) - 16 and not self.should_stop:
-                    if log_data[pos:pos+4] == b'RCRD':
-                        file_info = self.extract_logfile_info(log_data[pos:], offset + pos)
+            extents = self.stream_extents(self.read_mft_record(0))
+            if extents:
+                return extents
+        except Exception as e:
+            logging.error(f"Failed to read the MFT run list: {traceback.format_exc()}")
+        logging.warning("MFT run list unavailable, scanning records from the MFT offset")
+        return [(self.mft_offset, self.device.size - self.mft_offset)]
+
+    def parse_mft(self, start_offset, end_offset, progress_callback=None):
+        """Parse the MFT records stored in [start_offset, end_offset) in large slabs."""
+        record_size = self.mft_decoder.record_size
+        for extent_offset, extent_length in self.mft_extents():
+            extent_end = extent_offset + extent_length
+            # Records belong to the shard they start in
+            offset = extent_offset + max(-(-(start_offset - extent_offset) // record_size), 0) * record_size
+            last = min(extent_end, end_offset)
+            while offset < last and not self.should_stop and self.junk_counter < self.junk_threshold:
+                while self.paused and not self.should_stop:
+                    time.sleep(0.1)
+                if self.should_stop:
+                    break
+                slab_records = min(self.mft_decoder.SLAB_RECORDS, -(-(last - offset) // record_size))
+                slab_size = min(slab_records * record_size, extent_end - offset)
+                try:
+                    records, corrupt = self.mft_decoder.decode_slab(self.device.read_at(offset, slab_size), offset)
+                    self.junk_counter += corrupt
+                    self.metrics.add('candidates', len(records))
+                    for record in records:
+                        if self.should_stop:
+                            break
+                        if record.is_directory or not record.has_data:
+                            continue  # Directories and unused records hold no file content
+                        file_info = self.extract_mft_file_info(record)
                         if file_info:
-                            self.file_found.emit(file_info)
+                            self.metrics.add('validated')
+                            self.emit_file(file_info)
                         else:
                             self.junk_counter += 1
-                    else:
-                        self.junk_counter += 1
-                    pos += 1
-                
-                offset += self.buffer_size
+                except Exception as e:
+                    logging.error(f"MFT parsing error at {offset}: {str(e)}")
+                    self.junk_counter += 1
+                offset += slab_size
                 if progress_callback:
-                    progress_callback(offset, self.buffer_size)
+                    progress_callback(offset, slab_size)
+
+    def parse_ntfs_logfile(self, start_offset, end_offset, progress_callback=None):
+        """Walk the NTFS $LogFile page by page and recover resident file content it still holds."""
+        try:
+            extents = self.logfile_extents()
+            if not extents or not start_offset <= extents[0][0] < end_offset:
+                return  # Parsed once, by the shard holding the start of the $LogFile
+            page_size = LogFileParser.page_size_from_restart(self.device.read_at(extents[0][0], 512))
+            parser = LogFileParser(page_size, self.cluster_size, self.mft_decoder.record_size)
+            slab_size = max(self.LOGFILE_SLAB // page_size, 1) * page_size
+            fragments, names = [], {}
+            for extent_offset, extent_length in extents:
+                offset = extent_offset
+                extent_end = extent_offset + extent_length
+                while offset < extent_end and not self.should_stop:
+                    while self.paused and not self.should_stop:
+                        time.sleep(0.1)
+                    size = min(slab_size, extent_end - offset)
+                    slab_fragments, slab_names, corrupt = parser.parse(self.device.read_at(offset, size), offset)
+                    fragments.extend(slab_fragments)
+                    names.update(slab_names)
+                    self.junk_counter += corrupt
+                    offset += size
+                    if progress_callback:
+                        progress_callback(offset, size)
+            logging.info(f"$LogFile: {len(fragments)} content fragments, {len(names)} file names")
+            self.metrics.add('candidates', len(fragments))
+            for fragment in fragments:
+                if self.should_stop:
+                    break
+                file_info = self.extract_logfile_info(fragment, names)
+                if file_info:
+                    self.metrics.add('validated')
+                    self.emit_file(file_info)
         except Exception as e:
-            logging.error(f"$LogFile parsing error: {str(e)}")
+            logging.error(f"$LogFile parsing error: {traceback.format_exc()}")
 
-    def find_logfile_offset(self):
-        """Find the offset of the $LogFile in NTFS."""
+    def logfile_extents(self):
+        """Return the disk extents of the $LogFile (MFT record 2)."""
         try:
-            win32file.SetFilePointer(self.handle, self.mft_offset + 5 * 1024, 0)
-            _, mft_record = win32file.ReadFile(self.handle, 1024, None)
-            if mft_record[:4] != b'FILE':
-                return None
-            file_info = self.extract_mft_file_info(mft_record, self.mft_offset + 5 * 1024)
-            if file_info and file_info['name'].startswith('$LogFile'):
-                return file_info['offset']
-            return None
+            record = self.read_mft_record(2)
+            if record and record.name.startswith('$LogFile'):
+                return self.stream_extents(record)
         except Exception:
-            return None
+            logging.error(f"Failed to locate $LogFile: {traceback.format_exc()}")
+        return []
 
-    def extract_logfile_info(self, log_data, offset):
-        """Extract file info from $LogFile records."""
+    def extract_logfile_info(self, fragment, names):
+        """Build a file record from resident file content found in the $LogFile."""
         try:
-            name = f"log_recovered_{offset}"
-            data = log_data[:1024]
-            file_type = self.guess_file_type(data[:16]) or 'unknown'
-            if file_type == 'txt' and not self.is_readable_text(data):
+            data = fragment.data
+            name = names.get(fragment.mft_record)
+            extension = name.split('.')[-1].lower() if name and '.' in name else ""
+            file_type = (FileUtils.guess_file_type(data[:16], extension)
+                         or (extension if extension in FileSignatures.SIGNATURES else None)
+                         or 'txt')
+            if file_type == 'txt' and not FileUtils.is_readable_text(data):
                 return None
+            offset = fragment.extents[0][0]
+            stem = name.rsplit('.', 1)[0] if name else "log_recovered"
             return {
                 'offset': offset,
                 'type': file_type,
-                'data': data,
+                'source': self.drive,
+                'extents': fragment.extents,
+                'repair': False,
                 'size': len(data),
-                'name': f"{name}.{file_type}",
+                'name': f"{stem}_{fragment.lsn}.{file_type}",
                 'status': "Recoverable",
                 'state': "Reconstructed",
+                'hash': FileUtils.content_hash(data),
                 'last_modified': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 'path': f"{self.drive}{offset}"
             }
         except Exception:
             return None
 
-    def extract_mft_file_info(self, mft_record, offset):
-        """Extract file metadata and data from an MFT record."""
+    def extract_mft_file_info(self, record):
+        """Extract file metadata and data from a decoded MFT record."""
+        offset = record.offset
         try:
-            filename_offset = mft_record.find(b'\x30\x00')
-            if filename_offset == -1:
-                logging.warning(f"No $FILE_NAME attribute at offset {offset}")
-                name = f"file_{offset}"
-                extension = ""
-            else:
-                name_length = mft_record[filename_offset + 64]
-                name = mft_record[filename_offset + 66:filename_offset + 66 + name_length * 2].decode('utf-16le', errors='ignore')
-                extension = name.split('.')[-1].lower() if '.' in name else ""
-
-            data_offset = mft_record.find(b'\x80\x00')
-            if data_offset == -1:
-                logging.warning(f"No $DATA attribute at offset {offset}")
+            if not record.name and LogUtils.debug_enabled():  # Common for extension records; not worth a warning
+                logging.debug(f"No $FILE_NAME attribute at offset {offset}")
+            name = record.name or f"file_{offset}"
+            extension = name.split('.')[-1].lower() if '.' in name else ""
+
+            if not record.has_data:
+                if LogUtils.debug_enabled():
+                    logging.debug(f"No $DATA attribute at offset {offset}")
                 return None
-            non_resident = mft_record[data_offset + 8] == 1
-            if non_resident:
-                run_offset = struct.unpack('<H', mft_record[data_offset + 32:data_offset + 34])[0]
-                run_data = mft_record[data_offset + run_offset:]
-                file_data, file_size, state = self.read_data_runs(run_data, offset)
-            else:
-                file_size = struct.unpack('<I', mft_record[data_offset + 48:data_offset + 52])[0]
-                file_data = mft_record[data_offset + 56:data_offset + 56 + file_size]
+            digest = None  # Content hash of a file too large to hold, taken while it is streamed
+            if record.resident:
+                file_data = record.data
+                file_size = len(file_data)
+                extents = [(record.data_offset, file_size)]  # Resident data lives in the record
                 state = "Good"
+            elif record.data_size > self.CANDIDATE_SIZE:
+                extents = self.stream_extents(record)
+                if not extents or any(self.check_cluster_allocation(offset // self.cluster_size) for offset, _ in extents):
+                    return None  # Overwritten in part: reassembling the fragments would need the whole file
+                file_data, file_size, digest = self.hash_extents(extents)
+                state = "Unverified"  # Neither validated nor reconstructed: it is never held whole
+            else:
+                self.hold_candidate(record.data_size)
+                file_data, file_size, state, extents = self.read_data_runs(record.data, record.data_size)
 
-            file_type = self.guess_file_type(file_data[:16]) or extension or 'unknown'
-            if file_type == 'txt' and not self.is_readable_text(file_data):
-                return None
-            if self.scan_type == "Deep" and file_type != 'unknown':
-                file_data, state = self.reconstruct_file(file_type, file_data)
-                state = "Good" if self.validate_file(file_type, file_data) else state
-            elif not self.validate_file(file_type, file_data):
-                return None
+            file_type = FileUtils.guess_file_type(file_data[:16], extension) or extension or 'unknown'
+            if digest is None:
+                if file_type == 'txt' and not FileUtils.is_readable_text(file_data):
+                    return None
+                if self.scan_type == "Deep" and file_type != 'unknown':
+                    file_data, state = FileUtils.reconstruct_file(file_type, file_data)
+                    state = "Good" if FileUtils.validate_file(file_type, file_data) else state
+                elif not FileUtils.validate_file(file_type, file_data):
+                    return None
 
-            last_modified = self.get_mft_timestamp(mft_record)
+            last_modified = self.get_mft_timestamp(record.modified)
             if extension and file_type != 'unknown':
                 name = f"{name.split('.')[0]}.{file_type}"
             elif file_type != 'unknown':
@@ -455,11 +2833,14 @@ class ScanThread(QThread):
             file_info = {
                 'offset': offset,
                 'type': file_type,
-                'data': file_data,
+                'source': self.drive,
+                'extents': extents,
+                'repair': self.scan_type == "Deep" and file_type != 'unknown' and digest is None,
                 'size': file_size,
                 'name': name,
                 'status': "Recoverable",
                 'state': state,
+                'hash': digest or FileUtils.content_hash(file_data),
                 'last_modified': last_modified.strftime("%Y-%m-%d %H:%M:%S"),
                 'path': f"{self.drive}{offset}"
             }
@@ -469,133 +2850,151 @@ class ScanThread(QThread):
         except Exception as e:
             logging.error(f"Failed to extract MFT info at {offset}: {traceback.format_exc()}")
             return None
+        finally:
+            self.hold_candidate(0)
 
-    def read_data_runs(self, run_data, base_offset):
-        """Read file data from NTFS data runs."""
+    def read_data_runs(self, run_data, data_size):
+        """Read file data from NTFS data runs, with the (offset, length) extents it came from."""
         file_data = bytearray()
         total_size = 0
-        pos = 0
+        remaining = data_size
         state = "Good"
         fragments = []
-        while pos < len(run_data) and run_data[pos] != 0 and not self.should_stop:
-            header = run_data[pos]
-            length_size = header & 0x0F
-            offset_size = (header >> 4) & 0x0F
-            pos += 1
-
-            length = int.from_bytes(run_data[pos:pos + length_size], 'little')
-            pos += length_size
-            offset = int.from_bytes(run_data[pos:pos + offset_size], 'little', signed=True)
-            pos += offset_size
-
-            cluster_offset = (base_offset // self.cluster_size + offset) * self.cluster_size
-            fragment_size = length * self.cluster_size
-            if self.check_cluster_allocation(cluster_offset // self.cluster_size):
+        extents = []
+        for lcn, length in self.decode_data_runs(run_data):
+            if self.should_stop or remaining <= 0:
+                break
+            cluster_offset = lcn * self.cluster_size
+            fragment_size = min(length * self.cluster_size, remaining)
+            remaining -= fragment_size
+            if self.check_cluster_allocation(lcn):
                 state = "Partially Overwritten"
                 fragments.append((file_data, total_size))
                 file_data = bytearray()
                 total_size = 0
                 continue
             try:
-                win32file.SetFilePointer(self.handle, cluster_offset, 0)
-                _, data = win32file.ReadFile(self.handle, fragment_size, None)
+                data = self.device.read_at(cluster_offset, fragment_size)
                 file_data.extend(data)
                 total_size += len(data)
+                FileUtils.add_extent(extents, cluster_offset, len(data))
             except Exception as e:
                 logging.error(f"Data run read failed at {cluster_offset}: {e}")
                 state = "Corrupted"
                 break
         if self.scan_type == "Deep" and fragments:
-            file_type = self.guess_file_type(file_data[:16]) or 'unknown'
-            if file_type == 'txt' and not self.is_readable_text(file_data):
-                return bytearray(), 0, "Corrupted"
-            file_data, state = self.reconstruct_fragments(file_type, fragments + [(file_data, total_size)])
+            file_type = FileUtils.guess_file_type(file_data[:16]) or 'unknown'
+            if file_type == 'txt' and not FileUtils.is_readable_text(file_data):
+                return bytearray(), 0, "Corrupted", []
+            file_data, state = FileUtils.reconstruct_fragments(file_type, fragments + [(file_data, total_size)])
             total_size = len(file_data)
         elif fragments:
-            return bytearray(), 0, "Fragmented"
-        return file_data, total_size, state
+            return bytearray(), 0, "Fragmented", []
+        return file_data, total_size, state, extents
 
-    def get_mft_timestamp(self, mft_record):
-        """Extract timestamp from MFT record."""
+    def get_mft_timestamp(self, filetime):
+        """Convert an MFT FILETIME (100ns ticks since 1601) to a datetime."""
         try:
-            std_info_offset = mft_record.find(b'\x10\x00')
-            if std_info_offset == -1:
-                logging.warning("No $STANDARD_INFORMATION attribute found")
-                return datetime.datetime.now()
-            timestamp = struct.unpack('<Q', mft_record[std_info_offset + 24:std_info_offset + 32])[0]
-            if timestamp == 0:
+            if filetime == 0:
                 return datetime.datetime.now()
-            return datetime.datetime(1601, 1, 1) + datetime.timedelta(microseconds=timestamp / 10)
+            return datetime.datetime(1601, 1, 1) + datetime.timedelta(microseconds=filetime / 10)
         except Exception as e:
             logging.error(f"Failed to extract MFT timestamp: {traceback.format_exc()}")
             return datetime.datetime.now()
 
     def parse_fat32(self, start_offset, end_offset, progress_callback=None):
-        """Parse FAT32 directory entries for deleted files."""
+        """Walk the FAT32 directory tree through the in-memory FAT and recover deleted files."""
         try:
-            win32file.SetFilePointer(self.handle, 0, 0)
-            _, boot_sector = win32file.ReadFile(self.handle, 512, None)
-            sectors_per_cluster = boot_sector[13]
-            reserved_sectors = struct.unpack('<H', boot_sector[14:16])[0]
-            fat_copies = boot_sector[16]
-            sectors_per_fat = struct.unpack('<I', boot_sector[36:40])[0]
-            root_cluster = struct.unpack('<I', boot_sector[44:48])[0]
-
-            fat_offset = reserved_sectors * self.sector_size
-            dir_offset = (reserved_sectors + fat_copies * sectors_per_fat) * self.sector_size
-
-            offset = max(start_offset, dir_offset)
-            while offset < end_offset and not self.should_stop and self.junk_counter < self.junk_threshold:
+            fat = self.fat_table
+            if not fat or not start_offset <= fat.cluster_offset(fat.root_cluster) < end_offset:
+                return  # Walked once, by the shard holding the root directory
+            max_clusters = max(self.FAT32_MAX_DIRECTORY // fat.cluster_size, 1)
+            pending = [(fat.root_cluster, False)]  # (first cluster, deleted) of directories still to read
+            seen = set()
+            while pending and not self.should_stop and self.junk_counter < self.junk_threshold:
                 while self.paused and not self.should_stop:
                     time.sleep(0.1)
-                if self.should_stop:
-                    break
-                win32file.SetFilePointer(self.handle, offset, 0)
-                _, dir_data = win32file.ReadFile(self.handle, 32, None)
-                if dir_data[0] in [0xE5, 0x00]:  # Deleted or free entry
-                    if dir_data[0] == 0xE5:
-                        name = dir_data[0:8].decode('ascii', errors='ignore').strip()
-                        ext = dir_data[8:11].decode('ascii', errors='ignore').strip()
-                        full_name = f"{name}.{ext}" if ext else name
-                        cluster = struct.unpack('<H', dir_data[26:28])[0] + (struct.unpack('<H', dir_data[20:22])[0] << 16)
-                        size = struct.unpack('<I', dir_data[28:32])[0]
-                        time_val = struct.unpack('<H', dir_data[14:16])[0]
-                        date_val = struct.unpack('<H', dir_data[16:18])[0]
-                        last_modified = self.fat32_to_datetime(date_val, time_val)
-                        file_data, actual_size, state = self.read_fat32_file(cluster, size, reserved_sectors, fat_copies, sectors_per_fat, sectors_per_cluster)
-                        if file_data:
-                            file_type = self.guess_file_type(file_data[:16]) or ext.lower() or 'unknown'
-                            if file_type == 'txt' and not self.is_readable_text(file_data):
-                                self.junk_counter += 1
-                                continue
-                            if self.scan_type == "Deep":
-                                file_data, state = self.reconstruct_file(file_type, file_data)
-                            elif not self.validate_file(file_type, file_data):
-                                self.junk_counter += 1
-                                continue
-                            file_info = {
-                                'offset': offset,
-                                'type': file_type,
-                                'data': file_data,
-                                'size': actual_size,
-                                'name': f"{name}.{file_type}" if file_type != 'unknown' else full_name,
-                                'status': "Recoverable",
-                                'state': state,
-                                'last_modified': last_modified.strftime("%Y-%m-%d %H:%M:%S"),
-                                'path': f"{self.drive}{offset}"
-                            }
-                            if self.scan_type == "Quick":
-                                self.quick_scan_files[f"{name}.{file_type}"] = file_info
-                            self.file_found.emit(file_info)
-                        else:
-                            self.junk_counter += 1
+                first_cluster, deleted = pending.pop()
+                if first_cluster in seen:
+                    continue
+                seen.add(first_cluster)
+                if deleted:
+                    # A deleted directory's chain is zeroed; only its first cluster is known, if still free
+                    clusters = [] if fat.entries[first_cluster] else [first_cluster]
                 else:
-                    self.junk_counter += 1
-                offset += 32
-                if progress_callback:
-                    progress_callback(offset, 32)
+                    clusters = fat.chain(first_cluster, max_clusters)
+                for run_start, run_count in FatTable.runs_of(clusters):
+                    if self.should_stop:
+                        break
+                    run_offset = fat.cluster_offset(run_start)
+                    data = self.device.read_at(run_offset, run_count * fat.cluster_size)
+                    entries, files, directories = fat.parse_directory(data)
+                    self.metrics.add('candidates', len(files))
+                    for row in directories.tolist():
+                        entry = entries[row]
+                        pending.append(((int(entry['cluster_hi']) << 16) | int(entry['cluster_lo']),
+                                        deleted or entry['name'][0] == FatTable.DELETED))
+                    for row in files.tolist():
+                        if self.should_stop or self.junk_counter >= self.junk_threshold:
+                            break
+                        self.recover_fat32_entry(entries[row], run_offset + row * FatTable.DIRECTORY_ENTRY.itemsize)
+                    if progress_callback:
+                        progress_callback(run_offset, len(data))
+            logging.info(f"FAT32: walked {len(seen)} directories")
         except Exception as e:
             logging.error(f"FAT32 parsing failed: {traceback.format_exc()}")
+        finally:
+            self.hold_candidate(0)
+
+    def recover_fat32_entry(self, entry, offset):
+        """Recover the file behind one deleted FAT32 directory entry."""
+        name = bytes(entry['name']).decode('ascii', errors='ignore').strip()
+        ext = bytes(entry['ext']).decode('ascii', errors='ignore').strip()
+        full_name = f"{name}.{ext}" if ext else name
+        cluster = (int(entry['cluster_hi']) << 16) | int(entry['cluster_lo'])
+        size = int(entry['size'])
+        last_modified = self.fat32_to_datetime(int(entry['date']), int(entry['time']))
+        digest = None  # Content hash of a file too large to hold, taken while it is streamed
+        if size > self.CANDIDATE_SIZE:
+            extents = self.map_fat32_file(cluster, size)
+            file_data, actual_size, digest = self.hash_extents(extents) if extents else (b'', 0, None)
+            state = "Unverified"  # Neither validated nor reconstructed: it is never held whole
+        else:
+            self.hold_candidate(size)  # Released by the next entry, or once the directory walk ends
+            file_data, actual_size, state, extents = self.read_fat32_file(cluster, size)
+        if not file_data:
+            self.junk_counter += 1
+            return
+        file_type = FileUtils.guess_file_type(file_data[:16], ext.lower()) or ext.lower() or 'unknown'
+        if digest is None:
+            if file_type == 'txt' and not FileUtils.is_readable_text(file_data):
+                self.junk_counter += 1
+                return
+            if self.scan_type == "Deep":
+                started = time.perf_counter()
+                file_data, state = FileUtils.reconstruct_file(file_type, file_data)
+                self.metrics.add('reconstruct_time', time.perf_counter() - started)
+            elif not FileUtils.validate_file(file_type, file_data):
+                self.junk_counter += 1
+                return
+        file_info = {
+            'offset': offset,
+            'type': file_type,
+            'source': self.drive,
+            'extents': extents,
+            'repair': self.scan_type == "Deep" and digest is None,
+            'size': actual_size,
+            'name': f"{name}.{file_type}" if file_type != 'unknown' else full_name,
+            'status': "Recoverable",
+            'state': state,
+            'hash': digest or FileUtils.content_hash(file_data),
+            'last_modified': last_modified.strftime("%Y-%m-%d %H:%M:%S"),
+            'path': f"{self.drive}{offset}"
+        }
+        if self.scan_type == "Quick":
+            self.quick_scan_files[f"{name}.{file_type}"] = file_info
+        self.metrics.add('validated')
+        self.emit_file(file_info)
 
     def fat32_to_datetime(self, date, time):
         """Convert FAT32 date/time to datetime object."""
@@ -611,300 +3010,448 @@ class ScanThread(QThread):
             logging.error(f"Failed to convert FAT32 timestamp: {e}")
             return datetime.datetime.now()
 
-    def read_fat32_file(self, start_cluster, size, reserved_sectors, fat_copies, sectors_per_fat, sectors_per_cluster):
-        """Read file data from FAT32 clusters."""
+    def map_fat32_file(self, start_cluster, size):
+        """Return the (offset, length) extents of a deleted FAT32 file without reading it; None if it was overwritten."""
+        fat = self.fat_table
+        extents = []
+        remaining = size
+        last_cluster = start_cluster + -(-size // fat.cluster_size)
+        for run_start, run_count, allocated in fat.runs(start_cluster, last_cluster):
+            if allocated:
+                return None
+            length = min(run_count * fat.cluster_size, remaining)
+            remaining -= length
+            FileUtils.add_extent(extents, fat.cluster_offset(run_start), length)
+        return extents
+
+    def read_fat32_file(self, start_cluster, size):
+        """Read a deleted file's clusters, with the (offset, length) extents it came from."""
+        fat = self.fat_table
         file_data = bytearray()
         bytes_read = 0
-        cluster = start_cluster
         state = "Good"
         fragments = []
+        extents = []
         try:
-            while bytes_read < size and cluster != 0x0FFFFFFF and not self.should_stop:
-                offset = (reserved_sectors + fat_copies * sectors_per_fat + (cluster - 2) * sectors_per_cluster) * self.sector_size
-                win32file.SetFilePointer(self.handle, offset, 0)
-                _, data = win32file.ReadFile(self.handle, min(self.cluster_size, size - bytes_read), None)
-                if self.check_cluster_allocation(offset // self.cluster_size):
+            # Deleting a file zeroes its chain, so its clusters are assumed contiguous from the first one;
+            # clusters the FAT now marks in use belong to another file
+            remaining = size
+            last_cluster = start_cluster + -(-size // fat.cluster_size)
+            for run_start, run_count, allocated in fat.runs(start_cluster, last_cluster):
+                if self.should_stop:
+                    break
+                length = min(run_count * fat.cluster_size, remaining)
+                remaining -= length
+                if allocated:
                     state = "Partially Overwritten"
                     fragments.append((file_data, bytes_read))
                     file_data = bytearray()
                     bytes_read = 0
                 else:
+                    offset = fat.cluster_offset(run_start)
+                    data = self.device.read_at(offset, length)
                     file_data.extend(data)
                     bytes_read += len(data)
-                fat_offset = reserved_sectors * self.sector_size + cluster * 4
-                win32file.SetFilePointer(self.handle, fat_offset, 0)
-                _, next_cluster = win32file.ReadFile(self.handle, 4, None)
-                cluster = struct.unpack('<I', next_cluster)[0]
+                    FileUtils.add_extent(extents, offset, len(data))
             if self.scan_type == "Deep" and fragments:
-                file_type = self.guess_file_type(file_data[:16]) or 'unknown'
-                if file_type == 'txt' and not self.is_readable_text(file_data):
-                    return bytearray(), 0, "Corrupted"
-                file_data, state = self.reconstruct_fragments(file_type, fragments + [(file_data, bytes_read)])
+                file_type = FileUtils.guess_file_type(file_data[:16]) or 'unknown'
+                if file_type == 'txt' and not FileUtils.is_readable_text(file_data):
+                    return bytearray(), 0, "Corrupted", []
+                file_data, state = FileUtils.reconstruct_fragments(file_type, fragments + [(file_data, bytes_read)])
                 bytes_read = len(file_data)
             elif fragments:
-                return bytearray(), 0, "Fragmented"
-            return file_data[:size], bytes_read, state
+                return bytearray(), 0, "Fragmented", []
+            return file_data[:size], bytes_read, state, extents
         except Exception as e:
             logging.error(f"FAT32 file read failed: {traceback.format_exc()}")
-            return file_data, bytes_read, "Corrupted"
+            return file_data, bytes_read, "Corrupted", extents
 
     def scan_chunk_deep(self, start_offset, end_offset, drive_size, progress_callback=None):
         """Deep scan a chunk of the drive for file signatures."""
-        offset = start_offset
-        last_progress_update = offset
-        while offset < end_offset and not self.should_stop and self.junk_counter < self.junk_threshold:
-            while self.paused and not self.should_stop:
-                time.sleep(0.1)
-            if self.should_stop:
-                break
-            self.carve_chunk_deep(offset, end_offset)
-            offset += self.buffer_size
-            if offset - last_progress_update >= self.progress_step:
-                if progress_callback:
-                    progress_callback(offset, self.buffer_size)
-                last_progress_update = offset
+        last_progress_update = start_offset
+        plan = ((offset, self.chunk_length(offset, drive_size))  # Carves may run past the shard end
+                for offset in range(start_offset, end_offset, self.buffer_size))
+        with self.open_read_ahead(plan) as chunks:
+            for (offset, _), data in chunks:
+                if self.should_stop or self.junk_counter >= self.junk_threshold:
+                    break
+                while self.paused and not self.should_stop:
+                    time.sleep(0.1)
+                if self.should_stop:
+                    break
+                self.carve_chunk_deep(offset, end_offset, drive_size, data)
+                if self.should_stop:
+                    break  # An interrupted chunk is scanned again on resume
+                offset += self.buffer_size
+                self.mark_progress('carve', offset)
+                if offset - last_progress_update >= self.progress_step:
+                    if progress_callback:
+                        progress_callback(offset, self.buffer_size)
+                    last_progress_update = offset
 
     def scan_unallocated_space(self, start_offset, end_offset, drive_size, progress_callback=None):
         """Scan unallocated space for recoverable files."""
+        first_cluster = start_offset // self.cluster_size
+        last_cluster = -(-end_offset // self.cluster_size)
+        if self.cluster_bitmap:
+            free_extents = ((start, count) for start, count, allocated
+                            in self.cluster_bitmap.extents(first_cluster, last_cluster) if not allocated)
+        else:
+            free_extents = [(first_cluster, last_cluster - first_cluster)]  # No bitmap: treat all as free
+
+        def plan():
+            """Yield each chunk of every free extent with the extent's header and carve limits."""
+            for first, count in free_extents:
+                free_end = min((first + count) * self.cluster_size, drive_size)
+                extent_end = min(free_end, end_offset)
+                for offset in range(max(first * self.cluster_size, start_offset), extent_end, self.buffer_size):
+                    yield offset, self.chunk_length(offset, free_end), extent_end, free_end
+
         offset = start_offset
         last_progress_update = offset
-        while offset < end_offset and not self.should_stop and self.junk_counter < self.junk_threshold:
-            if self.check_cluster_allocation(offset // self.cluster_size):
-                offset += self.cluster_size  # Skip allocated clusters
-                continue
-            self.carve_chunk_deep(offset, end_offset)
-            offset += self.cluster_size
-            if offset - last_progress_update >= self.progress_step:
-                if progress_callback:
-                    progress_callback(offset, self.cluster_size)
-                last_progress_update = offset
+        with self.open_read_ahead(plan()) as chunks:
+            for (offset, _, extent_end, free_end), data in chunks:
+                if self.should_stop or self.junk_counter >= self.junk_threshold:
+                    break
+                self.carve_chunk_deep(offset, extent_end, free_end, data)
+                if self.should_stop:
+                    break  # An interrupted chunk is scanned again on resume
+                offset = min(offset + self.buffer_size, extent_end)  # Allocated extents are skipped in one step
+                self.mark_progress('unallocated', offset)
+                if offset - last_progress_update >= self.progress_step:
+                    if progress_callback:
+                        progress_callback(offset, offset - last_progress_update)
+                    last_progress_update = offset
         logging.info(f"Scanned unallocated space from {start_offset:,} to {offset:,}")
 
-    def carve_chunk_quick(self, offset, end_offset):
-        """Quickly carve files from a chunk using signatures."""
+    def chunk_length(self, offset, end_offset):
+        """Return the length of the carving buffer at offset: buffer_size plus an overlap window, up to end_offset."""
+        overlap = -(-(self.signature_matcher.max_length - 1) // self.cluster_size) * self.cluster_size  # Whole clusters
+        return min(self.buffer_size + overlap, end_offset - offset)
+
+    def read_chunk(self, offset, end_offset):
+        """Read one carving buffer plus an overlap window for headers straddling its end."""
+        return self.device.read_at(offset, self.chunk_length(offset, end_offset))
+
+    def open_read_ahead(self, plan):
+        """Start reading the chunks of plan ahead of the carver, read_ahead buffers deep."""
+        return ReadAhead(self.device, plan, self.chunk_length(0, float('inf')), self.read_ahead, self.metrics,
+                         self.memory)
+
+    def live_hits(self, data, classes, header_end):
+        """Return signature hits starting before header_end, searching only runs of live clusters."""
+        hits = []
+        for start, end in self.classifier.live_ranges(classes, len(data)):
+            if start >= header_end:
+                break
+            hits.extend(hit for hit in self.signature_matcher.find_all(data, start, end) if hit[0] < header_end)
+        return hits
+
+    def carve_chunk_quick(self, offset, end_offset, data=None):
+        """Quickly carve files from a chunk using signatures, reading it unless data holds it already."""
         try:
-            win32file.SetFilePointer(self.handle, offset, 0)
-            _, data = win32file.ReadFile(self.handle, min(self.buffer_size, end_offset - offset), None)
-            if not data or data == b'\x00' * len(data) or self.is_unreadable_gibberish(data):
+            if data is None:
+                data = self.read_chunk(offset, end_offset)
+            classes = self.classifier.classify(data)
+            dead = int(ClusterClassifier.is_dead(classes).sum())
+            self.metrics.add('dead_clusters', dead)
+            if dead == len(classes):
                 self.junk_counter += 1
                 return
-            for file_type, sig in FileSignatures.SIGNATURES.items():
+            # Headers in the overlap window are carved by the next chunk
+            for pos, _, file_types in self.live_hits(data, classes, self.buffer_size):
                 if self.should_stop:
                     return
-                for start_sig in sig['start']:
-                    pos = 0
-                    while (pos := data.find(start_sig, pos)) != -1 and not self.should_stop:
-                        file_offset = offset + pos
-                        file_data = self.carve_file(file_offset, file_type, end_offset)
-                        if file_data and self.validate_file(file_type, file_data):
-                            if file_type == 'txt' and not self.is_readable_text(file_data):
-                                self.junk_counter += 1
-                                pos += len(start_sig)
-                                continue
-                            file_info = {
-                                'offset': file_offset,
-                                'type': file_type,
-                                'data': file_data,
-                                'size': len(file_data),
-                                'name': f"file_{file_offset}.{file_type}",
-                                'status': "Recoverable",
-                                'state': "Good",
-                                'last_modified': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                'path': f"{self.drive}{file_offset}"
-                            }
-                            if self.scan_type == "Quick":
-                                self.quick_scan_files[f"file_{file_offset}.{file_type}"] = file_info
-                            self.file_found.emit(file_info)
-                            logging.debug(f"Quick carved {file_type} at offset {file_offset}")
-                        else:
-                            self.junk_counter += 1
-                        pos += len(start_sig)
+                file_offset = offset + pos
+                self.metrics.add('candidates')
+                started = time.perf_counter()
+                file_type = file_types[0]
+                walked = file_type in StructureWalker.WALKERS
+                if walked:  # Typed, sized and validated in one pass
+                    file_type, file_data = self.walk_file(file_offset, file_types, end_offset, data, offset)
+                    self.metrics.add('validate_time', time.perf_counter() - started)
+                else:
+                    file_data = self.carve_file(file_offset, file_type, end_offset, data, offset, classes)
+                if file_data and self.dedup.seen_extent(file_offset, len(file_data)):
+                    self.metrics.add('duplicates')
+                    continue
+                started = time.perf_counter()
+                valid = bool(file_data) and (walked or FileUtils.validate_file(file_type, file_data) and (
+                    file_type != 'txt' or FileUtils.is_readable_text(file_data)))
+                self.metrics.add('validate_time', time.perf_counter() - started)
+                if valid:
+                    file_info = {
+                        'offset': file_offset,
+                        'type': file_type,
+                        'source': self.drive,
+                        'extents': [(file_offset, len(file_data))],
+                        'repair': False,
+                        'size': len(file_data),
+                        'name': f"file_{file_offset}.{file_type}",
+                        'status': "Recoverable",
+                        'state': "Good",
+                        'hash': FileUtils.content_hash(file_data),
+                        'last_modified': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        'path': f"{self.drive}{file_offset}"
+                    }
+                    if self.scan_type == "Quick":
+                        self.quick_scan_files[f"file_{file_offset}.{file_type}"] = file_info
+                    self.metrics.add('validated')
+                    self.emit_file(file_info)
+                    if LogUtils.debug_enabled():
+                        logging.debug(f"Quick carved {file_type} at offset {file_offset}")
+                else:
+                    self.junk_counter += 1
         except Exception as e:
             logging.error(f"Quick chunk carving failed at {offset}: {traceback.format_exc()}")
             self.junk_counter += 1
+        finally:
+            self.hold_candidate(0)
 
-    def carve_chunk_deep(self, offset, end_offset):
-        """Deeply carve files from a chunk with reconstruction."""
+    def carve_chunk_deep(self, offset, end_offset, carve_limit=None, data=None):
+        """Deeply carve files from a chunk with reconstruction, reading it unless data holds it already."""
         try:
-            win32file.SetFilePointer(self.handle, offset, 0)
-            _, data = win32file.ReadFile(self.handle, min(self.buffer_size, end_offset - offset), None)
-            if not data or data == b'\x00' * len(data) or self.is_unreadable_gibberish(data):
+            carve_limit = carve_limit or end_offset  # Headers stop at end_offset, file bodies at carve_limit
+            header_end = min(self.buffer_size, end_offset - offset)
+            if data is None:
+                data = self.read_chunk(offset, carve_limit)
+            classes = self.classifier.classify(data)
+            dead = int(ClusterClassifier.is_dead(classes).sum())
+            self.metrics.add('dead_clusters', dead)
+            if dead == len(classes):
                 self.junk_counter += 1
                 return
-            for file_type, sig in FileSignatures.SIGNATURES.items():
+            # Headers in the overlap window are carved by the next chunk or shard
+            for pos, _, file_types in self.live_hits(data, classes, header_end):
                 if self.should_stop:
                     return
-                for start_sig in sig['start']:
-                    pos = 0
-                    while (pos := data.find(start_sig, pos)) != -1 and not self.should_stop:
-                        file_offset = offset + pos
-                        file_data = self.carve_file(file_offset, file_type, end_offset)
-                        if file_data:
-                            if file_type == 'txt' and not self.is_readable_text(file_data):
-                                self.junk_counter += 1
-                                pos += len(start_sig)
-                                continue
-                            file_data, state = self.reconstruct_file(file_type, file_data)
-                            if self.validate_file(file_type, file_data) or state != "Corrupted":
-                                file_info = {
-                                    'offset': file_offset,
-                                    'type': file_type,
-                                    'data': file_data,
-                                    'size': len(file_data),
-                                    'name': f"file_{file_offset}.{file_type}",
-                                    'status': "Recoverable",
-                                    'state': state,
-                                    'last_modified': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                    'path': f"{self.drive}{file_offset}"
-                                }
-                                self.file_found.emit(file_info)
-                                logging.debug(f"Deep carved {file_type} at offset {file_offset}, state: {state}")
-                            else:
-                                self.junk_counter += 1
-                        else:
-                            self.junk_counter += 1
-                        pos += len(start_sig)
+                file_offset = offset + pos
+                self.metrics.add('candidates')
+                started = time.perf_counter()
+                file_type = file_types[0]
+                carved = walked = None
+                if file_type in StructureWalker.WALKERS:
+                    file_type, walked = self.walk_file(file_offset, file_types, carve_limit, data, offset)
+                    carved = walked
+                    self.metrics.add('validate_time', time.perf_counter() - started)
+                if walked is None and file_type is not None and file_type not in StructureWalker.UNBOUNDED:
+                    # Broken structure: carve to the footer (or size cap) and try to repair it
+                    carved = self.carve_file(file_offset, file_type, carve_limit, data, offset, classes)
+                if carved and self.dedup.seen_extent(file_offset, len(carved)):
+                    self.metrics.add('duplicates')
+                    continue
+                if carved:
+                    started = time.perf_counter()
+                    if file_type == 'txt' and not FileUtils.is_readable_text(carved):
+                        self.metrics.add('validate_time', time.perf_counter() - started)
+                        self.junk_counter += 1
+                        continue
+                    reconstructed = time.perf_counter()
+                    if walked is not None:
+                        file_data, state = walked, "Good"
+                    else:
+                        file_data, state = FileUtils.reconstruct_file(file_type, carved)
+                    validated = time.perf_counter()
+                    valid = walked is not None or FileUtils.validate_file(file_type, file_data) or state != "Corrupted"
+                    self.metrics.add('validate_time', time.perf_counter() - validated + reconstructed - started)
+                    self.metrics.add('reconstruct_time', validated - reconstructed)
+                    if valid:
+                        file_info = {
+                            'offset': file_offset,
+                            'type': file_type,
+                            'source': self.drive,
+                            'extents': [(file_offset, len(carved))],
+                            'repair': file_data != carved,  # Re-apply reconstruction on read-back
+                            'size': len(file_data),
+                            'name': f"file_{file_offset}.{file_type}",
+                            'status': "Recoverable",
+                            'state': state,
+                            'hash': FileUtils.content_hash(file_data),
+                            'last_modified': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                            'path': f"{self.drive}{file_offset}"
+                        }
+                        self.metrics.add('validated')
+                        self.emit_file(file_info)
+                        if LogUtils.debug_enabled():
+                            logging.debug(f"Deep carved {file_type} at offset {file_offset}, state: {state}")
+                    else:
+                        self.junk_counter += 1
+                else:
+                    self.junk_counter += 1
         except Exception as e:
             logging.error(f"Deep chunk carving failed at {offset}: {traceback.format_exc()}")
             self.junk_counter += 1
+        finally:
+            self.hold_candidate(0)
+
+    def carve_reader(self, offset, buffer=None, buffer_offset=0):
+        """Return read(pos, size) over the drive from offset, served from buffer where it holds the bytes.
+
+        Drive bytes read contiguously past the buffer are kept, so reading a file whole
+        after walking it does not read them again; reads beyond a skipped gap are not kept.
+        """
+        start = offset - buffer_offset
+        held = max(len(buffer) - start, 0) if buffer is not None else 0
+        view = memoryview(buffer) if held else None  # Slices are copied out, as the buffer may be reused
+        tail = bytearray()  # Drive bytes from held onwards
+
+        def read(pos, size):
+            end = pos + size
+            if end <= held:
+                return bytes(view[start + pos:start + end])
+            if pos > held + len(tail):
+                return self.device.read_at(offset + pos, size)
+            if end > held + len(tail):
+                tail.extend(self.device.read_at(offset + held + len(tail), end - held - len(tail)))
+            head = view[start + pos:start + held] if pos < held else b''
+            return bytes(head) + bytes(tail[max(pos - held, 0):end - held])
+        return read
+
+    def walk_file(self, offset, file_types, drive_size, buffer=None, buffer_offset=0):
+        """Type, validate and size a hit shared by file_types by walking its structure once.
+
+        Returns (file type, exact bytes); the bytes are None if the structure is broken and the
+        type is None if the content is none of file_types. Only the bytes the file occupies are
+        read, from `buffer` where it holds them. A valid structure outweighs dead-looking
+        clusters (e.g. silence in a WAV), so none are checked.
+        """
+        try:
+            limit = min(max(FileSignatures.SIGNATURES[t]['max_size'] for t in file_types), drive_size - offset)
+            if limit <= 0:
+                return file_types[0], None
+            read = self.carve_reader(offset, buffer, buffer_offset)
+            file_type, length = StructureWalker.identify(file_types, read, limit)
+            if not length or length > FileSignatures.SIGNATURES[file_type]['max_size']:
+                return file_type, None
+            self.hold_candidate(length)
+            return file_type, read(0, length)
+        except Exception as e:
+            logging.error(f"Structure walk failed at {offset}: {traceback.format_exc()}")
+            return None, None
+
+    def carve_file(self, offset, file_type, drive_size, buffer=None, buffer_offset=0, classes=None):
+        """Carve a file from the drive based on its signature.
 
-    def carve_file(self, offset, file_type, drive_size):
-        """Carve a file from the drive based on its signature."""
+        Bytes already held in `buffer` (read from `buffer_offset`) are sliced through a
+        memoryview instead of being re-read; the drive is only read past its end.
+        `classes` holds the buffer's ClusterClassifier classes, so held clusters are not checked again.
+        """
         try:
-            win32file.SetFilePointer(self.handle, offset, 0)
             max_size = FileSignatures.SIGNATURES[file_type]['max_size']
             avg_size = FileSignatures.SIGNATURES[file_type]['avg_size']
-            buffer = bytearray()
-            bytes_read = 0
             end_sig = FileSignatures.SIGNATURES[file_type]['end']
-            while bytes_read < max_size and (offset + bytes_read) < drive_size and not self.should_stop:
-                _, data = win32file.ReadFile(self.handle, self.cluster_size, None)
-                if not data or self.is_unreadable_gibberish(data):
+            limit = min(max_size if end_sig else avg_size, drive_size - offset)  # No footer: stop at avg_size
+            if limit <= 0:
+                return None
+            self.hold_candidate(limit)
+
+            start = offset - buffer_offset
+            held = min(max(len(buffer) - start, 0), limit) if buffer is not None else 0
+            if end_sig and held:
+                end = buffer.find(end_sig, start, start + held)
+                if end != -1:
+                    held = limit = end - start + len(end_sig)
+            if held < limit:
+                held -= held % self.cluster_size  # Continue from disk on a cluster boundary
+
+            if classes is not None:
+                dead = held and self.classifier.any_dead(classes, start, start + held)
+            else:
+                # Check whole clusters, as a cluster-by-cluster read from disk would
+                span = -(-held // self.cluster_size) * self.cluster_size
+                clusters = memoryview(buffer)[start:start + span] if held else memoryview(b'')
+                if len(clusters) < span:  # Last cluster straddles the buffer end
+                    clusters = bytes(clusters) + self.device.read_at(offset + len(clusters), span - len(clusters))
+                dead = self.contains_gibberish_cluster(clusters)
+            if dead:
+                self.junk_counter += 1
+                return None
+            view = memoryview(buffer)[start:start + held] if held else memoryview(b'')
+            if held == limit:
+                return bytes(view)
+
+            # File runs past the buffer: continue cluster by cluster from the drive,
+            # resuming the footer search where the previous pass stopped
+            carved = bytearray(view)
+            search_from = max(len(carved) - len(end_sig) + 1, 0) if end_sig else 0
+            while len(carved) < limit and not self.should_stop:
+                data = self.device.read_at(offset + len(carved), min(self.cluster_size, limit - len(carved)))
+                if not data or FileUtils.is_unreadable_gibberish(data):
                     self.junk_counter += 1
                     return None
-                buffer.extend(data)
-                bytes_read += len(data)
-                if end_sig and end_sig in buffer:
-                    return buffer[:buffer.index(end_sig) + len(end_sig)]
-                if bytes_read >= avg_size and not end_sig:
-                    return buffer[:bytes_read]
-            return buffer[:bytes_read] if bytes_read else None
+                carved.extend(data)
+                if end_sig:
+                    end = carved.find(end_sig, search_from)
+                    if end != -1:
+                        return bytes(carved[:end + len(end_sig)])
+                    search_from = max(len(carved) - len(end_sig) + 1, 0)
+            return bytes(carved) if carved else None
         except Exception as e:
             logging.error(f"File carving failed at {offset}: {traceback.format_exc()}")
             return None
 
-    def reconstruct_file(self, file_type, data):
-        """Reconstruct a file if it’s incomplete or corrupted."""
-        state = "Good" if self.validate_file(file_type, data) else "Corrupted"
-        try:
-            if file_type == 'jpg' and not data.endswith(FileSignatures.SIGNATURES['jpg']['end']):
-                data += FileSignatures.SIGNATURES['jpg']['end']
-                state = "Reconstructed"
-            elif file_type == 'png' and not data.endswith(FileSignatures.SIGNATURES['png']['end']):
-                data += FileSignatures.SIGNATURES['png']['end']
-                state = "Reconstructed"
-            elif file_type == 'pdf' and b'%%EOF' not in data[-1024:]:
-                data += b'\n%%EOF'
-                state = "Reconstructed"
-            elif file_type in ['docx', 'zip', 'xlsx'] and not zipfile.is_zipfile(BytesIO(data)):
-                for i in range(len(data) - 1, -1, -1):
-                    if data[i:i+4] == b'PK\x05\x06':
-                        data = data[:i + 22]
-                        state = "Reconstructed"
-                        break
-            elif file_type == 'txt' and self.is_readable_text(data):
-                encoding = detect(data[:1024])['encoding'] or 'utf-8'
-                decoded = data.decode(encoding, errors='ignore')
-                cleaned = ''.join(c for c in decoded if c.isprintable() or c in '\n\r\t')
-                data = cleaned.encode(encoding, errors='ignore')
-                state = "Reconstructed" if len(cleaned) > 0 else "Corrupted"
-            return data, state
-        except Exception as e:
-            logging.error(f"Reconstruction failed for {file_type}: {traceback.format_exc()}")
-            return data, "Corrupted"
-
-    def reconstruct_fragments(self, file_type, fragments):
-        """Reconstruct a file from multiple fragments."""
-        try:
-            combined_data = bytearray()
-            for fragment_data, _ in fragments:
-                combined_data.extend(fragment_data)
-            if not combined_data or (file_type == 'txt' and not self.is_readable_text(combined_data)):
-                return bytearray(), "Corrupted"
-            repaired_data, state = self.reconstruct_file(file_type, combined_data)
-            return repaired_data, f"Fragmented ({state})"
-        except Exception as e:
-            logging.error(f"Fragment reconstruction failed for {file_type}: {traceback.format_exc()}")
-            return combined_data, "Corrupted"
+    def contains_gibberish_cluster(self, data):
+        """Check each cluster-sized slice of data for unreadable noise."""
+        return any(FileUtils.is_unreadable_gibberish(data[i:i + self.cluster_size])
+                   for i in range(0, len(data), self.cluster_size))
 
-    def validate_file(self, file_type, data):
-        """Validate if the file data matches its type."""
-        try:
-            if file_type == 'jpg':
-                return data.startswith(b'\xFF\xD8') and data.endswith(b'\xFF\xD9')
-            elif file_type == 'png':
-                return data.startswith(b'\x89\x50\x4E\x47') and data.endswith(b'\x49\x45\x4E\x44\xAE\x42\x60\x82')
-            elif file_type == 'pdf':
-                return data.startswith(b'%PDF') and b'%%EOF' in data[-1024:]
-            elif file_type in ['docx', 'zip', 'xlsx']:
-                return zipfile.is_zipfile(BytesIO(data))
-            elif file_type == 'gif':
-                return (data.startswith(b'GIF89a') or data.startswith(b'GIF87a')) and data.endswith(b'\x00\x3B')
-            elif file_type == 'txt':
-                return self.is_readable_text(data)
-            return len(data) > 0
-        except Exception:
+    def check_cluster_allocation(self, cluster):
+        """Check if a cluster is allocated (NTFS only)."""
+        if self.fs_type != 'NTFS' or self.cluster_bitmap is None:
             return False
+        return self.cluster_bitmap.is_allocated(cluster)
 
-    def guess_file_type(self, header):
-        """Guess file type based on header bytes."""
-        for file_type, sig in FileSignatures.SIGNATURES.items():
-            for start_sig in sig['start']:
-                if header.startswith(start_sig):
-                    return file_type
-        return None
+    def load_fat_table(self):
+        """Read the FAT32 allocation table into memory once per scan."""
+        try:
+            fat = FatTable.load(self.device, self.device.read_at(0, 512), self.sector_size)
+            if fat:
+                logging.info(f"Loaded FAT: {fat.total_clusters:,} clusters")
+            return fat
+        except Exception as e:
+            logging.error(f"Failed to load FAT: {traceback.format_exc()}")
+            return None
 
-    def is_readable_text(self, data):
-        """Check if data is readable text."""
+    def load_cluster_bitmap(self):
+        """Read the volume $Bitmap (MFT record 6) into memory once per scan."""
+        if not self.mft_offset:
+            return None
         try:
-            encoding = detect(data[:1024])['encoding'] or 'utf-8'
-            text = data.decode(encoding, errors='ignore')
-            if not text.strip():
-                return False
-            printable_ratio = sum(c.isprintable() or c in '\n\r\t' for c in text) / len(text)
-            return printable_ratio >= 0.7  # At least 70% printable
-        except Exception:
-            return False
+            boot_sector = self.device.read_at(0, 512)
+            total_clusters = struct.unpack('<Q', boot_sector[40:48])[0] // max(boot_sector[13], 1)
 
-    def is_unreadable_gibberish(self, data):
-        """Check if data is unreadable noise."""
-        if not data or data == b'\x00' * len(data) or data == b'\xFF' * len(data):
-            return True
-        unique_bytes = len(set(data))
-        return unique_bytes < 10  # Too few unique bytes = gibberish
+            record = self.read_mft_record(6)
+            if not record or not record.has_data or record.resident:  # $DATA must be non-resident
+                return None
 
-    def check_cluster_allocation(self, cluster):
-        """Check if a cluster is allocated (NTFS only)."""
-        if self.fs_type != 'NTFS' or not self.mft_offset:
-            return False
-        try:
-            bitmap_offset = self.mft_offset + 6 * 1024
-            win32file.SetFilePointer(self.handle, bitmap_offset, 0)
-            _, bitmap_record = win32file.ReadFile(self.handle, 1024, None)
-            data_offset = bitmap_record.find(b'\x80\x00')
-            if data_offset == -1:
-                return False
-            run_offset = struct.unpack('<H', bitmap_record[data_offset + 32:data_offset + 34])[0]
-            run_data = bitmap_record[data_offset + run_offset:]
-            bitmap_data, _, _ = self.read_data_runs(run_data, bitmap_offset // self.cluster_size)
-            bit_offset = cluster // 8
-            if bit_offset >= len(bitmap_data):
-                return False
-            bit_mask = 1 << (cluster % 8)
-            return (bitmap_data[bit_offset] & bit_mask) != 0
+            bitmap_data = bytearray()
+            for lcn, length in self.decode_data_runs(record.data):
+                data = self.device.read_at(lcn * self.cluster_size, length * self.cluster_size)
+                bitmap_data.extend(data)
+            bitmap = ClusterBitmap(bitmap_data[:record.data_size], total_clusters)
+            logging.info(f"Loaded $Bitmap: {bitmap.total_clusters:,} clusters")
+            return bitmap
         except Exception as e:
-            logging.error(f"Cluster allocation check failed: {traceback.format_exc()}")
-            return False
+            logging.error(f"Failed to load $Bitmap: {traceback.format_exc()}")
+            return None
+
+    def decode_data_runs(self, run_data):
+        """Decode an NTFS run list into absolute (cluster, cluster count) extents."""
+        runs = []
+        lcn = 0
+        pos = 0
+        while pos < len(run_data) and run_data[pos] != 0:
+            header = run_data[pos]
+            length_size = header & 0x0F
+            offset_size = (header >> 4) & 0x0F
+            pos += 1
+            length = int.from_bytes(run_data[pos:pos + length_size], 'little')
+            pos += length_size
+            if offset_size:  # Sparse runs carry no cluster offset
+                lcn += int.from_bytes(run_data[pos:pos + offset_size], 'little', signed=True)
+                runs.append((lcn, length))
+            pos += offset_size
+        return runs
 
     def stop(self):
         """Stop the scan."""
@@ -923,307 +3470,129 @@ class ScanThread(QThread):
 
     def close(self):
         """Close the drive handle."""
-        if self.handle:
-            win32file.CloseHandle(self.handle)
-            self.handle = None
+        if self.device:
+            self.device.close()
+            self.device = None
             logging.debug("Drive handle closed")
 
-# GUI class for the recovery tool
-class FileRecoveryToolGUI(QMainWindow):
-    def __init__(self):
-        """Initialize the GUI."""
-        super().__init__()
-        self.setWindowTitle("Aarambh: Lost Data Retrieval Tool")
-        self.setWindowIcon(QIcon("aarambh_icon.png"))
-        self.setMinimumSize(800, 600)
-        self.setGeometry(100, 100, 900, 600)
-        self.found_files = {}  # Store found files
-        self.selected_files = set()  # Track selected files for recovery
-        self.scan_thread = None  # Scanning thread
-        self.setup_gui()
-        self.apply_theme()
-        logging.info("GUI initialized")
-
-    def apply_theme(self):
-        """Apply a custom dark theme to the GUI."""
-        self.setStyleSheet("""
-            QWidget { background-color: #1A1F2B; color: #E0E6F0; font-family: 'Segoe UI', sans-serif; font-size: 13px; }
-            QPushButton { background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #00C4B4, stop:1 #00A3E0); border: 1px solid #3A4559; padding: 8px; border-radius: 10px; color: #FFFFFF; font-weight: 600; font-size: 14px; }
-            QPushButton:hover { background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #00A3E0, stop:1 #00C4B4); }
-            QPushButton:disabled { background: #4A5366; color: #A0A0A0; border: 1px solid #3A4559; }
-            QComboBox, QLineEdit { background-color: #252C3D; border: 1px solid #3A4559; padding: 5px; border-radius: 8px; color: #E0E6F0; }
-            QTreeWidget { background-color: #252C3D; border: 1px solid #3A4559; border-radius: 12px; alternate-background-color: #2E3548; padding: 5px; }
-            QFrame { background-color: #252C3D; border: 1px solid #3A4559; border-radius: 12px; }
-            QProgressBar { border: 1px solid #3A4559; background-color: #1A1F2B; text-align: center; color: #E0E6F0; border-radius: 8px; }
-            QProgressBar::chunk { background-color: #00C4B4; border-radius: 8px; }
-        """)
-        logging.debug("Theme applied")
-
-    def setup_gui(self):
-        """Set up the GUI layout and widgets."""
-        main_widget = QWidget()
-        self.setCentralWidget(main_widget)
-        main_layout = QVBoxLayout(main_widget)
-
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll_content = QWidget()
-        scroll_layout = QVBoxLayout(scroll_content)
-        scroll.setWidget(scroll_content)
-        main_layout.addWidget(scroll)
-
-        # Input frame for drive and path selection
-        input_frame = QFrame()
-        input_layout = QFormLayout(input_frame)
-        self.driver_combo = QComboBox()
-        self.driver_combo.addItems(SystemUtils.get_drives() or ["No drives detected"])
-        input_layout.addRow("Select Drive:", self.driver_combo)
-        recovery_layout = QHBoxLayout()
-        self.recovery_path = QLineEdit()
-        browse_btn = QPushButton("Browse")
-        browse_btn.clicked.connect(self.browse_recovery)
-        recovery_layout.addWidget(self.recovery_path)
-        recovery_layout.addWidget(browse_btn)
-        input_layout.addRow("Recovery Path:", recovery_layout)
-        scroll_layout.addWidget(input_frame)
-
-        # Filter and scan type frame
-        filter_frame = QFrame()
-        filter_layout = QHBoxLayout(filter_frame)
-        self.filter_combo = QComboBox()
-        self.filter_combo.addItems(["All files"] + [ft.upper() for ft in FileSignatures.SIGNATURES.keys()])
-        self.filter_combo.currentTextChanged.connect(self.update_file_list)
-        self.scan_type = QRadioButton("Quick Scan")
-        self.scan_type.setChecked(True)
-        filter_layout.addWidget(self.filter_combo)
-        filter_layout.addWidget(self.scan_type)
-        filter_layout.addWidget(QRadioButton("Deep Scan"))
-        scroll_layout.addWidget(filter_frame)
-
-        # Control frame with progress and buttons
-        control_frame = QFrame()
-        control_layout = QVBoxLayout(control_frame)
-        self.progress = QProgressBar()
-        self.progress.setRange(0, 100)
-        self.progress.setFormat("%p%")
-        control_layout.addWidget(self.progress)
-        btn_layout = QHBoxLayout()
-        self.start_btn = QPushButton("Start Scan")
-        self.start_btn.clicked.connect(self.start_scan)
-        self.pause_btn = QPushButton("Pause")
-        self.pause_btn.clicked.connect(self.toggle_pause)
-        self.pause_btn.setEnabled(False)
-        self.stop_btn = QPushButton("Stop")
-        self.stop_btn.clicked.connect(self.stop_scan)
-        self.stop_btn.setEnabled(False)
-        btn_layout.addWidget(self.start_btn)
-        btn_layout.addWidget(self.pause_btn)
-        btn_layout.addWidget(self.stop_btn)
-        control_layout.addLayout(btn_layout)
-        scroll_layout.addWidget(control_frame)
-
-        # File list frame
-        preview_frame = QFrame()
-        preview_layout = QVBoxLayout(preview_frame)
-        self.file_list = QTreeWidget()
-        self.file_list.setHeaderLabels(['Select', 'Name', 'Type', 'Size', 'Modified', 'Status', 'State', 'Path'])
-        for i, w in enumerate([50, 150, 80, 80, 120, 100, 80, 150]):
-            self.file_list.setColumnWidth(i, w)
-        self.file_list.setSortingEnabled(True)
-        self.file_list.header().setSortIndicator(1, Qt.SortOrder.AscendingOrder)
-        self.file_list.itemClicked.connect(self.toggle_selection)
-        self.file_list.itemDoubleClicked.connect(self.preview_file)
-        preview_layout.addWidget(self.file_list)
-        scroll_layout.addWidget(preview_frame)
-
-        # Restore buttons
-        restore_layout = QHBoxLayout()
-        restore_btn = QPushButton("Restore Selected")
-        restore_btn.clicked.connect(self.restore_files)
-        recover_all_btn = QPushButton("Restore All")
-        recover_all_btn.clicked.connect(self.recover_all_files)
-        restore_layout.addWidget(restore_btn)
-        restore_layout.addWidget(recover_all_btn)
-        scroll_layout.addLayout(restore_layout)
-
-    def browse_recovery(self):
-        """Open a dialog to select the recovery path."""
-        path = QFileDialog.getExistingDirectory(self, "Select Recovery Path")
-        if path:
-            self.recovery_path.setText(path)
-
-    def toggle_selection(self, item, column):
-        """Toggle file selection in the list."""
-        if column == 0:
-            file_id = item.text(1)
-            if file_id in self.selected_files:
-                self.selected_files.remove(file_id)
-                item.setText(0, '☐')
-            else:
-                self.selected_files.add(file_id)
-                item.setText(0, '☑')
-
-    def preview_file(self, item, column):
-        """Preview the contents of a selected file."""
-        file_id = item.text(1)
-        file_info = self.found_files.get(file_id)
-        if not file_info or not file_info['data']:
-            QMessageBox.warning(self, "Preview", "No data available for preview")
-            return
+# Headless scan: runs a ScanEngine without Qt, writing progress and results to stdout as JSON lines
+class CommandLineScan:
+    def __init__(self, args):
+        """Set up a scan from parsed command-line arguments."""
+        self.args = args
+        self.file_types = [t.strip().lower() for t in args.types.split(',') if t.strip()] if args.types else None
+        self.found = []  # Found files, restored to args.out once the scan finishes
+        self.out = sys.stdout
+
+    @staticmethod
+    def parser():
+        """Build the parser for `aarambh.py scan ...`."""
+        parser = argparse.ArgumentParser(prog="aarambh.py scan", description="Scan a drive or disk image without the GUI.")
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument("--image", help="raw disk image (.img/.dd) to scan")
+        source.add_argument("--drive", help="drive root to scan, e.g. D:\\")
+        parser.add_argument("--mode", choices=["quick", "deep"], default="quick", help="scan type (default: quick)")
+        parser.add_argument("--types", help="comma-separated file types to look for, e.g. jpg,pdf (default: all)")
+        parser.add_argument("--workers", type=int, default=None, help="deep scan worker processes (default: CPU count)")
+        parser.add_argument("--buffer-size", type=int, default=64, help="carving buffer size in MB (default: 64)")
+        parser.add_argument("--read-ahead", type=int, default=2,
+                            help="buffers read ahead of carving on a background thread; 0 to read in line (default: 2)")
+        parser.add_argument("--direct-io", action="store_true",
+                            help="read around the OS cache with sector- and cluster-aligned reads")
+        parser.add_argument("--max-memory", type=MemoryGovernor.parse_size, metavar="SIZE",
+                            help="memory budget for carving buffers and carved files, e.g. 2G or 512M; buffers, "
+                                 "read-ahead and workers are reduced to fit (default: no limit)")
+        parser.add_argument("--out", help="directory to restore found files into; results are only listed if omitted")
+        parser.add_argument("--restore-workers", type=int, default=4, help="parallel restore threads (default: 4)")
+        parser.add_argument("--catalog", help="SQLite catalog to write (default: a new one in the catalog directory)")
+        parser.add_argument("--resume", action="store_true",
+                            help="continue the interrupted scan saved in --catalog from its last checkpoint")
+        parser.add_argument("--log-level", choices=LogUtils.LEVELS, help="log level for file_recovery_debug.log")
+        return parser
+
+    def write(self, event, **values):
+        """Write one JSON line to stdout."""
+        self.out.write(json.dumps(dict(event=event, **values)) + "\n")
+        self.out.flush()
+
+    def file_found(self, file_info):
+        """Report a found file and keep it for restoring, in place of any carves it replaces."""
+        if file_info.get('replaces'):
+            replaced = set(file_info['replaces'])
+            self.found = [found for found in self.found if (found['offset'], found['name']) not in replaced]
+        self.found.append(file_info)
+        self.write("file", **file_info)
+
+    def run(self):
+        """Run the scan and restore; return the process exit code."""
+        unknown = [t for t in self.file_types or [] if t not in FileSignatures.SIGNATURES]
+        if unknown:
+            self.write("error", message=f"Unknown file types: {', '.join(unknown)}")
+            return 2
+        if self.args.log_level:
+            LogUtils.set_level(self.args.log_level)
+        if self.args.resume and not (self.args.catalog and os.path.exists(self.args.catalog)):
+            self.write("error", message="--resume needs the --catalog of an interrupted scan")
+            return 2
+        drive = self.args.image or self.args.drive
+        scan_type = self.args.mode.capitalize()
+        catalog_path = self.args.catalog or ScanCatalog.new_path(drive, scan_type)
+        engine = ScanEngine(drive, scan_type, self.args.workers, on_file_found=self.file_found,
+                            on_progress=lambda progress: self.write("progress", percent=progress),
+                            catalog_path=catalog_path, resume=self.args.resume, file_types=self.file_types)
+        engine.buffer_size = max(self.args.buffer_size, 1) * 1024 * 1024
+        engine.read_ahead = max(self.args.read_ahead, 0)
+        engine.direct_io = self.args.direct_io
+        engine.memory.budget = self.args.max_memory
+        self.write("start", source=drive, scan_type=scan_type, catalog=catalog_path, resume=self.args.resume)
         try:
-            if file_info['type'] in ['jpg', 'png', 'gif']:
-                pixmap = QPixmap()
-                if pixmap.loadFromData(file_info['data']):
-                    scaled_pixmap = pixmap.scaled(400, 400, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                    label = QLabel()
-                    label.setPixmap(scaled_pixmap)
-                    msg_box = QMessageBox(self)
-                    msg_box.setWindowTitle("Preview")
-                    msg_box.setText(f"Preview of {file_info['name']}")
-                    msg_box.layout().addWidget(label, 1, 1)
-                    msg_box.exec()
-                else:
-                    QMessageBox.warning(self, "Preview", f"Cannot preview {file_info['type']} file: Corrupted or invalid data")
-            elif file_info['type'] == 'txt':
-                encoding = detect(file_info['data'][:1024])['encoding'] or 'utf-8'
-                text = file_info['data'].decode(encoding, errors='ignore')[:500]
-                if text.strip():
-                    QMessageBox.information(self, "Preview", f"Text Preview ({encoding}):\n\n{text}")
+            engine.run()
+        except KeyboardInterrupt:
+            engine.stop()
+        restored = self.restore() if self.args.out else 0
+        self.write("done", status="stopped" if engine.should_stop else "complete", files=len(self.found),
+                   restored=restored, metrics=engine.metrics.report())
+        return 0
+
+    def restore(self):
+        """Restore every found file into the output directory, streaming it back from its extents."""
+        lock = threading.Lock()  # Restore threads share stdout
+
+        def file_restored(file_info, path, error):
+            with lock:
+                if path:
+                    self.write("restored", name=file_info['name'], path=path)
                 else:
-                    QMessageBox.warning(self, "Preview", "Text file is empty or unreadable")
-            elif file_info['type'] == 'pdf':
-                QMessageBox.information(self, "Preview", "PDF preview not supported yet\nFirst 500 bytes:\n" + file_info['data'][:500].decode('ascii', errors='ignore'))
-            else:
-                QMessageBox.information(self, "Preview", f"No preview available for {file_info['type']}\nFirst 500 bytes:\n" + file_info['data'][:500].decode('ascii', errors='ignore'))
-        except Exception as e:
-            logging.error(f"Preview failed for {file_id}: {traceback.format_exc()}")
-            QMessageBox.warning(self, "Preview", f"Failed to preview file: {str(e)}")
-
-    def start_scan(self):
-        """Start the scanning process."""
-        drive = self.driver_combo.currentText()
-        recovery_path = self.recovery_path.text()
-        if not drive or "No drives" in drive:
-            QMessageBox.critical(self, "Error", "Please select a drive")
-            return
-        if not recovery_path:
-            QMessageBox.critical(self, "Error", "Please select a recovery path")
-            return
-        if drive[:2] in recovery_path[:2]:
-            QMessageBox.warning(self, "Warning", "Recovery path should be on a different drive to avoid overwriting data")
-
-        self.found_files.clear()
-        self.selected_files.clear()
-        self.file_list.clear()
-        self.progress.setValue(0)
-        self.start_btn.setEnabled(False)
-        self.pause_btn.setEnabled(True)
-        self.stop_btn.setEnabled(True)
-        self.pause_btn.setText("Pause")
-
-        scan_type = "Quick" if self.scan_type.isChecked() else "Deep"
-        self.scan_thread = ScanThread(drive, scan_type)
-        self.scan_thread.file_found.connect(self.add_file_to_list)
-        self.scan_thread.progress_updated.connect(self.update_progress)
-        self.scan_thread.finished.connect(self.finish_scan)
-        self.scan_thread.start()
-        logging.info(f"Started {scan_type} scan on {drive}")
-
-    def toggle_pause(self):
-        """Toggle between pause and resume."""
-        if self.scan_thread and self.scan_thread.isRunning():
-            if self.scan_thread.paused:
-                self.scan_thread.resume()
-                self.pause_btn.setText("Pause")
-            else:
-                self.scan_thread.pause()
-                self.pause_btn.setText("Resume")
-            logging.info(f"Scan {'paused' if self.scan_thread.paused else 'resumed'}")
+                    self.write("error", name=file_info['name'], message=error)
 
-    def stop_scan(self):
-        """Stop the scan."""
-        if self.scan_thread and self.scan_thread.isRunning():
-            self.scan_thread.stop()
-            self.scan_thread.wait()
-
-    def finish_scan(self):
-        """Handle scan completion."""
-        self.start_btn.setEnabled(True)
-        self.pause_btn.setEnabled(False)
-        self.stop_btn.setEnabled(False)
-        self.scan_thread = None
-        self.update_file_list()
-        self.progress.setValue(100)
-        QApplication.processEvents()
-        logging.info(f"Scan finished, found {len(self.found_files)} files")
-
-    def update_progress(self, value):
-        """Update the progress bar."""
-        logging.debug(f"Progress received: {value}%")
-        self.progress.setValue(value)
-        QApplication.processEvents()
-        logging.info(f"Progress bar updated to {value}%")
-
-    def add_file_to_list(self, file_info):
-        """Add a found file to the list."""
-        file_id = file_info['name']
-        self.found_files[file_id] = file_info
-        self.update_file_list()
-
-    def update_file_list(self):
-        """Refresh the file list based on filter."""
-        self.file_list.clear()
-        filter_type = self.filter_combo.currentText().lower()
-        for file_id, info in self.found_files.items():
-            if filter_type == "all files" or info['type'] == filter_type:
-                item = QTreeWidgetItem([
-                    '☐', info['name'], info['type'].upper(), f"{info['size']} bytes",
-                    info['last_modified'], info['status'], info['state'], info['path']
-                ])
-                self.file_list.addTopLevelItem(item)
-
-    def restore_files(self):
-        """Restore selected files to the recovery path."""
-        if not self.selected_files:
-            QMessageBox.warning(self, "Warning", "No files selected")
-            return
-        recovery_path = self.recovery_path.text()
-        os.makedirs(recovery_path, exist_ok=True)
-        restored = 0
-        for file_id in self.selected_files:
-            info = self.found_files.get(file_id)
-            if info:
-                try:
-                    filename = f"{info['name']}"
-                    with open(os.path.join(recovery_path, filename), 'wb') as f:
-                        f.write(info['data'])
-                    restored += 1
-                    logging.info(f"Restored: {filename}")
-                except Exception as e:
-                    logging.error(f"Restore failed for {file_id}: {traceback.format_exc()}")
-        QMessageBox.information(self, "Complete", f"Restored {restored} files")
+        def progress(done, total, bytes_written, elapsed):
+            with lock:
+                self.write("restore_progress", done=done, total=total, bytes=bytes_written,
+                           mb_per_s=bytes_written / elapsed / 1048576 if elapsed else 0.0)
 
-    def recover_all_files(self):
-        """Restore all found files."""
-        self.selected_files = set(self.found_files.keys())
-        self.restore_files()
+        restore = RestoreEngine(self.args.out, self.args.restore_workers, on_progress=progress,
+                                on_file_restored=file_restored)
+        try:
+            return restore.run(self.found)
+        except KeyboardInterrupt:
+            restore.stop()
+            return restore.restored
 
 # Main function to run the application
 def main():
-    """Entry point of the application."""
+    """Entry point: `aarambh.py scan ...` runs headless, anything else opens the GUI."""
+    logging.info("Application starting")
+    if sys.argv[1:2] == ["scan"]:
+        sys.exit(CommandLineScan(CommandLineScan.parser().parse_args(sys.argv[2:])).run())
+    # The GUI module imports the engine as `aarambh`; reuse this script rather than loading it a second time
+    sys.modules.setdefault('aarambh', sys.modules[__name__])
     try:
-        logging.info("Application starting")
-        SystemUtils.run_as_admin()
-        app = QApplication(sys.argv)
-        window = FileRecoveryToolGUI()
-        window.show()
-        logging.info("Entering event loop")
-        sys.exit(app.exec())
-    except Exception as e:
-        error_msg = f"Application failed to start: {str(e)}\n{traceback.format_exc()}"
-        logging.error(error_msg)
-        QMessageBox.critical(None, "Fatal Error", error_msg)
+        import aarambh_gui  # PyQt6 is only loaded here
+    except ImportError as e:
+        print(f"Failed to import required modules: {e}")
         sys.exit(1)
+    aarambh_gui.main()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    multiprocessing.freeze_support()  # Frozen Windows builds spawn deep scan workers through this entry point
+    main()
@@ -0,0 +1,888 @@
+# PyQt6 front end for the scanning engine in aarambh.py, imported only when the GUI is started
+import os  # For file and directory operations
+import sys  # For the application arguments and exit code
+import time  # For batching scan results
+import threading  # For batches flushed from both the scan and GUI threads
+import json  # For scan metrics and catalog info
+import logging  # For debugging and logging
+import traceback  # For detailed error logging
+from array import array  # For compact numeric columns of the result list
+from charset_normalizer import detect  # For detecting text encoding in previews
+import numpy as np  # For the sorted row index of the result view
+from PyQt6.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
+    QComboBox, QLineEdit, QPushButton, QRadioButton, QProgressBar,
+    QTableView, QAbstractItemView, QFileDialog, QMessageBox, QFrame, QScrollArea, QLabel, QSpinBox, QCheckBox
+)  # GUI components
+from PyQt6.QtGui import QIcon, QPixmap  # For icons and image preview
+from PyQt6.QtCore import (
+    Qt, QThread, QTimer, pyqtSignal, QAbstractTableModel, QAbstractProxyModel, QModelIndex
+)  # Core Qt functionality and the model/view result list
+
+from aarambh import (
+    LogUtils, SystemUtils, FileSignatures, FileRecordReader, ScanCatalog, ScanMetrics, ScanEngine, RestoreEngine,
+    MemoryGovernor
+)  # Qt-free scanning engine
+
+# Thread class running a ScanEngine and relaying its results to the GUI as batched Qt signals
+class ScanThread(QThread):
+    files_found = pyqtSignal(list)  # Signal carrying a batch of found file records
+    progress_updated = pyqtSignal(int)  # Signal for progress updates (percentage)
+    metrics_updated = pyqtSignal(dict)  # Signal carrying a ScanMetrics report
+    BATCH_INTERVAL = 0.1  # Seconds between batches sent to the GUI
+    BATCH_SIZE = 1000  # Found files that trigger a batch before the interval is up
+    METRICS_INTERVAL = 1.0  # Seconds between metrics reports sent to the GUI
+
+    def __init__(self, drive, scan_type, workers=None, catalog_path=None, resume=False, direct_io=False, max_memory=None):
+        """Initialize the scan thread with drive, scan type, deep scan worker count, catalog path, I/O mode and memory budget."""
+        super().__init__()
+        self.pending_files = []  # Found files not yet sent to the GUI
+        self.lock = threading.Lock()  # Batches are flushed by the scan thread and by the GUI's flush timer
+        self.progress = None  # Latest progress, sent with the next batch
+        self.sent_progress = None
+        self.last_flush = time.monotonic()
+        self.last_metrics = self.last_flush
+        self.engine = ScanEngine(drive, scan_type, workers, catalog_path=catalog_path, resume=resume,
+                                 on_file_found=self.queue_file, on_progress=self.queue_progress)
+        self.engine.direct_io = direct_io
+        self.engine.memory.budget = max_memory
+
+    def queue_file(self, file_info):
+        """Buffer a found file for the next batch."""
+        with self.lock:
+            self.pending_files.append(file_info)
+            full = len(self.pending_files) >= self.BATCH_SIZE
+        self.flush() if full else self.flush_if_due()
+
+    def queue_progress(self, progress):
+        """Keep the latest progress for the next batch."""
+        self.progress = progress
+        self.flush_if_due()
+
+    def flush_if_due(self):
+        """Flush once BATCH_INTERVAL has passed; the GUI's timer calls this too, for when the engine goes quiet."""
+        if time.monotonic() - self.last_flush >= self.BATCH_INTERVAL:
+            self.flush()
+
+    def flush(self, final=False):
+        """Send buffered files as one signal, plus the progress if it moved and metrics when they are due.
+
+        Signals are queued to the GUI, and emitted under the lock so batches arrive in order whichever thread flushes.
+        """
+        with self.lock:
+            if self.pending_files:
+                self.files_found.emit(self.pending_files)
+                self.pending_files = []
+            if self.progress is not None and self.progress != self.sent_progress:
+                self.progress_updated.emit(self.progress)
+                self.sent_progress = self.progress
+            self.last_flush = time.monotonic()
+            if final or self.last_flush - self.last_metrics >= self.METRICS_INTERVAL:
+                self.metrics_updated.emit(self.engine.metrics.report())
+                self.last_metrics = self.last_flush
+
+    @property
+    def paused(self):
+        """Whether the scan is paused."""
+        return self.engine.paused
+
+    def run(self):
+        """Main thread execution method."""
+        try:
+            self.engine.run()
+        finally:
+            self.flush(final=True)
+
+    def stop(self):
+        """Stop the scan."""
+        self.engine.stop()
+
+    def pause(self):
+        """Pause the scan."""
+        self.engine.pause()
+
+    def resume(self):
+        """Resume the scan."""
+        self.engine.resume()
+
+# Thread running a RestoreEngine off the GUI thread and relaying its progress as Qt signals
+class RestoreThread(QThread):
+    progress_updated = pyqtSignal(int, int, float, float)  # Files done, files total, bytes written, seconds elapsed
+
+    def __init__(self, destination, file_infos, workers=4):
+        """Initialize the restore of file_infos into destination with a pool of workers threads."""
+        super().__init__()
+        self.file_infos = file_infos
+        self.engine = RestoreEngine(destination, workers, on_progress=self.report_progress)
+
+    def report_progress(self, done, total, bytes_written, elapsed):
+        """Forward restore progress to the GUI."""
+        self.progress_updated.emit(done, total, float(bytes_written), elapsed)
+
+    def run(self):
+        """Main thread execution method."""
+        self.engine.run(self.file_infos)
+
+    def stop(self):
+        """Cancel the restore."""
+        self.engine.stop()
+
+# Result list model over a columnar store of found files, grown by appending rows
+class FileTableModel(QAbstractTableModel):
+    HEADERS = ['Select', 'Name', 'Type', 'Size', 'Modified', 'Status', 'State', 'Path']
+    FIELDS = ('name', 'type', 'size', 'last_modified', 'status', 'state', 'path')  # Field shown in columns 1..7
+
+    def __init__(self, parent=None):
+        """Create an empty model."""
+        super().__init__(parent)
+        self.clear_store()
+
+    def clear_store(self):
+        """Reset the column store to zero rows."""
+        self.columns = {column: [] for column in ScanCatalog.COLUMNS}  # One list per catalog column
+        self.columns['offset'] = array('q')
+        self.columns['size'] = array('q')
+        self.columns['repair'] = bytearray()
+        self.appenders = [self.columns[column].append for column in ScanCatalog.COLUMNS]
+        self.selected = set()  # Rows ticked for restore
+
+    def rowCount(self, parent=QModelIndex()):
+        """Number of found files."""
+        return 0 if parent.isValid() else len(self.columns['name'])
+
+    def columnCount(self, parent=QModelIndex()):
+        """Number of displayed columns."""
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        """Column titles."""
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        """Cell text."""
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        row, column = index.row(), index.column()
+        if column == 0:
+            return '☑' if row in self.selected else '☐'
+        field = self.FIELDS[column - 1]
+        value = self.columns[field][row]
+        if field == 'size':
+            return f"{value} bytes"
+        if field == 'type':
+            return value.upper()
+        return value
+
+    def sort_key(self, column):
+        """Return a row -> sort key function for a column (raw values, so sizes sort numerically)."""
+        if column == 0:
+            return lambda row: row in self.selected
+        return self.columns[self.FIELDS[column - 1]].__getitem__
+
+    def add_files(self, file_infos):
+        """Add a batch of files; the engine has already dropped duplicates, and a named record listing the carves it
+        replaces is written over their row."""
+        self.insert_rows([file_info for file_info in file_infos if not file_info.get('replaces')])
+        fresh, stale = [], []  # Replacements whose carves are not listed; carve rows left over once one is rewritten
+        for file_info in file_infos:
+            if file_info.get('replaces'):
+                rows = self.find_rows(file_info['replaces'])
+                if rows:
+                    self.write_row(rows[0], file_info)
+                    stale.extend(rows[1:])
+                else:
+                    fresh.append(file_info)
+        self.insert_rows(fresh)
+        if stale:
+            self.remove_rows(stale)
+
+    def insert_rows(self, file_infos):
+        """Append files as one row insert."""
+        if not file_infos:
+            return
+        first = self.rowCount()
+        self.beginInsertRows(QModelIndex(), first, first + len(file_infos) - 1)
+        for file_info in file_infos:
+            self.append_row(file_info)
+        self.endInsertRows()
+
+    def find_rows(self, keys):
+        """Return the rows holding the given (offset, name) keys, in key order."""
+        names = self.columns['name']
+        rows = []
+        for offset, name in keys:
+            candidates = np.flatnonzero(np.frombuffer(self.columns['offset'], dtype=np.int64) == offset)
+            rows.extend(int(row) for row in candidates if names[row] == name)
+        return rows
+
+    def write_row(self, row, file_info):
+        """Overwrite one row with a new record in place."""
+        for column, value in zip(ScanCatalog.COLUMNS, self.encode(file_info)):
+            self.columns[column][row] = value
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    def remove_rows(self, rows):
+        """Drop rows under a model reset, keeping the ticks of the rows that remain."""
+        gone = set(rows)
+        removed = np.array(sorted(gone))
+        self.beginResetModel()
+        for row in reversed(removed.tolist()):
+            for column in self.columns.values():
+                del column[row]
+        self.selected = {row - int(np.searchsorted(removed, row)) for row in self.selected if row not in gone}
+        self.endResetModel()
+
+    def load_files(self, file_infos):
+        """Replace the contents with many records under a single model reset."""
+        self.beginResetModel()
+        self.clear_store()
+        for file_info in file_infos:
+            self.append_row(file_info)
+        self.endResetModel()
+
+    def append_row(self, file_info):
+        """Append one record to every column."""
+        for append, value in zip(self.appenders, self.encode(file_info)):
+            append(value)
+
+    @staticmethod
+    def encode(file_info):
+        """Convert a file record to values in ScanCatalog.COLUMNS order; repeated strings are interned."""
+        return (
+            file_info['name'], sys.intern(file_info['type']), file_info['offset'], file_info['size'],
+            sys.intern(file_info['source']), ScanCatalog.pack_extents(file_info['extents']),
+            int(bool(file_info['repair'])), sys.intern(file_info['status']), sys.intern(file_info['state']),
+            file_info['last_modified'], file_info['path'], file_info.get('hash'),
+        )
+
+    def file_info(self, row):
+        """Rebuild the file record stored at a row."""
+        file_info = {column: self.columns[column][row] for column in ScanCatalog.COLUMNS}
+        file_info['extents'] = ScanCatalog.unpack_extents(file_info['extents'])
+        file_info['repair'] = bool(file_info['repair'])
+        return file_info
+
+    def toggle_selected(self, row):
+        """Tick or untick a row for restore."""
+        if row in self.selected:
+            self.selected.remove(row)
+        else:
+            self.selected.add(row)
+        index = self.index(row, 0)
+        self.dataChanged.emit(index, index)
+
+    def select_all(self):
+        """Tick every row."""
+        self.selected = set(range(self.rowCount()))
+        if self.selected:
+            self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, 0))
+
+    def clear(self):
+        """Drop every row."""
+        self.beginResetModel()
+        self.clear_store()
+        self.endResetModel()
+
+# Sorted, type-filtered view of FileTableModel; row order is kept in NumPy arrays instead of per-comparison data() calls
+class FileFilterProxyModel(QAbstractProxyModel):
+    def __init__(self, parent=None):
+        """Create an unsorted proxy showing every type."""
+        super().__init__(parent)
+        self.file_type = None  # Lower-case type to show, or None for all files
+        self.sort_column = -1  # -1 keeps discovery order
+        self.sort_order = Qt.SortOrder.AscendingOrder
+        self.rows = np.empty(0, dtype=np.int64)  # Accepted source rows, in ascending key order when sorted
+        self.keys = np.empty(0, dtype=object)  # Sort key of each entry in rows, for merging inserts
+        self.positions = None  # Source row -> index in rows (-1 if filtered out), built on demand
+
+    def setSourceModel(self, model):
+        """Attach the FileTableModel and follow its inserts, resets and edits."""
+        super().setSourceModel(model)
+        model.rowsInserted.connect(self.source_rows_inserted)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self.source_reset)
+        model.dataChanged.connect(self.source_data_changed)
+        self.beginResetModel()
+        self.refresh()
+        self.endResetModel()
+
+    def set_file_type(self, file_type):
+        """Show only files of one type, or all files for None."""
+        self.beginResetModel()
+        self.file_type = file_type
+        self.refresh()
+        self.endResetModel()
+
+    def accepted(self, first, last):
+        """Return the source rows in [first, last] that pass the type filter."""
+        rows = np.arange(first, last + 1, dtype=np.int64)
+        if self.file_type is None:
+            return rows
+        types = np.array(self.sourceModel().columns['type'][first:last + 1], dtype=object)
+        return rows[types == self.file_type]
+
+    def sorted_keys(self, rows):
+        """Sort source rows by the sort column; returns (rows, keys) as arrays."""
+        key = self.sourceModel().sort_key(self.sort_column)
+        rows = sorted(rows.tolist(), key=key)
+        keys = np.empty(len(rows), dtype=object)
+        keys[:] = list(map(key, rows))
+        return np.array(rows, dtype=np.int64), keys
+
+    def refresh(self):
+        """Rebuild the filtered, sorted row list from the source model."""
+        rows = self.accepted(0, self.sourceModel().rowCount() - 1)
+        if self.sort_column >= 0:
+            self.rows, self.keys = self.sorted_keys(rows)
+        else:
+            self.rows, self.keys = rows, np.empty(0, dtype=object)
+        self.positions = None
+
+    def position(self, index):
+        """Translate between an index into rows and a proxy row (descending sorts read rows backwards)."""
+        if self.sort_column >= 0 and self.sort_order == Qt.SortOrder.DescendingOrder:
+            return len(self.rows) - 1 - index
+        return index
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Re-sort every row with one list sort."""
+        self.relayout(lambda: self.set_sort(column, order))
+
+    def set_sort(self, column, order):
+        """Store the sort column and order, then rebuild the row list."""
+        self.sort_column, self.sort_order = column, order
+        self.refresh()
+
+    def relayout(self, change):
+        """Apply a reordering change as a layout change that keeps the view's persistent indexes."""
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        sources = [self.mapToSource(index) for index in persistent]
+        change()
+        self.positions = None
+        moved = []
+        for source in sources:  # Usually just the current index and selection corners
+            found = np.flatnonzero(self.rows == source.row())
+            moved.append(self.index(self.position(int(found[0])), source.column()) if found.size else QModelIndex())
+        self.changePersistentIndexList(persistent, moved)
+        self.layoutChanged.emit()
+
+    def merge_rows(self, added):
+        """Move rows appended at the end of the view into key order with one merge."""
+        if self.sort_order == Qt.SortOrder.DescendingOrder:
+            self.rows = self.rows[len(added):]
+        else:
+            self.rows = self.rows[:-len(added)]
+        added, added_keys = self.sorted_keys(added)
+        points = np.searchsorted(self.keys, added_keys, side='right')
+        self.rows = np.insert(self.rows, points, added)
+        self.keys = np.insert(self.keys, points, added_keys)
+
+    def source_rows_inserted(self, parent, first, last):
+        """Append new source rows as one block, then merge them into key order when sorted."""
+        added = self.accepted(first, last)
+        if not added.size:
+            return
+        self.positions = None
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(added) - 1)
+        if self.sort_column >= 0 and self.sort_order == Qt.SortOrder.DescendingOrder:
+            self.rows = np.concatenate((added[::-1], self.rows))  # The end of a descending view is the front of rows
+        else:
+            self.rows = np.concatenate((self.rows, added))
+        self.endInsertRows()
+        if self.sort_column >= 0:
+            self.relayout(lambda: self.merge_rows(added))
+
+    def source_reset(self):
+        """Follow a source reset."""
+        self.refresh()
+        self.endResetModel()
+
+    def source_data_changed(self, top_left, bottom_right, roles=()):
+        """Repaint after in-place edits; rows keep their place until the next sort."""
+        if len(self.rows):
+            self.dataChanged.emit(self.index(0, top_left.column()), self.index(len(self.rows) - 1, bottom_right.column()))
+
+    def mapToSource(self, proxy_index):
+        """Proxy index -> source index."""
+        if not proxy_index.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(int(self.rows[self.position(proxy_index.row())]), proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        """Source index -> proxy index, or an invalid index if the row is filtered out."""
+        if not source_index.isValid():
+            return QModelIndex()
+        if self.positions is None or len(self.positions) < self.sourceModel().rowCount():
+            self.positions = np.full(self.sourceModel().rowCount(), -1, dtype=np.int64)
+            self.positions[self.rows] = np.arange(len(self.rows))
+        index = int(self.positions[source_index.row()])
+        return QModelIndex() if index < 0 else self.index(self.position(index), source_index.column())
+
+    def index(self, row, column, parent=QModelIndex()):
+        """Flat table index."""
+        if parent.isValid() or not 0 <= row < len(self.rows) or not 0 <= column < self.columnCount():
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index):
+        """Rows have no parent."""
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        """Number of rows passing the filter."""
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        """Same columns as the source."""
+        return 0 if parent.isValid() else len(FileTableModel.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        """Column titles from the source."""
+        return self.sourceModel().headerData(section, orientation, role)
+
+# GUI class for the recovery tool
+class FileRecoveryToolGUI(QMainWindow):
+    def __init__(self):
+        """Initialize the GUI."""
+        super().__init__()
+        self.setWindowTitle("Aarambh: Lost Data Retrieval Tool")
+        self.setWindowIcon(QIcon("aarambh_icon.png"))
+        self.setMinimumSize(800, 600)
+        self.setGeometry(100, 100, 900, 600)
+        self.file_model = FileTableModel(self)  # Found file records (extents only, no payloads)
+        self.file_proxy = FileFilterProxyModel(self)  # Sorted, type-filtered view of file_model
+        self.file_proxy.setSourceModel(self.file_model)
+        self.record_reader = FileRecordReader()  # Reads file bytes back for preview and restore
+        self.scan_thread = None  # Scanning thread
+        self.restore_thread = None  # Restoring thread
+        self.metrics_report = None  # Latest ScanMetrics report, for export
+        self.flush_timer = QTimer(self)  # Flushes scan results the engine has buffered while it is quiet
+        self.flush_timer.setInterval(int(ScanThread.BATCH_INTERVAL * 1000))
+        self.flush_timer.timeout.connect(self.flush_scan_results)
+        self.setup_gui()
+        self.apply_theme()
+        logging.info("GUI initialized")
+
+    def apply_theme(self):
+        """Apply a custom dark theme to the GUI."""
+        self.setStyleSheet("""
+            QWidget { background-color: #1A1F2B; color: #E0E6F0; font-family: 'Segoe UI', sans-serif; font-size: 13px; }
+            QPushButton { background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #00C4B4, stop:1 #00A3E0); border: 1px solid #3A4559; padding: 8px; border-radius: 10px; color: #FFFFFF; font-weight: 600; font-size: 14px; }
+            QPushButton:hover { background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #00A3E0, stop:1 #00C4B4); }
+            QPushButton:disabled { background: #4A5366; color: #A0A0A0; border: 1px solid #3A4559; }
+            QComboBox, QLineEdit { background-color: #252C3D; border: 1px solid #3A4559; padding: 5px; border-radius: 8px; color: #E0E6F0; }
+            QTableView { background-color: #252C3D; border: 1px solid #3A4559; border-radius: 12px; alternate-background-color: #2E3548; padding: 5px; }
+            QFrame { background-color: #252C3D; border: 1px solid #3A4559; border-radius: 12px; }
+            QProgressBar { border: 1px solid #3A4559; background-color: #1A1F2B; text-align: center; color: #E0E6F0; border-radius: 8px; }
+            QProgressBar::chunk { background-color: #00C4B4; border-radius: 8px; }
+        """)
+        logging.debug("Theme applied")
+
+    def setup_gui(self):
+        """Set up the GUI layout and widgets."""
+        main_widget = QWidget()
+        self.setCentralWidget(main_widget)
+        main_layout = QVBoxLayout(main_widget)
+
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll_content = QWidget()
+        scroll_layout = QVBoxLayout(scroll_content)
+        scroll.setWidget(scroll_content)
+        main_layout.addWidget(scroll)
+
+        # Input frame for drive and path selection
+        input_frame = QFrame()
+        input_layout = QFormLayout(input_frame)
+        drive_layout = QHBoxLayout()
+        self.driver_combo = QComboBox()
+        self.driver_combo.addItems(SystemUtils.get_drives() or ["No drives detected"])
+        image_btn = QPushButton("Open Image")
+        image_btn.clicked.connect(self.browse_image)
+        drive_layout.addWidget(self.driver_combo)
+        drive_layout.addWidget(image_btn)
+        input_layout.addRow("Select Drive:", drive_layout)
+        recovery_layout = QHBoxLayout()
+        self.recovery_path = QLineEdit()
+        browse_btn = QPushButton("Browse")
+        browse_btn.clicked.connect(self.browse_recovery)
+        recovery_layout.addWidget(self.recovery_path)
+        recovery_layout.addWidget(browse_btn)
+        input_layout.addRow("Recovery Path:", recovery_layout)
+        scroll_layout.addWidget(input_frame)
+
+        # Filter and scan type frame
+        filter_frame = QFrame()
+        filter_layout = QHBoxLayout(filter_frame)
+        self.filter_combo = QComboBox()
+        self.filter_combo.addItems(["All files"] + [ft.upper() for ft in FileSignatures.SIGNATURES.keys()])
+        self.filter_combo.currentTextChanged.connect(self.apply_filter)
+        self.scan_type = QRadioButton("Quick Scan")
+        self.scan_type.setChecked(True)
+        filter_layout.addWidget(self.filter_combo)
+        filter_layout.addWidget(self.scan_type)
+        filter_layout.addWidget(QRadioButton("Deep Scan"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(1, os.cpu_count() or 1))
+        self.workers_spin.setValue(self.workers_spin.maximum())
+        self.workers_spin.setToolTip("Deep Scan worker processes")
+        filter_layout.addWidget(QLabel("Workers:"))
+        filter_layout.addWidget(self.workers_spin)
+        self.direct_io_check = QCheckBox("Direct I/O")
+        self.direct_io_check.setToolTip("Read around the OS cache, so a full-drive scan does not evict it")
+        filter_layout.addWidget(self.direct_io_check)
+        self.memory_combo = QComboBox()
+        self.memory_combo.addItems(["No limit", "512M", "1G", "2G", "4G", "8G"])
+        self.memory_combo.setToolTip("Memory budget for carving buffers and carved files; buffers, read-ahead "
+                                     "and workers are reduced to fit")
+        filter_layout.addWidget(QLabel("Memory:"))
+        filter_layout.addWidget(self.memory_combo)
+        self.log_level_combo = QComboBox()
+        self.log_level_combo.addItems(LogUtils.LEVELS)
+        self.log_level_combo.setCurrentText(logging.getLevelName(LogUtils.level()))
+        self.log_level_combo.setToolTip("Log level (takes effect in worker processes from the next scan)")
+        self.log_level_combo.currentTextChanged.connect(LogUtils.set_level)
+        filter_layout.addWidget(QLabel("Log:"))
+        filter_layout.addWidget(self.log_level_combo)
+        scroll_layout.addWidget(filter_frame)
+
+        # Control frame with progress and buttons
+        control_frame = QFrame()
+        control_layout = QVBoxLayout(control_frame)
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 100)
+        self.progress.setFormat("%p%")
+        control_layout.addWidget(self.progress)
+        self.metrics_label = QLabel()
+        self.metrics_label.setWordWrap(True)
+        self.metrics_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        control_layout.addWidget(self.metrics_label)
+        btn_layout = QHBoxLayout()
+        self.start_btn = QPushButton("Start Scan")
+        self.start_btn.clicked.connect(self.start_scan)
+        self.pause_btn = QPushButton("Pause")
+        self.pause_btn.clicked.connect(self.toggle_pause)
+        self.pause_btn.setEnabled(False)
+        self.stop_btn = QPushButton("Stop")
+        self.stop_btn.clicked.connect(self.stop_scan)
+        self.stop_btn.setEnabled(False)
+        self.open_scan_btn = QPushButton("Open Scan")
+        self.open_scan_btn.clicked.connect(self.open_catalog)
+        self.export_metrics_btn = QPushButton("Export Metrics")
+        self.export_metrics_btn.clicked.connect(self.export_metrics)
+        self.export_metrics_btn.setEnabled(False)
+        btn_layout.addWidget(self.start_btn)
+        btn_layout.addWidget(self.pause_btn)
+        btn_layout.addWidget(self.stop_btn)
+        btn_layout.addWidget(self.open_scan_btn)
+        btn_layout.addWidget(self.export_metrics_btn)
+        control_layout.addLayout(btn_layout)
+        scroll_layout.addWidget(control_frame)
+
+        # File list frame
+        preview_frame = QFrame()
+        preview_layout = QVBoxLayout(preview_frame)
+        self.file_list = QTableView()
+        self.file_list.setModel(self.file_proxy)
+        self.file_list.verticalHeader().hide()
+        self.file_list.setShowGrid(False)
+        self.file_list.setWordWrap(False)
+        self.file_list.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.file_list.horizontalHeader().setStretchLastSection(True)
+        self.file_list.setAlternatingRowColors(True)
+        for i, w in enumerate([50, 150, 80, 80, 120, 100, 80, 150]):
+            self.file_list.setColumnWidth(i, w)
+        self.file_list.setSortingEnabled(True)
+        self.file_list.sortByColumn(1, Qt.SortOrder.AscendingOrder)
+        self.file_list.clicked.connect(self.toggle_selection)
+        self.file_list.doubleClicked.connect(self.preview_file)
+        preview_layout.addWidget(self.file_list)
+        scroll_layout.addWidget(preview_frame)
+
+        # Restore buttons
+        restore_layout = QHBoxLayout()
+        self.restore_btn = QPushButton("Restore Selected")
+        self.restore_btn.clicked.connect(self.restore_files)
+        self.recover_all_btn = QPushButton("Restore All")
+        self.recover_all_btn.clicked.connect(self.recover_all_files)
+        self.cancel_restore_btn = QPushButton("Cancel Restore")
+        self.cancel_restore_btn.clicked.connect(self.cancel_restore)
+        self.cancel_restore_btn.setEnabled(False)
+        self.restore_workers_spin = QSpinBox()
+        self.restore_workers_spin.setRange(1, 32)
+        self.restore_workers_spin.setValue(4)
+        self.restore_workers_spin.setToolTip("Files restored in parallel")
+        self.restore_status = QLabel()
+        restore_layout.addWidget(self.restore_btn)
+        restore_layout.addWidget(self.recover_all_btn)
+        restore_layout.addWidget(self.cancel_restore_btn)
+        restore_layout.addWidget(QLabel("Threads:"))
+        restore_layout.addWidget(self.restore_workers_spin)
+        restore_layout.addWidget(self.restore_status)
+        scroll_layout.addLayout(restore_layout)
+
+    def browse_recovery(self):
+        """Open a dialog to select the recovery path."""
+        path = QFileDialog.getExistingDirectory(self, "Select Recovery Path")
+        if path:
+            self.recovery_path.setText(path)
+
+    def browse_image(self):
+        """Open a dialog to select a raw disk image to scan instead of a drive."""
+        path, _ = QFileDialog.getOpenFileName(self, "Select Disk Image", "", "Disk images (*.img *.dd *.raw);;All files (*)")
+        if path:
+            if self.driver_combo.findText(path) == -1:
+                self.driver_combo.addItem(path)
+            self.driver_combo.setCurrentText(path)
+
+    def toggle_selection(self, index):
+        """Toggle file selection in the list."""
+        if index.column() == 0:
+            self.file_model.toggle_selected(self.file_proxy.mapToSource(index).row())
+
+    def preview_file(self, index):
+        """Preview the contents of a selected file."""
+        file_info = self.file_model.file_info(self.file_proxy.mapToSource(index).row())
+        file_id = file_info['name']
+        if not file_info['extents']:
+            QMessageBox.warning(self, "Preview", "No data available for preview")
+            return
+        try:
+            data = self.record_reader.read(file_info)  # Read back from the source, LRU-cached
+            if not data:
+                QMessageBox.warning(self, "Preview", "No data available for preview")
+                return
+            if file_info['type'] in ['jpg', 'png', 'gif']:
+                pixmap = QPixmap()
+                if pixmap.loadFromData(data):
+                    scaled_pixmap = pixmap.scaled(400, 400, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+                    label = QLabel()
+                    label.setPixmap(scaled_pixmap)
+                    msg_box = QMessageBox(self)
+                    msg_box.setWindowTitle("Preview")
+                    msg_box.setText(f"Preview of {file_info['name']}")
+                    msg_box.layout().addWidget(label, 1, 1)
+                    msg_box.exec()
+                else:
+                    QMessageBox.warning(self, "Preview", f"Cannot preview {file_info['type']} file: Corrupted or invalid data")
+            elif file_info['type'] == 'txt':
+                encoding = detect(data[:1024])['encoding'] or 'utf-8'
+                text = data.decode(encoding, errors='ignore')[:500]
+                if text.strip():
+                    QMessageBox.information(self, "Preview", f"Text Preview ({encoding}):\n\n{text}")
+                else:
+                    QMessageBox.warning(self, "Preview", "Text file is empty or unreadable")
+            elif file_info['type'] == 'pdf':
+                QMessageBox.information(self, "Preview", "PDF preview not supported yet\nFirst 500 bytes:\n" + data[:500].decode('ascii', errors='ignore'))
+            else:
+                QMessageBox.information(self, "Preview", f"No preview available for {file_info['type']}\nFirst 500 bytes:\n" + data[:500].decode('ascii', errors='ignore'))
+        except Exception as e:
+            logging.error(f"Preview failed for {file_id}: {traceback.format_exc()}")
+            QMessageBox.warning(self, "Preview", f"Failed to preview file: {str(e)}")
+
+    def start_scan(self):
+        """Start the scanning process."""
+        drive = self.driver_combo.currentText()
+        recovery_path = self.recovery_path.text()
+        if not drive or "No drives" in drive:
+            QMessageBox.critical(self, "Error", "Please select a drive")
+            return
+        if not recovery_path:
+            QMessageBox.critical(self, "Error", "Please select a recovery path")
+            return
+        if os.path.isdir(drive) and drive[:2] in recovery_path[:2]:
+            QMessageBox.warning(self, "Warning", "Recovery path should be on a different drive to avoid overwriting data")
+
+        self.file_model.clear()
+        self.record_reader.close()  # Drop cached previews and handles from the previous scan
+        self.progress.setValue(0)
+        self.update_metrics(None)
+
+        scan_type = "Quick" if self.scan_type.isChecked() else "Deep"
+        catalog_path = ScanCatalog.new_path(drive, scan_type)
+        self.launch_scan(drive, scan_type, catalog_path)
+        logging.info(f"Started {scan_type} scan on {drive}, cataloging to {catalog_path}")
+
+    def launch_scan(self, drive, scan_type, catalog_path, resume=False):
+        """Start the scan thread and switch the controls to their scanning state."""
+        self.start_btn.setEnabled(False)
+        self.open_scan_btn.setEnabled(False)
+        self.pause_btn.setEnabled(True)
+        self.stop_btn.setEnabled(True)
+        self.pause_btn.setText("Pause")
+        budget = self.memory_combo.currentText()
+        max_memory = MemoryGovernor.parse_size(budget) if self.memory_combo.currentIndex() else None  # First item: no limit
+        self.scan_thread = ScanThread(drive, scan_type, self.workers_spin.value(), catalog_path, resume,
+                                      self.direct_io_check.isChecked(), max_memory)
+        queued = Qt.ConnectionType.QueuedConnection  # Also when the flush timer emits from the GUI thread
+        self.scan_thread.files_found.connect(self.add_files_to_list, queued)
+        self.scan_thread.progress_updated.connect(self.update_progress, queued)
+        self.scan_thread.metrics_updated.connect(self.update_metrics, queued)
+        self.scan_thread.finished.connect(self.finish_scan)
+        self.scan_thread.start()
+        self.flush_timer.start()
+
+    def flush_scan_results(self):
+        """Send files and progress the scan thread is holding, in case the engine has gone quiet or is paused."""
+        if self.scan_thread:
+            self.scan_thread.flush_if_due()
+
+    def open_catalog(self):
+        """Reopen the results of a past scan from its catalog, without touching the drive."""
+        path, _ = QFileDialog.getOpenFileName(self, "Open Scan", ScanCatalog.CATALOG_DIR, "Scan catalogs (*.db)")
+        if not path:
+            return
+        try:
+            catalog = ScanCatalog(path)
+            try:
+                info = catalog.info()
+                self.record_reader.close()
+                self.file_model.load_files(catalog.iter_files())
+            finally:
+                catalog.close()
+            self.progress.setValue(100 if info.get('status') == "complete" else 0)
+            self.update_metrics(json.loads(info['metrics']) if info.get('metrics') else None)
+            logging.info(f"Opened scan catalog {path}: {self.file_model.rowCount()} files, "
+                         f"status {info.get('status')}")
+            if info.get('status') != "complete" and info.get('checkpoint'):
+                answer = QMessageBox.question(self, "Resume Scan",
+                                              f"This {info['scan_type']} scan of {info['source']} did not finish.\n"
+                                              "Resume it from its last checkpoint?")
+                if answer == QMessageBox.StandardButton.Yes:
+                    self.launch_scan(info['source'], info['scan_type'], path, resume=True)
+                    logging.info(f"Resumed {info['scan_type']} scan on {info['source']} from {path}")
+        except Exception as e:
+            logging.error(f"Failed to open scan catalog {path}: {traceback.format_exc()}")
+            QMessageBox.critical(self, "Error", f"Failed to open scan: {str(e)}")
+
+    def toggle_pause(self):
+        """Toggle between pause and resume."""
+        if self.scan_thread and self.scan_thread.isRunning():
+            if self.scan_thread.paused:
+                self.scan_thread.resume()
+                self.pause_btn.setText("Pause")
+            else:
+                self.scan_thread.pause()
+                self.pause_btn.setText("Resume")
+            logging.info(f"Scan {'paused' if self.scan_thread.paused else 'resumed'}")
+
+    def stop_scan(self):
+        """Stop the scan."""
+        if self.scan_thread and self.scan_thread.isRunning():
+            self.scan_thread.stop()
+            self.scan_thread.wait()
+
+    def finish_scan(self):
+        """Handle scan completion."""
+        self.start_btn.setEnabled(True)
+        self.open_scan_btn.setEnabled(True)
+        self.pause_btn.setEnabled(False)
+        self.stop_btn.setEnabled(False)
+        self.flush_timer.stop()
+        self.scan_thread = None
+        self.progress.setValue(100)
+        QApplication.processEvents()
+        logging.info(f"Scan finished, found {self.file_model.rowCount()} files")
+
+    def update_progress(self, value):
+        """Update the progress bar."""
+        self.progress.setValue(value)
+
+    def update_metrics(self, report):
+        """Show the latest per-stage scan metrics."""
+        self.metrics_report = report
+        self.metrics_label.setText(ScanMetrics.summary(report) if report else "")
+        self.export_metrics_btn.setEnabled(report is not None)
+
+    def export_metrics(self):
+        """Save the latest scan metrics as JSON."""
+        path, _ = QFileDialog.getSaveFileName(self, "Export Metrics", "scan_metrics.json", "JSON (*.json)")
+        if not path or not self.metrics_report:
+            return
+        try:
+            with open(path, 'w') as f:
+                json.dump(self.metrics_report, f, indent=2)
+            logging.info(f"Exported scan metrics to {path}")
+        except Exception as e:
+            logging.error(f"Metrics export failed: {traceback.format_exc()}")
+            QMessageBox.critical(self, "Error", f"Failed to export metrics: {str(e)}")
+
+    def add_files_to_list(self, file_infos):
+        """Add a batch of found files to the list with one model update."""
+        self.file_model.add_files(file_infos)
+
+    def apply_filter(self, text):
+        """Show only the file type picked in the filter box."""
+        self.file_proxy.set_file_type(None if text == "All files" else text.lower())
+
+    def restore_files(self):
+        """Restore selected files to the recovery path in the background."""
+        if self.restore_thread:
+            QMessageBox.warning(self, "Warning", "A restore is already running")
+            return
+        if not self.file_model.selected:
+            QMessageBox.warning(self, "Warning", "No files selected")
+            return
+        recovery_path = self.recovery_path.text()
+        if not recovery_path:
+            QMessageBox.critical(self, "Error", "Please select a recovery path")
+            return
+        file_infos = [self.file_model.file_info(row) for row in sorted(self.file_model.selected)]
+        self.restore_btn.setEnabled(False)
+        self.recover_all_btn.setEnabled(False)
+        self.cancel_restore_btn.setEnabled(True)
+        self.restore_status.setText(f"Restoring {len(file_infos):,} files...")
+        self.restore_thread = RestoreThread(recovery_path, file_infos, self.restore_workers_spin.value())
+        self.restore_thread.progress_updated.connect(self.update_restore_progress)
+        self.restore_thread.finished.connect(self.finish_restore)
+        self.restore_thread.start()
+        logging.info(f"Restoring {len(file_infos)} files to {recovery_path}")
+
+    def update_restore_progress(self, done, total, bytes_written, elapsed):
+        """Show restore progress and throughput."""
+        rate = bytes_written / elapsed / (1024 * 1024) if elapsed else 0.0
+        self.restore_status.setText(f"Restored {done:,}/{total:,} files, {bytes_written / (1024 * 1024):,.1f} MB "
+                                    f"({rate:.1f} MB/s)")
+
+    def cancel_restore(self):
+        """Cancel the running restore."""
+        if self.restore_thread:
+            self.restore_thread.stop()
+            self.cancel_restore_btn.setEnabled(False)
+
+    def finish_restore(self):
+        """Handle restore completion."""
+        engine = self.restore_thread.engine
+        self.restore_thread = None
+        self.restore_btn.setEnabled(True)
+        self.recover_all_btn.setEnabled(True)
+        self.cancel_restore_btn.setEnabled(False)
+        cancelled = engine.stop_event.is_set()
+        self.restore_status.setText(f"Restored {engine.restored:,} of {engine.total:,} files"
+                                    f"{' (cancelled)' if cancelled else ''}")
+        QMessageBox.information(self, "Cancelled" if cancelled else "Complete",
+                                f"Restored {engine.restored} of {engine.total} files")
+
+    def recover_all_files(self):
+        """Restore all found files."""
+        self.file_model.select_all()
+        self.restore_files()
+
+def main():
+    """Run the GUI application."""
+    try:
+        SystemUtils.run_as_admin()
+        app = QApplication(sys.argv)
+        window = FileRecoveryToolGUI()
+        window.show()
+        logging.info("Entering event loop")
+        sys.exit(app.exec())
+    except Exception as e:
+        error_msg = f"Application failed to start: {str(e)}\n{traceback.format_exc()}"
+        logging.error(error_msg)
+        QMessageBox.critical(None, "Fatal Error", error_msg)
+        sys.exit(1)
@@ -0,0 +1,528 @@
+# Micro-benchmarks for the scanning engine, run against synthetic disk images
+import os  # For random payloads
+import sys  # For command-line arguments
+import time  # For timing operations
+import random  # For placing signatures in the synthetic image
+import tempfile  # For on-disk synthetic images
+import threading  # For stopping a scan part way
+import struct  # For packing synthetic MFT records
+import zlib  # For synthetic PNG chunk CRCs
+import io  # For in-memory synthetic archives
+import zipfile  # For synthetic ZIP archives
+import numpy as np  # For synthetic FAT tables
+from charset_normalizer import detect  # For the legacy text check
+from concurrent.futures import ThreadPoolExecutor  # For concurrent device reads
+
+from aarambh import (FileSignatures, SignatureMatcher, BlockDevice, ScanEngine, MftDecoder, LogFileParser, FatTable,
+                     ClusterClassifier, FileUtils, MeteredDevice, ScanMetrics, ScanCatalog)
+
+MB = 1024 * 1024
+
+def build_synthetic_image(size, hits=2000, seed=1):
+    """Build an image of mixed zero-fill, random and text blocks with planted signatures."""
+    rng = random.Random(seed)
+    block = 1 * MB
+    text = b"The quick brown fox jumps over the lazy dog. " * (block // 45 + 1)
+    parts = []
+    for i in range(size // block):
+        kind = i % 3
+        if kind == 0:
+            parts.append(b'\x00' * block)  # Zeroed free space
+        elif kind == 1:
+            parts.append(os.urandom(block))  # Compressed/encrypted content
+        else:
+            parts.append(text[:block])  # Text content
+    image = bytearray(b''.join(parts))
+    start_sigs = [s for sig in FileSignatures.SIGNATURES.values() for s in sig['start']]
+    for _ in range(hits):
+        start_sig = rng.choice(start_sigs)
+        pos = rng.randrange(len(image) - len(start_sig))
+        image[pos:pos + len(start_sig)] = start_sig
+    return bytes(image)
+
+def legacy_find_all(data):
+    """Per-signature data.find() loop used by carve_chunk_* before SignatureMatcher."""
+    hits = []
+    for file_type, sig in FileSignatures.SIGNATURES.items():
+        for start_sig in sig['start']:
+            pos = 0
+            while (pos := data.find(start_sig, pos)) != -1:
+                hits.append((pos, file_type))
+                pos += len(start_sig)
+    return hits
+
+def bench_signature_matcher(size=64 * MB, rounds=3):
+    """Compare bytes/sec of the legacy multi-pass search and the compiled matcher."""
+    image = build_synthetic_image(size)
+    matcher = SignatureMatcher(FileSignatures.SIGNATURES)
+
+    def best_of(func):
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = func(image)
+            best = min(best, time.perf_counter() - start)
+        return best, result
+
+    legacy_time, legacy_hits = best_of(legacy_find_all)
+    matcher_time, matcher_hits = best_of(matcher.find_all)
+    expanded = {(pos, file_type) for pos, _, file_types in matcher_hits for file_type in file_types}
+    if expanded != set(legacy_hits):
+        print("WARNING: matcher hits differ from the legacy search")
+    print(f"Signature search over {len(image) // MB} MB synthetic image ({len(legacy_hits)} hits)")
+    print(f"  legacy data.find loop : {len(image) / legacy_time / MB:8.1f} MB/s")
+    print(f"  SignatureMatcher      : {len(image) / matcher_time / MB:8.1f} MB/s")
+    print(f"  speedup               : {legacy_time / matcher_time:8.2f}x")
+
+def write_synthetic_image(size):
+    """Write a synthetic image to a temporary .img file and return its path."""
+    with tempfile.NamedTemporaryFile(suffix='.img', delete=False) as f:
+        f.write(build_synthetic_image(size))
+        return f.name
+
+def bench_block_device(size=256 * MB, buffer_size=16 * MB, workers=(1, 2, 4)):
+    """Measure positional read throughput of one shared image device across threads, cached and direct."""
+    path = write_synthetic_image(size)
+    try:
+        for direct in (False, True):
+            device = BlockDevice.open(path, direct)
+            try:
+                bench_device_reads(device, buffer_size, workers)
+            finally:
+                device.close()
+    finally:
+        os.remove(path)
+
+def bench_device_reads(device, buffer_size, workers):
+    """Time reads of the whole device in buffer_size steps, sharded over each thread count."""
+    offsets = list(range(0, device.size, buffer_size))
+    mode = "direct I/O" if device.direct else "through the OS cache"
+    print(f"Positional reads over {device.size // MB} MB image ({type(device).__name__}, {mode})")
+    for count in workers:
+        buffers = [BlockDevice.allocate(buffer_size) for _ in range(count)]  # Aligned, as direct reads need
+
+        def read_shard(index):
+            total = 0
+            for offset in offsets[index::count]:
+                total += device.readinto_at(offset, buffers[index])
+            return total
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            total = sum(executor.map(read_shard, range(count)))
+        elapsed = time.perf_counter() - start
+        print(f"  {count} thread(s) sharing one device: {total / elapsed / MB:8.1f} MB/s")
+
+def bench_deep_scan_workers(size=32 * MB, workers=(1, 2, 4, 8)):
+    """Measure deep scan throughput as the number of worker processes grows."""
+    path = write_synthetic_image(size)
+    try:
+        print(f"Deep scan over {size // MB} MB image (os.cpu_count() = {os.cpu_count()})")
+        baseline = None
+        for count in workers:
+            found = []
+            engine = ScanEngine(path, "Deep", count, on_file_found=found.append)
+            engine.junk_threshold = float('inf')  # Scan the whole image regardless of junk
+            start = time.perf_counter()
+            engine.run()
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"  {count} worker(s): {size / elapsed / MB:8.1f} MB/s  "
+                  f"{baseline / elapsed:5.2f}x  ({len(found)} files)")
+    finally:
+        os.remove(path)
+
+def bench_resume(size=64 * MB, workers=(1, 2), fractions=(0.25, 0.5)):
+    """Check that a deep scan stopped part way and resumed from its catalog finds exactly what an uninterrupted one does."""
+    path = write_synthetic_image(size)
+    catalogs = []
+
+    def scan(count, catalog_path, resume=False, stop_after=None):
+        """Deep scan into catalog_path, stopping after stop_after seconds if set; return the elapsed time."""
+        catalogs.append(catalog_path)
+        engine = ScanEngine(path, "Deep", count, catalog_path=catalog_path, resume=resume)
+        engine.junk_threshold = float('inf')  # Scan the whole image regardless of junk
+        start = time.perf_counter()
+        thread = threading.Thread(target=engine.run)
+        thread.start()
+        if stop_after is not None:
+            thread.join(stop_after)
+            engine.stop()
+        thread.join()
+        return time.perf_counter() - start
+
+    def file_keys(catalog_path):
+        catalog = ScanCatalog(catalog_path)
+        try:
+            return catalog.file_keys()
+        finally:
+            catalog.close()
+
+    try:
+        print(f"Deep scan over {size // MB} MB image, stopped part way and resumed")
+        for count in workers:
+            full_path = path + f".full{count}.db"
+            elapsed = scan(count, full_path)
+            expected = file_keys(full_path)
+            for fraction in fractions:
+                part_path = path + f".part{count}-{fraction}.db"
+                scan(count, part_path, stop_after=elapsed * fraction)
+                stopped = len(file_keys(part_path))
+                scan(count, part_path, resume=True)
+                found = file_keys(part_path)
+                print(f"  {count} worker(s), stopped at {fraction:.0%}: {stopped} then {len(found)} of {len(expected)} "
+                      f"files, {len(expected - found)} missing, {len(found - expected)} extra, "
+                      f"{'equivalent' if found == expected else 'DIFFERENT'}")
+    finally:
+        os.remove(path)
+        for catalog_path in catalogs:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(catalog_path + suffix):
+                    os.remove(catalog_path + suffix)
+
+def build_mft_record(number, record_size=1024):
+    """Build one fixed-up FILE record with $STANDARD_INFORMATION, $FILE_NAME and resident $DATA."""
+    def attribute(attr_type, content):
+        body = bytearray(24) + content
+        body += b'\x00' * (-len(body) % 8)
+        struct.pack_into('<IIBBHHHIH', body, 0, attr_type, len(body), 0, 0, 0, 0, 0, len(content), 24)
+        return bytes(body)
+
+    name = f"file{number}.txt".encode('utf-16le')
+    file_name = bytearray(66) + name
+    file_name[64], file_name[65] = len(name) // 2, 1  # Length in characters, Win32 namespace
+    attributes = (attribute(0x10, struct.pack('<4Q', *[132000000000000000 + number] * 4) + bytes(40))
+                  + attribute(0x30, bytes(file_name))
+                  + attribute(0x80, b"benchmark payload " * 8)
+                  + b'\xff\xff\xff\xff\x00\x00\x00\x00')
+    sectors = record_size // 512
+    record = bytearray(record_size)
+    record[0:4] = b'FILE'
+    struct.pack_into('<HH', record, 4, 48, sectors + 1)  # Update sequence array offset and count
+    struct.pack_into('<HHII', record, 20, 56, 1, 56 + len(attributes), record_size)
+    record[56:56 + len(attributes)] = attributes
+    usn = number % 0xFFFF + 1
+    struct.pack_into('<H', record, 48, usn)
+    for sector in range(sectors):
+        tail = (sector + 1) * 512 - 2
+        record[50 + 2 * sector:52 + 2 * sector] = record[tail:tail + 2]
+        struct.pack_into('<H', record, tail, usn)
+    return bytes(record)
+
+def bench_mft_decoder(records=65536, rounds=3):
+    """Measure MftDecoder throughput in records per second over slabs of synthetic records."""
+    decoder = MftDecoder(1024)
+    template = [build_mft_record(number) for number in range(decoder.SLAB_RECORDS)]
+    slab = b''.join(template)
+    slabs = records // decoder.SLAB_RECORDS
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        decoded = sum(len(decoder.decode_slab(slab, index * len(slab))[0]) for index in range(slabs))
+        best = min(best, time.perf_counter() - start)
+    print(f"MFT decoding of {slabs * decoder.SLAB_RECORDS:,} records ({decoded:,} decoded)")
+    print(f"  MftDecoder.decode_slab: {slabs * decoder.SLAB_RECORDS / best:12,.0f} records/s")
+
+def build_log_page(first_lsn, page_size=4096):
+    """Build one fixed-up RCRD page of InitializeFileRecordSegment and UpdateResidentValue records."""
+    def log_record(lsn, operation, redo, mft_record):
+        client = bytearray(0x28)
+        struct.pack_into('<12HQ', client, 0, operation, 0, 0x28, len(redo), 0x28 + len(redo), 0, 0, 0, 0, 0,
+                         (mft_record % 4) * 2, 1, mft_record // 4)
+        client += redo + b'\x00' * (-len(redo) % 8)
+        header = bytearray(0x30)
+        struct.pack_into('<QQQIII', header, 0, lsn, 0, 0, len(client), 0, 1)  # Client data length, record type
+        return bytes(header + client)
+
+    sectors = page_size // 512
+    page = bytearray(page_size)
+    page[0:4] = b'RCRD'
+    struct.pack_into('<HH', page, 4, 40, sectors + 1)
+    pos, lsn = (40 + 2 * (sectors + 1) + 7) & ~7, first_lsn
+    while True:
+        number = lsn % 100000
+        redo = build_mft_record(number) if lsn % 2 else b"updated resident text " * 8
+        record = log_record(lsn, 0x02 if lsn % 2 else 0x07, redo, number)
+        if pos + len(record) > page_size:
+            break
+        page[pos:pos + len(record)] = record
+        pos, lsn = pos + len(record), lsn + 1
+    struct.pack_into('<H', page, 0x18, pos)
+    usn = first_lsn % 0xFFFF + 1
+    struct.pack_into('<H', page, 40, usn)
+    for sector in range(sectors):
+        tail = (sector + 1) * 512 - 2
+        page[42 + 2 * sector:44 + 2 * sector] = page[tail:tail + 2]
+        struct.pack_into('<H', page, tail, usn)
+    return bytes(page), lsn - first_lsn
+
+def bench_logfile_parser(size=64 * MB, rounds=3):
+    """Measure LogFileParser throughput over a synthetic $LogFile of RCRD pages."""
+    parser = LogFileParser(4096, 4096, 1024)
+    page, records = build_log_page(1)
+    slab_size = ScanEngine.LOGFILE_SLAB
+    slab = page * (slab_size // len(page))
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fragments = sum(len(parser.parse(slab, offset)[0]) for offset in range(0, size, slab_size))
+        best = min(best, time.perf_counter() - start)
+    print(f"$LogFile parsing of {size // MB} MB ({size // len(page) * records:,} records, {fragments:,} fragments)")
+    print(f"  LogFileParser.parse: {best:8.3f} s  {size / best / MB:8.1f} MB/s")
+
+def build_fat_directory(entries, total_clusters, seed=1):
+    """Build directory clusters of short entries, two thirds of them deleted files."""
+    rng = random.Random(seed)
+    data = bytearray()
+    for number in range(entries):
+        cluster = rng.randrange(2, total_clusters)
+        entry = bytearray(f"FILE{number % 10000:04d}TXT".encode())
+        entry += struct.pack('<B8xHHHHI', 0x20, cluster >> 16, 0x6000, 0x5063, cluster & 0xFFFF, 4096)
+        if number % 3:
+            entry[0] = 0xE5
+        data += entry
+    return bytes(data)
+
+def bench_fat_table(clusters=8 * 1024 * 1024, entries=1024 * 1024, chains=100000, cluster_size=32 * 1024):
+    """Time in-memory FAT32 chain lookups and bulk directory parsing at 256 GB volume scale."""
+    fat_entries = np.arange(1, clusters + 1, dtype=np.uint32)  # One long chain through every cluster
+    fat_entries[::64] = FatTable.END_OF_CHAIN  # Split into 64-cluster files
+    fat = FatTable(fat_entries, 0, cluster_size)
+    directory = build_fat_directory(entries, clusters)
+    starts = [number * 64 + 1 for number in range(chains)]
+    start = time.perf_counter()
+    followed = sum(len(fat.chain(cluster)) for cluster in starts)
+    chain_time = time.perf_counter() - start
+    start = time.perf_counter()
+    _, files, _ = fat.parse_directory(directory)
+    parse_time = time.perf_counter() - start
+    print(f"FAT32 over {clusters * cluster_size // (1024 * MB)} GB of {cluster_size // 1024} KB clusters")
+    print(f"  chain lookups         : {followed / chain_time:12,.0f} clusters/s")
+    print(f"  directory parsing     : {entries / parse_time:12,.0f} entries/s  ({len(files):,} deleted files)")
+
+def build_fat32_image(files, size=32 * MB, cluster_size=4096):
+    """Build a FAT32 image whose root directory holds deleted entries for files, a name -> contents dict, laid out
+    contiguously so a signature carve finds the same bytes."""
+    sectors_per_cluster, reserved = cluster_size // 512, 32
+    fat_sectors = (size // cluster_size * 4 + 511) // 512
+    image = bytearray(size)
+    image[0:11] = b'\xeb\x58\x90MSWIN4.1'
+    struct.pack_into('<HBHB', image, 11, 512, sectors_per_cluster, reserved, 2)
+    struct.pack_into('<II', image, 32, size // 512, fat_sectors)
+    struct.pack_into('<I', image, 44, 2)  # Root directory cluster
+    image[82:90] = b'FAT32   '
+    for copy in range(2):
+        struct.pack_into('<3I', image, (reserved + copy * fat_sectors) * 512, 0x0FFFFFF8, 0x0FFFFFFF, 0x0FFFFFFF)
+    data_start = (reserved + 2 * fat_sectors) * 512
+    root = data_start
+    cluster = 3
+    for number, (name, contents) in enumerate(files.items()):
+        base, extension = name.upper().split('.')
+        entry = bytearray(f"{base:<8}{extension:<3}".encode())
+        entry += struct.pack('<B8xHHHHI', 0x20, cluster >> 16, 0x6000, 0x5063, cluster & 0xFFFF, len(contents))
+        entry[0] = 0xE5  # Deleted: the chain is freed, the contents stay
+        image[root + number * 32:root + number * 32 + 32] = entry
+        offset = data_start + (cluster - 2) * cluster_size
+        image[offset:offset + len(contents)] = contents
+        cluster += -(-len(contents) // cluster_size)
+    return bytes(image)
+
+def bench_metadata_names(count=16, workers=(1, 2)):
+    """Check that deleted FAT32 files carved by the quick stage keep their directory names after a deep scan."""
+    files = {f"PIC{number:05d}.png": build_structured_files(4096, seed=number)['png'] for number in range(count)}
+    with tempfile.NamedTemporaryFile(suffix='.img', delete=False) as f:
+        f.write(build_fat32_image(files))
+        path = f.name
+    catalog_path = path + ".db"
+    # A deleted directory entry loses the first letter of its name
+    expected = {name[1:] for name in files}
+    try:
+        print(f"Deep scan of a FAT32 image with {count} deleted PNG files")
+        for count_workers in workers:
+            found = []
+            engine = ScanEngine(path, "Deep", count_workers, on_file_found=found.append, catalog_path=catalog_path)
+            engine.junk_threshold = float('inf')  # Scan the whole image regardless of junk
+            engine.run()
+            shown = set()  # Names listed once each replaced carve is swapped out, as the file list does
+            for file_info in found:
+                shown.difference_update(name for _, name in file_info.get('replaces', ()))
+                shown.add(file_info['name'])
+            catalog = ScanCatalog(catalog_path)
+            try:
+                cataloged = {name for _, name in catalog.file_keys()}
+            finally:
+                catalog.close()
+            print(f"  {count_workers} worker(s): {len(expected & shown)} of {len(expected)} names listed, "
+                  f"{len(expected & cataloged)} cataloged, {len(cataloged - expected)} carves left, "
+                  f"{'named' if shown == cataloged == expected else 'UNNAMED'}")
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(catalog_path + suffix):
+                    os.remove(catalog_path + suffix)
+    finally:
+        os.remove(path)
+
+def legacy_dead_clusters(data, cluster_size):
+    """Per-cluster len(set()) check used by contains_gibberish_cluster before ClusterClassifier."""
+    return [len(set(data[i:i + cluster_size])) < 10 for i in range(0, len(data), cluster_size)]
+
+def bench_cluster_classifier(size=64 * MB, cluster_size=4096, rounds=3):
+    """Compare per-cluster set() checks with the NumPy histogram classifier over one carving buffer."""
+    image = build_synthetic_image(size)
+    classifier = ClusterClassifier(cluster_size)
+    best = {}
+    for name, func in (('legacy', lambda: legacy_dead_clusters(image, cluster_size)),
+                       ('classifier', lambda: classifier.classify(image))):
+        best[name] = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func()
+            best[name] = min(best[name], time.perf_counter() - start)
+    classes = classifier.classify(image)
+    if list(ClusterClassifier.is_dead(classes)) != legacy_dead_clusters(image, cluster_size):
+        print("WARNING: classifier dead clusters differ from the legacy check")
+    counts = np.bincount(classes, minlength=len(ClusterClassifier.NAMES))
+    print(f"Cluster classification of {size // MB} MB in {cluster_size // 1024} KB clusters")
+    print("  " + ", ".join(f"{name} {count:,}" for name, count in zip(ClusterClassifier.NAMES, counts.tolist())))
+    print(f"  legacy set() per cluster: {size / best['legacy'] / MB:8.1f} MB/s")
+    print(f"  ClusterClassifier       : {size / best['classifier'] / MB:8.1f} MB/s")
+
+def legacy_is_readable_text(data):
+    """Whole-payload charset detection and printable count used by is_readable_text before its fast path."""
+    encoding = detect(data[:1024])['encoding'] or 'utf-8'
+    text = data.decode(encoding, errors='ignore')
+    return bool(text.strip()) and sum(c.isprintable() or c in '\n\r\t' for c in text) / len(text) >= 0.7
+
+def bench_text_detection(size=5 * MB, calls=3):
+    """Time text verdicts on txt-sized candidates, asked for as often as deep carving asks per candidate."""
+    candidates = {
+        'ascii': (b"The quick brown fox jumps over the lazy dog.\n" * (size // 45 + 1))[:size],
+        'utf-8': ("Schnelle braune F\u00fcchse springen \u00fcber faule Hunde. \u2713\n" * (size // 60 + 1)).encode()[:size],
+        'random': os.urandom(size),
+    }
+    print(f"Text detection on {size // MB} MB candidates, {calls} verdicts each")
+    for name, data in candidates.items():
+        start = time.perf_counter()
+        legacy = [legacy_is_readable_text(data) for _ in range(calls)][-1]
+        legacy_time = time.perf_counter() - start
+        data = bytes(data)  # A fresh object, so no verdict is cached yet
+        start = time.perf_counter()
+        fast = [FileUtils.is_readable_text(data) for _ in range(calls)][-1]
+        fast_time = time.perf_counter() - start
+        print(f"  {name:7s}: legacy {legacy_time * 1000:9.1f} ms ({legacy}), "
+              f"is_readable_text {fast_time * 1000:7.2f} ms ({fast})")
+
+def build_structured_files(size, seed=1):
+    """Build one well-formed PNG, ZIP, WAV and MP4 file of about size bytes each, keyed by file type."""
+    rng = random.Random(seed)
+    payload = bytes(rng.getrandbits(8) for _ in range(4096)) * (size // 4096)
+
+    def png_chunk(chunk_type, data):
+        return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+    def box(box_type, data):
+        return struct.pack('>I', 8 + len(data)) + box_type + data
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as z:
+        z.writestr('payload.bin', payload)
+    return {
+        'png': b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', struct.pack('>IIBBBBB', 64, 64, 8, 2, 0, 0, 0)) +
+               png_chunk(b'IDAT', payload) + png_chunk(b'IEND', b''),
+        'zip': archive.getvalue(),
+        'wav': b'RIFF' + struct.pack('<I', 36 + len(payload)) + b'WAVEfmt ' + struct.pack('<IHHIIHH', 16, 1, 1, 8000, 16000, 2, 16) +
+               b'data' + struct.pack('<I', len(payload)) + payload,
+        'mp4': box(b'ftyp', b'isom\x00\x00\x02\x00isomiso2') + box(b'mdat', payload) + box(b'moov', bytes(100)),
+    }
+
+def bench_structure_walkers(size=1 * MB):
+    """Compare footer/size-cap carving plus validation with one structure walk per candidate."""
+    files = build_structured_files(size)
+    image = bytearray()
+    offsets = {}
+    for file_type, data in files.items():
+        offsets[file_type] = len(image)
+        image += data + os.urandom(12 * MB)  # Room for the size cap of types without a footer
+    with tempfile.NamedTemporaryFile(suffix='.img', delete=False) as f:
+        f.write(image)
+    engine = ScanEngine(f.name, "Deep")
+    engine.metrics = ScanMetrics()
+    engine.device = MeteredDevice(BlockDevice.open(f.name), engine.metrics)
+    try:
+        print(f"Carving one {size // MB} MB candidate per type, read from the image")
+        for file_type, offset in offsets.items():
+            results = {}
+            for name, carve in (('legacy', lambda: engine.carve_file(offset, file_type, len(image))),
+                                ('walker', lambda: engine.walk_file(offset, (file_type,), len(image))[1])):
+                engine.metrics.begin(name + file_type)
+                start = time.perf_counter()
+                data = carve()
+                valid = bool(data) and (name == 'walker' or FileUtils.validate_file(file_type, data))
+                results[name] = (time.perf_counter() - start, engine.metrics.current['bytes_read'], valid,
+                                 data == files[file_type])
+            print(f"  {file_type}: " + ", ".join(
+                f"{name} {elapsed * 1000:6.1f} ms, {read / MB:5.1f} MB read, valid {valid}, exact {exact}"
+                for name, (elapsed, read, valid, exact) in results.items()))
+    finally:
+        engine.device.close()
+        os.remove(f.name)
+
+def bench_read_ahead(size=256 * MB, buffer_size=16 * MB, depths=(0, 1, 2)):
+    """Compare a quick scan reading each buffer in line with one reading ahead on a background thread."""
+    path = write_synthetic_image(size)
+    try:
+        print(f"Quick scan over {size // MB} MB image in {buffer_size // MB} MB buffers (os.cpu_count() = {os.cpu_count()})")
+        for depth in depths:
+            engine = ScanEngine(path, "Quick")
+            engine.buffer_size = buffer_size
+            engine.read_ahead = depth
+            engine.junk_threshold = float('inf')  # Scan the whole image regardless of junk
+            start = time.perf_counter()
+            engine.run()
+            elapsed = time.perf_counter() - start
+            counters = engine.metrics.report()['stages']['quick']
+            print(f"  read-ahead {depth}: {size / elapsed / MB:8.1f} MB/s, reads {counters['read_time']:.2f} s, "
+                  f"waited for reads {counters['read_wait']:.2f} s, wall {elapsed:.2f} s")
+    finally:
+        os.remove(path)
+
+def bench_memory_budget(size=256 * MB, workers=2, budgets=(None, 512 * MB, 128 * MB)):
+    """Compare deep scan throughput and peak memory under a series of memory budgets."""
+    path = write_synthetic_image(size)
+    try:
+        print(f"Deep scan over {size // MB} MB image with {workers} workers")
+        for budget in budgets:
+            engine = ScanEngine(path, "Deep", workers=workers)
+            engine.memory.budget = budget
+            engine.junk_threshold = float('inf')  # Scan the whole image regardless of junk
+            start = time.perf_counter()
+            engine.run()
+            elapsed = time.perf_counter() - start
+            report = engine.metrics.report()
+            waited = sum(counters['memory_wait'] for counters in report['stages'].values())
+            label = f"{budget // MB} MB" if budget else "no limit"
+            print(f"  budget {label:>8}: {size / elapsed / MB:8.1f} MB/s, peak {report['memory']['peak'] / MB:7.1f} MB, "
+                  f"{engine.workers} workers, {engine.buffer_size // MB} MB buffers, read-ahead {engine.read_ahead}, "
+                  f"held back {waited:.2f} s")
+    finally:
+        os.remove(path)
+
+BENCHMARKS = {
+    'signatures': bench_signature_matcher,
+    'device': bench_block_device,
+    'workers': bench_deep_scan_workers,
+    'mft': bench_mft_decoder,
+    'logfile': bench_logfile_parser,
+    'fat': bench_fat_table,
+    'names': bench_metadata_names,
+    'classifier': bench_cluster_classifier,
+    'text': bench_text_detection,
+    'walkers': bench_structure_walkers,
+    'readahead': bench_read_ahead,
+    'memory': bench_memory_budget,
+    'resume': bench_resume,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()